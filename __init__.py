@@ -6,12 +6,16 @@ import logging
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryError
 from homeassistant.helpers import device_registry as dr
 
 from .const import CONF_ACCOUNT_ID, CONF_ACCOUNT_NAME, CONF_INITIAL_BALANCE, DOMAIN
 from .coordinator import FinanceCoordinator
+from .hub import async_get_hub
 from .models import Account
 from .panel import async_setup_panel, async_remove_panel
+from .pipeline import Mutation
+from .services import async_setup_services, async_unload_services
 from .store import FinanceStore
 
 _LOGGER = logging.getLogger(__name__)
@@ -24,6 +28,7 @@ PLATFORMS_LIST: list[Platform] = [
     Platform.TEXT,
     Platform.BUTTON,
     Platform.SENSOR,
+    Platform.BINARY_SENSOR,
     Platform.SELECT,
     Platform.SWITCH,
 ]
@@ -38,25 +43,39 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         await async_setup_panel(hass)
         hass.data[DOMAIN][_PANEL_REGISTERED_KEY] = True
 
+    async_setup_services(hass)
+
+    account_id = entry.data[CONF_ACCOUNT_ID]
+    store = FinanceStore(hass)
+    await store.async_load()
+    if account_id in store.unavailable:
+        # Creating the account anew would replace the unreadable data
+        raise ConfigEntryError(
+            f"The data of account {account_id} could not be loaded"
+        )
+
     coordinator = FinanceCoordinator(hass, entry)
     await coordinator.async_setup()
 
     # Ensure account exists in storage
-    account_id = entry.data[CONF_ACCOUNT_ID]
     account_name = entry.data[CONF_ACCOUNT_NAME]
     initial_balance = entry.data.get(CONF_INITIAL_BALANCE, 0.0)
 
     if coordinator.data.get_account(account_id) is None:
-        account = Account(
-            id=account_id,
-            name=account_name,
-            balance=initial_balance,
+
+        def create_account(mutation: Mutation) -> None:
+            if mutation.account is None:
+                mutation.add_account(
+                    Account(id=account_id, name=account_name, balance=initial_balance)
+                )
+
+        await coordinator.hub.pipeline.async_execute(
+            account_id, create_account, must_exist=False
         )
-        coordinator.data.add_account(account)
-        await coordinator.store.async_save()
-        await coordinator.async_refresh()
 
     hass.data[DOMAIN][entry.entry_id] = coordinator
+    # Accounts created in the panel have no config entry of their own
+    await coordinator.hub.async_setup_accounts()
 
     # Register device
     device_registry = dr.async_get(hass)
@@ -83,12 +102,25 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS_LIST):
         hass.data[DOMAIN].pop(entry.entry_id)
 
-    # Remove panel if no more config entries (only _PANEL_REGISTERED_KEY remains)
-    remaining_entries = [k for k in hass.data.get(DOMAIN, {}).keys() if k != _PANEL_REGISTERED_KEY]
+    # Remove panel if no more config entries (only private keys remain)
+    remaining_entries = [k for k in hass.data.get(DOMAIN, {}).keys() if not k.startswith("_")]
+
+    # Hand the cross-account sensors over to another account
+    hub = async_get_hub(hass)
+    if hub.aggregate_entry_id == entry.entry_id:
+        hub.aggregate_entry_id = None
+        if remaining_entries:
+            hass.async_create_task(
+                hass.config_entries.async_reload(remaining_entries[0])
+            )
+
     if not remaining_entries and hass.data[DOMAIN].get(_PANEL_REGISTERED_KEY):
         await async_remove_panel(hass)
         hass.data[DOMAIN][_PANEL_REGISTERED_KEY] = False
 
+    if not remaining_entries:
+        async_unload_services(hass)
+
     return unload_ok
 
 
@@ -101,16 +133,8 @@ async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle removal of an entry."""
     account_id = entry.data[CONF_ACCOUNT_ID]
 
-    # Try to get coordinator from hass.data first (if not yet unloaded)
-    coordinator: FinanceCoordinator | None = hass.data.get(DOMAIN, {}).get(entry.entry_id)
-    if coordinator:
-        coordinator.data.remove_account(account_id)
-        await coordinator.store.async_save()
-    else:
-        # Coordinator already unloaded, access store directly
-        store = FinanceStore(hass)
-        await store.async_load()
-        store.data.remove_account(account_id)
-        await store.async_save()
-        # Clear the store instance since we're removing the account
-        FinanceStore.clear_instance(hass)
+    # The entry is unloaded by now; the hub outlives it and keeps the store
+    await async_get_hub(hass).pipeline.async_execute(
+        account_id, Mutation.remove_account, must_exist=False
+    )
+    await FinanceStore(hass).async_discard_account(account_id)
@@ -0,0 +1,69 @@
+"""Binary sensor entities for Ha Finance Record integration."""
+from __future__ import annotations
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import CONF_ACCOUNT_ID, DOMAIN
+from .coordinator import FinanceCoordinator
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up binary sensor entities."""
+    coordinator: FinanceCoordinator = hass.data[DOMAIN][entry.entry_id]
+    account_id = entry.data[CONF_ACCOUNT_ID]
+
+    async_add_entities([LowBalanceBinarySensor(coordinator, account_id)])
+
+
+class LowBalanceBinarySensor(CoordinatorEntity[FinanceCoordinator], BinarySensorEntity):
+    """Binary sensor that is on while the low balance alert is active."""
+
+    _attr_has_entity_name = True
+    _attr_icon = "mdi:cash-remove"
+    _attr_translation_key = "low_balance"
+    _attr_device_class = BinarySensorDeviceClass.PROBLEM
+
+    def __init__(self, coordinator: FinanceCoordinator, account_id: str) -> None:
+        """Initialize the low balance binary sensor."""
+        super().__init__(coordinator)
+        self._account_id = account_id
+        self._attr_unique_id = f"{account_id}_low_balance"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return device info."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, self._account_id)},
+        )
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return True while the account balance is low."""
+        if self.coordinator.data is None:
+            return None
+        account = self.coordinator.data.get_account(self._account_id)
+        if account is None:
+            return None
+        return account.low_balance_alert.active
+
+    @property
+    def extra_state_attributes(self) -> dict[str, str | None]:
+        """Return when the last low balance alert was fired."""
+        if self.coordinator.data is None:
+            return {}
+        account = self.coordinator.data.get_account(self._account_id)
+        if account is None:
+            return {}
+        return {"fired_at": account.low_balance_alert.fired_at}
@@ -0,0 +1,128 @@
+"""Rule-based transaction classification for Ha Finance Record.
+
+All rule keywords are compiled into a single Aho-Corasick automaton, so a
+note is scanned once regardless of how many rules exist.
+"""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable, Iterator
+from dataclasses import replace
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .models import ClassificationRule, Transaction
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton finding all keywords occurring in a text."""
+
+    def __init__(self, keywords: Iterable[str]) -> None:
+        """Build the automaton; keyword positions identify the matches."""
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[tuple[int, ...]] = [()]
+
+        for position, keyword in enumerate(keywords):
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] = (*self._output[state], position)
+
+        # Breadth-first pass computing failure links and merged outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fallback = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fallback if fallback != next_state else 0
+                self._output[next_state] = (
+                    *self._output[next_state],
+                    *self._output[self._fail[next_state]],
+                )
+
+    def find(self, text: str) -> Iterator[int]:
+        """Yield the position of every keyword occurrence in text."""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            yield from output[state]
+
+
+class RuleEngine:
+    """Compiled set of classification rules.
+
+    Rules are evaluated by priority (lowest first). The category comes
+    from the first matching rule that sets one; the tags of all matching
+    rules are combined.
+    """
+
+    def __init__(self, rules: Iterable[ClassificationRule]) -> None:
+        """Compile the rules."""
+        self._rules = sorted(rules, key=lambda rule: (rule.priority, rule.id))
+        keywords: dict[str, list[int]] = {}
+        self._unconditional: list[int] = []
+        for position, rule in enumerate(self._rules):
+            if not rule.keywords:
+                self._unconditional.append(position)
+            for keyword in rule.keywords:
+                keywords.setdefault(keyword.casefold(), []).append(position)
+        self._keyword_rules = list(keywords.values())
+        self._matcher = KeywordMatcher(keywords)
+
+    def __len__(self) -> int:
+        """Return the number of rules."""
+        return len(self._rules)
+
+    def match(self, note: str, amount: float) -> list[ClassificationRule]:
+        """Return the rules matching a note and amount, by priority."""
+        if not self._rules:
+            return []
+        hits = set(self._unconditional)
+        for keyword in self._matcher.find(note.casefold()):
+            hits.update(self._keyword_rules[keyword])
+        return [
+            rule
+            for rule in (self._rules[position] for position in sorted(hits))
+            if rule.matches_amount(amount)
+        ]
+
+    def classify(self, transaction: Transaction, overwrite: bool = False) -> Transaction:
+        """Return the transaction with category and tags from matching rules.
+
+        An existing category is only replaced when overwrite is set; tags
+        are merged. The same instance is returned when nothing changes.
+        """
+        rules = self.match(transaction.note, transaction.amount)
+        if not rules:
+            return transaction
+
+        category = transaction.category
+        if category is None or overwrite:
+            category = next(
+                (rule.category for rule in rules if rule.category), category
+            )
+        tags = tuple(
+            dict.fromkeys(
+                (*transaction.tags, *(tag for rule in rules for tag in rule.tags))
+            )
+        )
+        if category == transaction.category and tags == transaction.tags:
+            return transaction
+        return replace(transaction, category=category, tags=tags)
@@ -17,15 +17,21 @@ from .const import (
     ACTION_DELETE_PLAN,
     ACTION_EDIT_PLAN,
     ACTION_MANAGE_RECURRING,
+    ACTION_SETTINGS,
     CONF_ACCOUNT_ID,
     CONF_ACCOUNT_NAME,
     CONF_INITIAL_BALANCE,
+    CONF_LOW_BALANCE_RECOVERY,
+    CONF_LOW_BALANCE_THRESHOLD,
+    CONF_PER_ITEM_EVENTS,
     CONF_PLAN_ACTIVE,
     CONF_PLAN_AMOUNT,
     CONF_PLAN_DAY,
     CONF_PLAN_FREQUENCY,
     CONF_PLAN_MONTH,
     CONF_PLAN_TITLE,
+    DEFAULT_LOW_BALANCE_THRESHOLD,
+    DEFAULT_PER_ITEM_EVENTS,
     DOMAIN,
     FREQUENCY_DAILY,
     FREQUENCY_MONTHLY,
@@ -49,6 +55,30 @@ def generate_plan_id(title: str) -> str:
     return plan_id or "plan"
 
 
+def validate_low_balance(user_input: dict[str, Any]) -> dict[str, str]:
+    """Check that the low balance alert clears at or above its threshold."""
+    recovery = user_input.get(CONF_LOW_BALANCE_RECOVERY)
+    threshold = user_input.get(
+        CONF_LOW_BALANCE_THRESHOLD, DEFAULT_LOW_BALANCE_THRESHOLD
+    )
+    if recovery is not None and recovery < threshold:
+        return {CONF_LOW_BALANCE_RECOVERY: "recovery_below_threshold"}
+    return {}
+
+
+def low_balance_options(user_input: dict[str, Any]) -> dict[str, Any]:
+    """Return the low balance alert options of a form's input.
+
+    Without a recovery level the alert clears at the default distance
+    above the threshold.
+    """
+    return {
+        key: user_input[key]
+        for key in (CONF_LOW_BALANCE_THRESHOLD, CONF_LOW_BALANCE_RECOVERY)
+        if key in user_input
+    }
+
+
 class HaFinanceConfigFlow(ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Ha Finance."""
 
@@ -61,6 +91,9 @@ class HaFinanceConfigFlow(ConfigFlow, domain=DOMAIN):
         errors: dict[str, str] = {}
 
         if user_input is not None:
+            errors = validate_low_balance(user_input)
+
+        if user_input is not None and not errors:
             account_name = user_input[CONF_ACCOUNT_NAME]
             account_id = user_input.get(CONF_ACCOUNT_ID) or generate_account_id(
                 account_name
@@ -78,6 +111,7 @@ class HaFinanceConfigFlow(ConfigFlow, domain=DOMAIN):
                     CONF_ACCOUNT_NAME: account_name,
                     CONF_INITIAL_BALANCE: initial_balance,
                 },
+                options=low_balance_options(user_input),
             )
 
         return self.async_show_form(
@@ -87,6 +121,11 @@ class HaFinanceConfigFlow(ConfigFlow, domain=DOMAIN):
                     vol.Required(CONF_ACCOUNT_NAME): cv.string,
                     vol.Optional(CONF_ACCOUNT_ID): cv.string,
                     vol.Optional(CONF_INITIAL_BALANCE, default=0.0): vol.Coerce(float),
+                    vol.Optional(
+                        CONF_LOW_BALANCE_THRESHOLD,
+                        default=DEFAULT_LOW_BALANCE_THRESHOLD,
+                    ): vol.Coerce(float),
+                    vol.Optional(CONF_LOW_BALANCE_RECOVERY): vol.Coerce(float),
                 }
             ),
             errors=errors,
@@ -117,6 +156,8 @@ class HaFinanceOptionsFlow(OptionsFlow):
                 return await self.async_step_add_recurring()
             if action == ACTION_MANAGE_RECURRING:
                 return await self.async_step_manage_recurring()
+            if action == ACTION_SETTINGS:
+                return await self.async_step_settings()
             if action == ACTION_DELETE_ACCOUNT:
                 return await self.async_step_delete_account()
 
@@ -128,6 +169,7 @@ class HaFinanceOptionsFlow(OptionsFlow):
                         {
                             ACTION_ADD_RECURRING: "新增定期項目",
                             ACTION_MANAGE_RECURRING: "管理定期項目",
+                            ACTION_SETTINGS: "設定",
                             ACTION_DELETE_ACCOUNT: "刪除帳戶",
                         }
                     ),
@@ -180,7 +222,9 @@ class HaFinanceOptionsFlow(OptionsFlow):
                         active=active,
                     )
 
-                return self.async_create_entry(title="", data={})
+                return self.async_create_entry(
+                    title="", data=dict(self.config_entry.options)
+                )
 
         return self.async_show_form(
             step_id="add_recurring",
@@ -299,7 +343,9 @@ class HaFinanceOptionsFlow(OptionsFlow):
                     day=day,
                     month=month,
                 )
-                return self.async_create_entry(title="", data={})
+                return self.async_create_entry(
+                    title="", data=dict(self.config_entry.options)
+                )
 
         return self.async_show_form(
             step_id="edit_plan",
@@ -341,7 +387,9 @@ class HaFinanceOptionsFlow(OptionsFlow):
         if user_input is not None:
             if user_input.get("confirm"):
                 await coordinator.async_remove_recurring_plan(self._selected_plan_id)
-            return self.async_create_entry(title="", data={})
+            return self.async_create_entry(
+                title="", data=dict(self.config_entry.options)
+            )
 
         return self.async_show_form(
             step_id="delete_plan",
@@ -353,6 +401,48 @@ class HaFinanceOptionsFlow(OptionsFlow):
             description_placeholders={"plan_id": self._selected_plan_id},
         )
 
+    async def async_step_settings(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle the account settings."""
+        errors: dict[str, str] = {}
+        options = self.config_entry.options
+        if user_input is not None:
+            errors = validate_low_balance(user_input)
+            if not errors:
+                data = {**options, **user_input}
+                if CONF_LOW_BALANCE_RECOVERY not in user_input:
+                    # A cleared field falls back to the default recovery level
+                    data.pop(CONF_LOW_BALANCE_RECOVERY, None)
+                return self.async_create_entry(title="", data=data)
+
+        return self.async_show_form(
+            step_id="settings",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_PER_ITEM_EVENTS,
+                        default=options.get(
+                            CONF_PER_ITEM_EVENTS, DEFAULT_PER_ITEM_EVENTS
+                        ),
+                    ): cv.boolean,
+                    vol.Required(
+                        CONF_LOW_BALANCE_THRESHOLD,
+                        default=options.get(
+                            CONF_LOW_BALANCE_THRESHOLD, DEFAULT_LOW_BALANCE_THRESHOLD
+                        ),
+                    ): vol.Coerce(float),
+                    vol.Optional(
+                        CONF_LOW_BALANCE_RECOVERY,
+                        description={
+                            "suggested_value": options.get(CONF_LOW_BALANCE_RECOVERY)
+                        },
+                    ): vol.Coerce(float),
+                }
+            ),
+            errors=errors,
+        )
+
     async def async_step_delete_account(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -1,12 +1,27 @@
 """Constants for Ha Finance Record integration."""
+from datetime import timedelta
 from typing import Final
 
 DOMAIN: Final = "ha_finance"
 STORAGE_KEY: Final = "ha_finance"
-STORAGE_VERSION: Final = 1
+# Version 2 moved the accounts from the STORAGE_KEY file into one file each
+STORAGE_VERSION: Final = 2
+# Prefix of the per-account storage keys, followed by ".<account_id>"
+STORAGE_ACCOUNT_KEY: Final = "ha_finance.account"
+
+# Key of the shared hub in hass.data[DOMAIN]
+HUB_KEY: Final = "_hub"
 
 # Platforms
-PLATFORMS: Final = ["number", "text", "button", "sensor", "select", "switch"]
+PLATFORMS: Final = [
+    "number",
+    "text",
+    "button",
+    "sensor",
+    "binary_sensor",
+    "select",
+    "switch",
+]
 
 # Config keys
 CONF_ACCOUNT_NAME: Final = "account_name"
@@ -34,6 +49,19 @@ FREQUENCY_OPTIONS: Final = [
     FREQUENCY_YEARLY,
 ]
 
+# Chart granularities, the levels of the account rollups
+GRANULARITY_DAY: Final = "day"
+GRANULARITY_WEEK: Final = "week"
+GRANULARITY_MONTH: Final = "month"
+GRANULARITY_YEAR: Final = "year"
+
+GRANULARITIES: Final = [
+    GRANULARITY_DAY,
+    GRANULARITY_WEEK,
+    GRANULARITY_MONTH,
+    GRANULARITY_YEAR,
+]
+
 # Transaction types
 TRANSACTION_MANUAL: Final = "manual"
 TRANSACTION_RECURRING: Final = "recurring"
@@ -44,11 +72,15 @@ EVENT_TRANSACTION_ADDED: Final = "ha_finance_transaction_added"
 EVENT_RECURRING_EXECUTED: Final = "ha_finance_recurring_executed"
 EVENT_BALANCE_ADJUSTED: Final = "ha_finance_balance_adjusted"
 EVENT_LOW_BALANCE: Final = "ha_finance_low_balance"
+EVENT_LOW_BALANCE_CLEARED: Final = "ha_finance_low_balance_cleared"
+EVENT_BUDGET_THRESHOLD: Final = "ha_finance_budget_threshold"
+EVENT_BATCH: Final = "ha_finance_batch"
 
 # Options flow actions
 ACTION_ADD_RECURRING: Final = "add_recurring"
 ACTION_MANAGE_RECURRING: Final = "manage_recurring"
 ACTION_EDIT_ACCOUNT: Final = "edit_account"
+ACTION_SETTINGS: Final = "settings"
 ACTION_DELETE_ACCOUNT: Final = "delete_account"
 ACTION_EDIT_PLAN: Final = "edit_plan"
 ACTION_DELETE_PLAN: Final = "delete_plan"
@@ -57,11 +89,47 @@ ACTION_DELETE_PLAN: Final = "delete_plan"
 DEFAULT_BALANCE: Final = 0.0
 DEFAULT_QUICK_AMOUNT: Final = 0.0
 DEFAULT_LOW_BALANCE_THRESHOLD: Final = 1000.0
+# The low balance alert clears once the balance is this much above the threshold
+DEFAULT_LOW_BALANCE_HYSTERESIS: Final = 100.0
+# Minimum time between two low balance events of an account
+LOW_BALANCE_ALERT_COOLDOWN: Final = timedelta(hours=1)
 DEFAULT_MAX_TRANSACTIONS: Final = 1000
+# Newest matches of an account that a search ranks
+SEARCH_CANDIDATE_LIMIT: Final = 500
+
+# Transactions between two balance checkpoints of an account
+CHECKPOINT_INTERVAL: Final = 50
+
+# Versions of an account the panel can fetch as changes instead of in full
+CHANGE_LOG_SIZE: Final = 256
+
+# Wire formats of transaction lists in WebSocket responses
+FORMAT_ROWS: Final = "rows"
+FORMAT_COLUMNS: Final = "columns"
+WIRE_FORMATS: Final = [FORMAT_ROWS, FORMAT_COLUMNS]
+
+# Kinds of long-term statistics imported per account
+STATISTIC_BALANCE: Final = "balance"
+STATISTIC_INCOME: Final = "income"
+STATISTIC_EXPENSES: Final = "expenses"
+
+# Encoded WebSocket responses kept in the shared response cache
+RESPONSE_CACHE_SIZE: Final = 64
+
+# Seconds an account collects events before firing them as one batch event
+EVENT_BATCH_WINDOW: Final = 1.0
+
+# Trailing windows (in local days) of the rolling spending sensors
+SPENDING_WINDOWS: Final = (1, 7, 30)
 
 # Config keys for account settings
 CONF_LOW_BALANCE_THRESHOLD: Final = "low_balance_threshold"
+CONF_LOW_BALANCE_RECOVERY: Final = "low_balance_recovery"
 CONF_CURRENCY: Final = "currency"
+# Also fire the individual events that make up a batch event
+CONF_PER_ITEM_EVENTS: Final = "per_item_events"
+# Off by default; automations on the individual events need it turned on
+DEFAULT_PER_ITEM_EVENTS: Final = False
 DEFAULT_CURRENCY: Final = "NTD"
 
 # Recurring plan month (for yearly)
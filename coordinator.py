@@ -1,32 +1,45 @@
 """Data coordinator for Ha Finance Record integration."""
 from __future__ import annotations
 
-from datetime import date, datetime, timedelta
+from collections.abc import Iterable, Mapping
+from dataclasses import replace
+from datetime import date, timedelta
+from functools import partial
 import logging
-from typing import TYPE_CHECKING, Any, Callable
+from typing import TYPE_CHECKING, Any
 
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import HomeAssistant
 from homeassistant.helpers import entity_registry as er
-from homeassistant.helpers.event import async_track_time_change
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.util import dt as dt_util
 
 from .const import (
+    CONF_LOW_BALANCE_RECOVERY,
+    CONF_LOW_BALANCE_THRESHOLD,
+    CONF_PER_ITEM_EVENTS,
+    DEFAULT_LOW_BALANCE_HYSTERESIS,
     DEFAULT_LOW_BALANCE_THRESHOLD,
-    DEFAULT_MAX_TRANSACTIONS,
+    DEFAULT_PER_ITEM_EVENTS,
     DOMAIN,
     EVENT_BALANCE_ADJUSTED,
+    EVENT_BATCH_WINDOW,
     EVENT_LOW_BALANCE,
+    EVENT_LOW_BALANCE_CLEARED,
     EVENT_RECURRING_EXECUTED,
     EVENT_TRANSACTION_ADDED,
     FREQUENCY_DAILY,
     FREQUENCY_MONTHLY,
     FREQUENCY_WEEKLY,
     FREQUENCY_YEARLY,
+    LOW_BALANCE_ALERT_COOLDOWN,
     TRANSACTION_ADJUSTMENT,
+    TRANSACTION_MANUAL,
     TRANSACTION_RECURRING,
 )
+from .events import EventBatcher
+from .hub import async_get_hub
 from .models import Account, FinanceData, RecurringPlan, Transaction
+from .pipeline import Mutation, MutationError
 from .store import FinanceStore
 
 if TYPE_CHECKING:
@@ -39,23 +52,86 @@ NOTE_AUTO_SUFFIX = " (Auto)"
 NOTE_BALANCE_ADJUSTMENT = "Balance Adjustment"
 
 
+def record_transaction(
+    mutation: Mutation,
+    amount: float,
+    note: str,
+    transaction_type: str = TRANSACTION_MANUAL,
+    category: str | None = None,
+    tags: Iterable[str] = (),
+) -> Transaction:
+    """Add a transaction to the mutated account and queue its event.
+
+    Apply step shared by the coordinator and the accounts without one.
+    """
+    transaction = mutation.add_transaction(
+        Transaction.create(
+            amount=amount,
+            note=note,
+            transaction_type=transaction_type,
+            category=category,
+            tags=tags,
+        )
+    )
+    mutation.fire(
+        EVENT_TRANSACTION_ADDED,
+        {
+            "account": mutation.account_id,
+            "amount": amount,
+            "note": note,
+            "type": transaction_type,
+            "category": transaction.category,
+        },
+    )
+    return transaction
+
+
 class FinanceCoordinator(DataUpdateCoordinator[FinanceData]):
-    """Coordinator for managing finance data and recurring plans."""
+    """Coordinator for managing finance data and recurring plans.
+
+    Periodic refreshes and the midnight recurring plan check are driven by
+    the shared FinanceHub rather than by a timer per account.
+
+    Accounts created in the panel have no config entry. Their coordinator
+    is created without one and has no entities, but routes events, low
+    balance alerts and recurring plans like any other account, using the
+    default options.
+    """
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry | None,
+        account_id: str | None = None,
+    ) -> None:
         """Initialize the coordinator."""
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(minutes=5),
+            update_interval=None,
         )
         self.entry = entry
+        self.options: Mapping[str, Any] = entry.options if entry is not None else {}
         self.store = FinanceStore(hass)
-        self._account_id: str = entry.data.get("account_id", "")
-        self._unsub_time_change: Callable[[], None] | None = None
-        self._low_balance_threshold: float = entry.options.get(
-            "low_balance_threshold", DEFAULT_LOW_BALANCE_THRESHOLD
+        self.hub = async_get_hub(hass)
+        self._account_id: str = (
+            entry.data.get("account_id", "") if entry is not None else account_id or ""
+        )
+        self._low_balance_threshold: float = self.options.get(
+            CONF_LOW_BALANCE_THRESHOLD, DEFAULT_LOW_BALANCE_THRESHOLD
+        )
+        # The alert clears only once the balance recovers to this value
+        self._low_balance_recovery: float = self.options.get(
+            CONF_LOW_BALANCE_RECOVERY,
+            self._low_balance_threshold + DEFAULT_LOW_BALANCE_HYSTERESIS,
+        )
+        # The account's events are coalesced into ha_finance_batch events
+        self.events = EventBatcher(
+            hass,
+            self._account_id,
+            EVENT_BATCH_WINDOW,
+            per_item=self.options.get(CONF_PER_ITEM_EVENTS, DEFAULT_PER_ITEM_EVENTS),
         )
 
     @property
@@ -76,65 +152,69 @@ class FinanceCoordinator(DataUpdateCoordinator[FinanceData]):
 
     async def async_setup(self) -> None:
         """Set up the coordinator."""
-        await self.async_config_entry_first_refresh()
-        # Schedule daily check for recurring plans at midnight
-        self._unsub_time_change = async_track_time_change(
-            self.hass, self._async_check_recurring_plans, hour=0, minute=0, second=0
-        )
+        if self.entry is not None:
+            await self.async_config_entry_first_refresh()
+        else:
+            await self.async_refresh()
+        # Recurring plans are checked at midnight by the shared hub
+        self.hub.async_register(self)
 
     async def async_shutdown(self) -> None:
         """Shutdown the coordinator."""
-        if self._unsub_time_change:
-            self._unsub_time_change()
-            self._unsub_time_change = None
+        self.hub.async_unregister(self)
+        self.events.async_flush()
 
-    @callback
-    def _async_check_recurring_plans(self, now: datetime) -> None:
-        """Check and execute recurring plans."""
-        self.hass.async_create_task(self._async_execute_recurring_plans())
-
-    async def _async_execute_recurring_plans(self) -> None:
-        """Execute all due recurring plans."""
-        account = self.account
-        if account is None:
-            return
-
-        today = dt_util.now().date()
+    def execute_due_plans(self, mutation: Mutation, today: date) -> bool:
+        """Execute all due recurring plans.
 
+        Run as the apply step of a mutation by the hub on its midnight tick.
+        Returns True if the account was modified.
+        """
+        account = mutation.account
+        changed = False
         for plan_id, plan in account.recurring_plans.items():
             if not plan.active:
                 continue
 
             if plan.next_date is None:
                 # Calculate initial next_date
-                plan.next_date = self._calculate_next_date(plan, today).isoformat()
+                account.update_recurring_plan(
+                    plan_id,
+                    next_date=self._calculate_next_date(plan, today).isoformat(),
+                )
+                changed = True
                 continue
 
             parsed = dt_util.parse_datetime(plan.next_date)
             next_date = parsed.date() if parsed else today
             if today >= next_date:
                 # Execute the plan
-                await self._execute_plan(account, plan)
+                self._execute_plan(mutation, plan)
+                changed = True
 
-        await self.store.async_save()
-        await self.async_refresh()
+        return changed
 
-    async def _execute_plan(self, account: Account, plan: RecurringPlan) -> None:
+    def _execute_plan(self, mutation: Mutation, plan: RecurringPlan) -> None:
         """Execute a single recurring plan."""
-        transaction = Transaction.create(
-            amount=plan.amount,
-            note=f"{plan.title}{NOTE_AUTO_SUFFIX}",
-            transaction_type=TRANSACTION_RECURRING,
-            plan_id=plan.id,
+        account = mutation.account
+        mutation.add_transaction(
+            Transaction.create(
+                amount=plan.amount,
+                note=f"{plan.title}{NOTE_AUTO_SUFFIX}",
+                transaction_type=TRANSACTION_RECURRING,
+                plan_id=plan.id,
+            )
+        )
+        account.update_recurring_plan(
+            plan.id,
+            last_executed=dt_util.now().isoformat(),
+            next_date=self._calculate_next_date(
+                plan, dt_util.now().date() + timedelta(days=1)
+            ).isoformat(),
         )
-        account.add_transaction(transaction, max_transactions=DEFAULT_MAX_TRANSACTIONS)
-        plan.last_executed = dt_util.now().isoformat()
-        plan.next_date = self._calculate_next_date(
-            plan, dt_util.now().date() + timedelta(days=1)
-        ).isoformat()
 
         # Fire event
-        self.hass.bus.async_fire(
+        mutation.fire(
             EVENT_RECURRING_EXECUTED,
             {
                 "account": account.id,
@@ -150,9 +230,6 @@ class FinanceCoordinator(DataUpdateCoordinator[FinanceData]):
             plan.amount,
         )
 
-        # Check for low balance after recurring execution
-        self._check_low_balance(account)
-
     def _calculate_next_date(
         self, plan: RecurringPlan, from_date: date
     ) -> date:
@@ -195,10 +272,28 @@ class FinanceCoordinator(DataUpdateCoordinator[FinanceData]):
 
         return from_date
 
-    def _check_low_balance(self, account: Account) -> None:
-        """Check and fire low balance event if needed."""
-        if account.balance < self._low_balance_threshold:
-            self.hass.bus.async_fire(
+    def update_low_balance_alert(self, account: Account) -> str | None:
+        """Advance the low balance alert state after a balance change.
+
+        Called by the index stage of the mutation pipeline, so the new state
+        is saved with the change. Returns "entered" or "cleared" when an
+        event is due; the notify stage passes it to async_fire_low_balance.
+        """
+        alert, change = account.low_balance_alert.transition(
+            account.balance,
+            self._low_balance_threshold,
+            self._low_balance_recovery,
+            dt_util.now(),
+            LOW_BALANCE_ALERT_COOLDOWN,
+        )
+        if alert != account.low_balance_alert:
+            account.low_balance_alert = alert
+        return change
+
+    def async_fire_low_balance(self, account: Account, change: str | None) -> None:
+        """Queue the event for a low balance alert state change."""
+        if change == "entered":
+            self.events.async_fire(
                 EVENT_LOW_BALANCE,
                 {
                     "account": account.id,
@@ -212,80 +307,74 @@ class FinanceCoordinator(DataUpdateCoordinator[FinanceData]):
                 account.balance,
                 self._low_balance_threshold,
             )
+        elif change == "cleared":
+            self.events.async_fire(
+                EVENT_LOW_BALANCE_CLEARED,
+                {
+                    "account": account.id,
+                    "balance": account.balance,
+                    "threshold": self._low_balance_recovery,
+                },
+            )
+            _LOGGER.info(
+                "Low balance alert cleared for account %s: %s (recovery: %s)",
+                account.id,
+                account.balance,
+                self._low_balance_recovery,
+            )
 
     # Account operations
     async def async_add_transaction(
-        self, amount: float, note: str, transaction_type: str = "manual"
-    ) -> Transaction | None:
-        """Add a transaction to the account."""
-        account = self.account
-        if account is None:
-            return None
-
-        transaction = Transaction.create(
-            amount=amount,
-            note=note,
-            transaction_type=transaction_type,
-        )
-        account.add_transaction(transaction, max_transactions=DEFAULT_MAX_TRANSACTIONS)
-        await self.store.async_save()
-
-        # Fire event
-        self.hass.bus.async_fire(
-            EVENT_TRANSACTION_ADDED,
-            {
-                "account": account.id,
-                "amount": amount,
-                "note": note,
-                "type": transaction_type,
-            },
+        self,
+        amount: float,
+        note: str,
+        transaction_type: str = TRANSACTION_MANUAL,
+        category: str | None = None,
+        tags: Iterable[str] = (),
+    ) -> Transaction:
+        """Add a transaction to the account.
+
+        Without a category the transaction is classified by the rules.
+        """
+        return await self.hub.pipeline.async_execute(
+            self._account_id,
+            partial(
+                record_transaction,
+                amount=amount,
+                note=note,
+                transaction_type=transaction_type,
+                category=category,
+                tags=tags,
+            ),
         )
 
-        # Check for low balance
-        self._check_low_balance(account)
-
-        await self.async_refresh()
-        return transaction
-
     async def async_adjust_balance(self, new_balance: float) -> None:
         """Adjust the account balance."""
-        account = self.account
-        if account is None:
-            return
-
-        old_balance = account.balance
-        diff = new_balance - old_balance
-
-        if diff != 0:
-            transaction = Transaction.create(
-                amount=diff,
-                note=NOTE_BALANCE_ADJUSTMENT,
-                transaction_type=TRANSACTION_ADJUSTMENT,
-            )
-            account.transactions.append(transaction)
-
-            # Trim transactions if needed
-            if len(account.transactions) > DEFAULT_MAX_TRANSACTIONS:
-                account.transactions = account.transactions[-DEFAULT_MAX_TRANSACTIONS:]
 
-            account.balance = new_balance
-            await self.store.async_save()
-
-            # Fire event
-            self.hass.bus.async_fire(
+        def adjust(mutation: Mutation) -> None:
+            old_balance = mutation.account.balance
+            diff = new_balance - old_balance
+            if diff == 0:
+                return
+
+            mutation.add_transaction(
+                Transaction.create(
+                    amount=diff,
+                    note=NOTE_BALANCE_ADJUSTMENT,
+                    transaction_type=TRANSACTION_ADJUSTMENT,
+                )
+            )
+            mutation.fire(
                 EVENT_BALANCE_ADJUSTED,
                 {
-                    "account": account.id,
+                    "account": self._account_id,
                     "old_balance": old_balance,
                     "new_balance": new_balance,
                     "diff": diff,
                 },
             )
 
-            # Check for low balance
-            self._check_low_balance(account)
-
-            await self.async_refresh()
+        await self.hub.pipeline.async_execute(self._account_id, adjust)
 
     # Recurring plan operations
     async def async_add_recurring_plan(
@@ -299,10 +388,6 @@ class FinanceCoordinator(DataUpdateCoordinator[FinanceData]):
         active: bool = True,
     ) -> None:
         """Add a recurring plan."""
-        account = self.account
-        if account is None:
-            return
-
         plan = RecurringPlan(
             id=plan_id,
             title=title,
@@ -312,53 +397,57 @@ class FinanceCoordinator(DataUpdateCoordinator[FinanceData]):
             month=month,
             active=active,
         )
-        plan.next_date = self._calculate_next_date(
-            plan, dt_util.now().date()
-        ).isoformat()
+        plan = replace(
+            plan,
+            next_date=self._calculate_next_date(
+                plan, dt_util.now().date()
+            ).isoformat(),
+        )
 
-        account.add_recurring_plan(plan)
-        await self.store.async_save()
-        await self.async_refresh()
+        await self.hub.pipeline.async_execute(
+            self._account_id,
+            lambda mutation: mutation.account.add_recurring_plan(plan),
+        )
 
     async def async_update_recurring_plan(
         self, plan_id: str, **kwargs: Any
     ) -> None:
         """Update a recurring plan."""
-        account = self.account
-        if account is None:
-            return
 
-        plan = account.recurring_plans.get(plan_id)
-        if plan is None:
-            return
+        def update(mutation: Mutation) -> None:
+            account = mutation.account
+            plan = account.recurring_plans.get(plan_id)
+            if plan is None:
+                raise MutationError("not_found", "Plan not found")
+
+            plan = replace(
+                plan,
+                **{key: value for key, value in kwargs.items() if hasattr(plan, key)},
+            )
 
-        for key, value in kwargs.items():
-            if hasattr(plan, key):
-                setattr(plan, key, value)
+            # Recalculate next_date if frequency, day, or month changed
+            if "frequency" in kwargs or "day" in kwargs or "month" in kwargs:
+                plan = replace(
+                    plan,
+                    next_date=self._calculate_next_date(
+                        plan, dt_util.now().date()
+                    ).isoformat(),
+                )
 
-        # Recalculate next_date if frequency, day, or month changed
-        if "frequency" in kwargs or "day" in kwargs or "month" in kwargs:
-            plan.next_date = self._calculate_next_date(
-                plan, dt_util.now().date()
-            ).isoformat()
+            account.add_recurring_plan(plan)
 
-        await self.store.async_save()
-        await self.async_refresh()
+        await self.hub.pipeline.async_execute(self._account_id, update)
 
     async def async_remove_recurring_plan(self, plan_id: str) -> None:
         """Remove a recurring plan."""
-        account = self.account
-        if account is None:
-            return
-
-        account.remove_recurring_plan(plan_id)
-        await self.store.async_save()
+        await self.hub.pipeline.async_execute(
+            self._account_id,
+            lambda mutation: mutation.account.remove_recurring_plan(plan_id),
+        )
 
         # Clean up associated entities from entity registry
         await self._async_cleanup_plan_entities(plan_id)
 
-        await self.async_refresh()
-
     async def _async_cleanup_plan_entities(self, plan_id: str) -> None:
         """Remove entities associated with a deleted recurring plan."""
         entity_registry = er.async_get(self.hass)
@@ -373,6 +462,8 @@ class FinanceCoordinator(DataUpdateCoordinator[FinanceData]):
             "_active",      # PlanActiveSwitch
             "_next_date",   # PlanNextDateSensor
             "_last_executed",  # PlanLastExecutedSensor
+            "_total",       # PlanTotalSensor
+            "_count",       # PlanCountSensor
         ]
 
         for suffix in entity_suffixes:
@@ -395,6 +486,8 @@ class FinanceCoordinator(DataUpdateCoordinator[FinanceData]):
             "_active": "switch",
             "_next_date": "sensor",
             "_last_executed": "sensor",
+            "_total": "sensor",
+            "_count": "sensor",
         }
         return platform_map.get(suffix, "sensor")
 
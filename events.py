@@ -0,0 +1,86 @@
+"""Batched event emission for Ha Finance Record."""
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DOMAIN, EVENT_BATCH
+
+
+class EventBatcher:
+    """Collects the events of one account and fires them as a single event.
+
+    Events are queued and fired together as one ha_finance_batch event,
+    either once the window has passed since the first queued event or when
+    the enclosing batch() block ends. Its data is the account, the count
+    and "events", a list holding the data of each event without the
+    account plus "event", its type without the domain prefix (for example
+    "transaction_added").
+    With per_item set, every event is also fired on its own right away.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        account_id: str,
+        window: float,
+        per_item: bool = False,
+    ) -> None:
+        """Initialize the batcher."""
+        self.hass = hass
+        self.account_id = account_id
+        self.window = window
+        self.per_item = per_item
+        self._pending: list[dict[str, Any]] = []
+        self._depth = 0
+        self._unsub_flush: Callable[[], None] | None = None
+
+    @callback
+    def async_fire(self, event_type: str, data: dict[str, Any]) -> None:
+        """Queue an event of this account."""
+        if self.per_item:
+            self.hass.bus.async_fire(event_type, data)
+        item = {key: value for key, value in data.items() if key != "account"}
+        item["event"] = event_type.removeprefix(f"{DOMAIN}_")
+        self._pending.append(item)
+        if self._depth == 0 and self._unsub_flush is None:
+            self._unsub_flush = async_call_later(
+                self.hass, self.window, self._async_flush_later
+            )
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Collect the events queued inside the block into one batch event."""
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                self.async_flush()
+
+    @callback
+    def _async_flush_later(self, now: datetime) -> None:
+        """Fire the pending events once the window has passed."""
+        self._unsub_flush = None
+        if self._depth == 0:
+            self.async_flush()
+
+    @callback
+    def async_flush(self) -> None:
+        """Fire the pending events now."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        if not self._pending:
+            return
+        events, self._pending = self._pending, []
+        self.hass.bus.async_fire(
+            EVENT_BATCH,
+            {"account": self.account_id, "count": len(events), "events": events},
+        )
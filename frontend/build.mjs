@@ -0,0 +1,55 @@
+// Builds the panel bundle served by the integration.
+//
+// Bundles src/ha-finance-panel.js with its dependencies into a single
+// minified module named after a hash of its contents, writes gzip and
+// brotli variants next to it and records the file name in
+// dist/manifest.json, which panel.py reads to build the module URL.
+// Run with `npm run build` after changing the panel source.
+
+import { createHash } from "node:crypto";
+import { mkdir, readdir, rm, writeFile } from "node:fs/promises";
+import { promisify } from "node:util";
+import { brotliCompress, constants, gzip } from "node:zlib";
+import { build } from "esbuild";
+
+const ENTRY = "ha-finance-panel.js";
+const OUT_DIR = new URL("./dist/", import.meta.url);
+
+const result = await build({
+  entryPoints: [new URL(`./src/${ENTRY}`, import.meta.url).pathname],
+  bundle: true,
+  format: "esm",
+  target: "es2021",
+  minify: true,
+  legalComments: "eof",
+  write: false,
+});
+const code = result.outputFiles[0].contents;
+
+const hash = createHash("sha256").update(code).digest("hex").slice(0, 12);
+const fileName = ENTRY.replace(/\.js$/, `-${hash}.js`);
+
+await rm(OUT_DIR, { recursive: true, force: true });
+await mkdir(OUT_DIR, { recursive: true });
+await writeFile(new URL(fileName, OUT_DIR), code);
+await writeFile(
+  new URL(`${fileName}.gz`, OUT_DIR),
+  await promisify(gzip)(code, { level: 9 })
+);
+await writeFile(
+  new URL(`${fileName}.br`, OUT_DIR),
+  await promisify(brotliCompress)(code, {
+    params: {
+      [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY,
+      [constants.BROTLI_PARAM_SIZE_HINT]: code.length,
+    },
+  })
+);
+await writeFile(
+  new URL("manifest.json", OUT_DIR),
+  `${JSON.stringify({ [ENTRY]: fileName }, null, 2)}\n`
+);
+
+for (const name of (await readdir(OUT_DIR)).sort()) {
+  console.log(`dist/${name}`);
+}
@@ -3,7 +3,7 @@ import {
   html,
   css,
   unsafeCSS,
-} from "https://unpkg.com/lit-element@3.3.3/lit-element.js?module";
+} from "lit-element";
 
 // Inlined shared styles for HA panel compatibility - Dark/Light theme aware
 const sharedStylesLit = `
@@ -202,6 +202,48 @@ const commonTranslations = {
   'zh-Hant': { menu: '選單', search: '搜尋...', add: '新增', more_actions: '更多操作' },
   'zh-Hans': { menu: '菜单', search: '搜索...', add: '添加', more_actions: '更多操作' },
 };
+// Long lists only render the rows in view; every row has this fixed height
+const VIRTUAL_ROW_HEIGHT = 48;
+// Rows rendered above and below the visible window
+const VIRTUAL_OVERSCAN = 10;
+
+// Account responses (per account and date range) kept for conditional fetches
+const ACCOUNT_CACHE_SIZE = 8;
+
+// Search results fetched per page
+const SEARCH_PAGE_SIZE = 50;
+
+// Periods shown in the chart per granularity
+const CHART_PERIODS = { day: 14, week: 12, month: 6, year: 5 };
+
+// Numeric sort key of a record in epoch seconds, as sent by the server
+function recordSortKey(record) {
+  return record.ts ?? Date.parse(record.timestamp) / 1000;
+}
+
+// Rebuild transaction dicts from the columnar wire format: parallel arrays
+// per field, dictionary-encoded fields and "ts" as deltas to the row before
+function decodeColumns(table) {
+  const { count, columns, dictionaries } = table;
+  const fields = Object.keys(columns);
+  const rows = new Array(count);
+  let ts = 0;
+  for (let i = 0; i < count; i++) {
+    const row = {};
+    for (const field of fields) {
+      const value = columns[field][i];
+      row[field] = field in dictionaries ? dictionaries[field][value] : value;
+    }
+    if ("ts" in row) {
+      ts += row.ts;
+      row.ts = ts;
+      row.timestamp = new Date(ts * 1000).toISOString();
+    }
+    rows[i] = row;
+  }
+  return rows;
+}
+
 function getCommonTranslation(key, lang = 'en') {
   const langKey = lang?.startsWith('zh-TW') || lang?.startsWith('zh-HK') ? 'zh-Hant' :
                   lang?.startsWith('zh') ? 'zh-Hans' : 'en';
@@ -221,9 +263,13 @@ class HaFinancePanel extends LitElement {
       _loading: { type: Boolean },
       _error: { type: String },
       _chartData: { type: Array },
+      _chartGranularity: { type: String },
       _filterType: { type: String },
       _filterDateStart: { type: String },
       _filterDateEnd: { type: String },
+      _rangeTransactions: { type: Array },
+      _searchResults: { type: Array },
+      _searchTotal: { type: Number },
       _showTransactionForm: { type: Boolean },
       _showPlanForm: { type: Boolean },
       _editingTransaction: { type: Object },
@@ -240,6 +286,7 @@ class HaFinancePanel extends LitElement {
       _allRecordsFilterDateEnd: { type: String },
       _showBalanceAdjustForm: { type: Boolean },
       _editingAccountNotes: { type: String },
+      _virtualViewport: { type: Object },
     };
   }
 
@@ -504,6 +551,37 @@ class HaFinancePanel extends LitElement {
         color: var(--primary-text-color);
       }
 
+      .virtual-scroll {
+        max-height: 70vh;
+        overflow-y: auto;
+        -webkit-overflow-scrolling: touch;
+      }
+
+      .virtual-scroll th {
+        position: sticky;
+        top: 0;
+        z-index: 1;
+        background: var(--card-background-color, var(--primary-background-color));
+      }
+
+      .virtual-scroll tbody tr {
+        height: ${VIRTUAL_ROW_HEIGHT}px;
+      }
+
+      .virtual-scroll td {
+        padding-top: 0;
+        padding-bottom: 0;
+        white-space: nowrap;
+        overflow: hidden;
+        text-overflow: ellipsis;
+        max-width: 240px;
+      }
+
+      .virtual-spacer td {
+        padding: 0;
+        border: none;
+      }
+
       .amount-positive {
         color: var(--success-color, #4caf50);
       }
@@ -1010,9 +1088,14 @@ class HaFinancePanel extends LitElement {
     this._loading = true;
     this._error = "";
     this._chartData = [];
+    this._chartGranularity = "month";
     this._filterType = "all";
     this._filterDateStart = "";
     this._filterDateEnd = "";
+    this._rangeTransactions = null;
+    this._searchResults = null;
+    this._searchTotal = 0;
+    this._searchTimer = null;
     this._showTransactionForm = false;
     this._showPlanForm = false;
     this._editingTransaction = null;
@@ -1029,6 +1112,11 @@ class HaFinancePanel extends LitElement {
     this._allRecordsFilterDateEnd = "";
     this._showBalanceAdjustForm = false;
     this._editingAccountNotes = "";
+    this._virtualViewport = { top: 0, height: 800 };
+    this._virtualFrame = null;
+    this._memo = {};
+    this._accountCache = new Map();
+    this._chartCache = new Map();
   }
 
   connectedCallback() {
@@ -1060,11 +1148,9 @@ class HaFinancePanel extends LitElement {
 
     this._loading = true;
     try {
-      const result = await this.hass.callWS({
-        type: "ha_finance/account",
-        account_id: this._selectedAccountId,
-      });
-      this._selectedAccount = result.account;
+      this._selectedAccount = await this._fetchAccount(this._selectedAccountId);
+      await this._loadRangeTransactions();
+      await this._loadSearchResults();
       await this._loadChartData();
     } catch (err) {
       this._error = err.message || "Failed to load account details";
@@ -1073,16 +1159,131 @@ class HaFinancePanel extends LitElement {
     }
   }
 
+  async _loadRangeTransactions() {
+    // Date filtering is answered by the server from its timestamp index
+    if (!this._selectedAccountId || (!this._filterDateStart && !this._filterDateEnd)) {
+      this._rangeTransactions = null;
+      return;
+    }
+
+    try {
+      const account = await this._fetchAccount(
+        this._selectedAccountId,
+        this._filterDateStart,
+        this._filterDateEnd
+      );
+      this._rangeTransactions = account.transactions;
+    } catch (err) {
+      this._error = err.message || "Failed to load transactions";
+      this._rangeTransactions = null;
+    }
+  }
+
+  async _fetchAccount(accountId, startDate = "", endDate = "") {
+    // Send the version of the cached response, so the server answers with
+    // "not modified" or just the transactions changed since
+    const key = `${accountId}|${startDate}|${endDate}`;
+    const cached = this._accountCache.get(key);
+    const query = { type: "ha_finance/account", account_id: accountId, format: "columns" };
+    if (startDate) query.start_date = startDate;
+    if (endDate) query.end_date = endDate;
+    if (cached) query.since_version = cached.version;
+
+    const result = await this.hass.callWS(query);
+    if (result.not_modified) return cached.account;
+
+    let account = {
+      ...result.account,
+      transactions: decodeColumns(result.account.transactions),
+    };
+    if (result.delta) {
+      const changed = new Map(account.transactions.map((tx) => [tx.id, tx]));
+      const removed = new Set(result.removed);
+      const transactions = [];
+      for (const tx of cached.account.transactions) {
+        if (removed.has(tx.id)) continue;
+        transactions.push(changed.get(tx.id) || tx);
+        changed.delete(tx.id);
+      }
+      transactions.push(...changed.values());
+      // Date range responses are sorted by timestamp, full ones by insertion
+      if (startDate || endDate) {
+        transactions.sort((a, b) => recordSortKey(a) - recordSortKey(b));
+      }
+      account = { ...account, transactions };
+    }
+
+    this._accountCache.delete(key);
+    this._accountCache.set(key, { version: result.version, account });
+    if (this._accountCache.size > ACCOUNT_CACHE_SIZE) {
+      this._accountCache.delete(this._accountCache.keys().next().value);
+    }
+    return account;
+  }
+
+  _onFilterDateChange(field, value) {
+    this[field] = value;
+    this._loadRangeTransactions();
+    this._loadSearchResults();
+  }
+
+  async _loadSearchResults(more = false) {
+    // Note search is answered by the server from its full-text index, a page at a time
+    const query = this._searchQuery.trim();
+    if (!this._selectedAccountId || !query) {
+      this._searchResults = null;
+      return;
+    }
+
+    const offset = more && this._searchResults ? this._searchResults.length : 0;
+    const request = {
+      type: "ha_finance/search",
+      account_id: this._selectedAccountId,
+      query,
+      offset,
+      limit: SEARCH_PAGE_SIZE,
+      format: "columns",
+    };
+    if (this._filterDateStart) request.start_date = this._filterDateStart;
+    if (this._filterDateEnd) request.end_date = this._filterDateEnd;
+
+    try {
+      const result = await this.hass.callWS(request);
+      // Ignore responses for a query or page that has since changed
+      const current = offset ? this._searchResults?.length : 0;
+      if (query === this._searchQuery.trim() && current === offset) {
+        const page = decodeColumns(result.results);
+        this._searchResults = offset ? [...this._searchResults, ...page] : page;
+        this._searchTotal = result.total;
+      }
+    } catch (err) {
+      if (!offset) this._searchResults = null;
+    }
+  }
+
   async _loadChartData() {
     if (!this._selectedAccountId) return;
 
     this._chartError = "";
+    const accountId = this._selectedAccountId;
+    const count = CHART_PERIODS[this._chartGranularity];
+    // A cached version only answers the same granularity and count
+    const key = `${accountId}|${this._chartGranularity}|${count}`;
+    const cached = this._chartCache.get(key);
+    const query = {
+      type: "ha_finance/chart_data",
+      account_id: accountId,
+      granularity: this._chartGranularity,
+      count,
+    };
+    if (cached) query.since_version = cached.version;
     try {
-      const result = await this.hass.callWS({
-        type: "ha_finance/chart_data",
-        account_id: this._selectedAccountId,
-        months: 6,
-      });
+      const result = await this.hass.callWS(query);
+      if (result.not_modified) {
+        this._chartData = cached.data;
+        return;
+      }
+      this._chartCache.set(key, { version: result.version, data: result.data });
       this._chartData = result.data;
     } catch (err) {
       console.error("Failed to load chart data:", err);
@@ -1103,6 +1304,51 @@ class HaFinancePanel extends LitElement {
 
   _onTabChange(tab) {
     this._activeTab = tab;
+    this._virtualViewport = { ...this._virtualViewport, top: 0 };
+  }
+
+  _memoize(name, deps, compute) {
+    // Recompute only when one of the inputs changed (compared by identity)
+    const cached = this._memo[name];
+    if (cached && cached.deps.every((dep, i) => dep === deps[i])) {
+      return cached.value;
+    }
+    const value = compute();
+    this._memo[name] = { deps, value };
+    return value;
+  }
+
+  _onVirtualScroll(e) {
+    const target = e.currentTarget;
+    if (this._virtualFrame) return;
+    this._virtualFrame = requestAnimationFrame(() => {
+      this._virtualFrame = null;
+      this._virtualViewport = { top: target.scrollTop, height: target.clientHeight };
+    });
+  }
+
+  _renderVirtualRows(rows, columns, renderRow) {
+    // Spacer rows stand in for the rows outside the visible window
+    const { top, height } = this._virtualViewport;
+    const first = Math.min(
+      rows.length,
+      Math.max(0, Math.floor(top / VIRTUAL_ROW_HEIGHT) - VIRTUAL_OVERSCAN)
+    );
+    const last = Math.min(
+      rows.length,
+      Math.ceil((top + height) / VIRTUAL_ROW_HEIGHT) + VIRTUAL_OVERSCAN
+    );
+    const spacer = (count) =>
+      count > 0
+        ? html`<tr class="virtual-spacer" style="height: ${count * VIRTUAL_ROW_HEIGHT}px">
+            <td colspan=${columns}></td>
+          </tr>`
+        : "";
+    return html`
+      ${spacer(first)}
+      ${rows.slice(first, Math.max(first, last)).map(renderRow)}
+      ${spacer(rows.length - Math.max(first, last))}
+    `;
   }
 
   _getTranslation(key) {
@@ -1118,6 +1364,8 @@ class HaFinancePanel extends LitElement {
         add_plan: "Add Plan",
         amount: "Amount",
         note: "Note",
+        category: "Category",
+        category_auto: "Auto",
         type: "Type",
         date: "Date",
         filter: "Filter",
@@ -1140,7 +1388,10 @@ class HaFinancePanel extends LitElement {
         delete: "Delete",
         edit: "Edit",
         next_date: "Next",
+        posted: "Posted",
+        plan_total: "Total",
         no_transactions: "No transactions yet",
+        load_more: "Load more",
         no_plans: "No recurring plans yet",
         no_data: "No chart data available",
         select_account: "Select account",
@@ -1163,6 +1414,7 @@ class HaFinancePanel extends LitElement {
         new_balance: "New Balance",
         start_date: "Start Date",
         end_date: "End Date",
+        balance_after: "Balance After",
       },
       "zh-Hant": {
         panel_title: "財務記錄",
@@ -1175,6 +1427,8 @@ class HaFinancePanel extends LitElement {
         add_plan: "新增項目",
         amount: "金額",
         note: "備註",
+        category: "分類",
+        category_auto: "自動",
         type: "類型",
         date: "日期",
         filter: "篩選",
@@ -1197,7 +1451,10 @@ class HaFinancePanel extends LitElement {
         delete: "刪除",
         edit: "編輯",
         next_date: "下次",
+        posted: "已執行",
+        plan_total: "累計",
         no_transactions: "尚無交易記錄",
+        load_more: "載入更多",
         no_plans: "尚無定期項目",
         no_data: "無圖表資料",
         select_account: "選擇帳戶",
@@ -1220,6 +1477,7 @@ class HaFinancePanel extends LitElement {
         new_balance: "調整後餘額",
         start_date: "開始日期",
         end_date: "結束日期",
+        balance_after: "結餘",
       },
     };
 
@@ -1245,31 +1503,40 @@ class HaFinancePanel extends LitElement {
   }
 
   _getFilteredTransactions() {
-    if (!this._selectedAccount?.transactions) return [];
+    return this._memoize(
+      "transactions",
+      [
+        this._selectedAccount,
+        this._rangeTransactions,
+        this._searchResults,
+        this._searchQuery,
+        this._filterType,
+      ],
+      () => this._filterTransactions()
+    );
+  }
 
-    let transactions = [...this._selectedAccount.transactions].reverse();
+  _filterTransactions() {
+    if (!this._selectedAccount?.transactions) return [];
 
-    if (this._filterType && this._filterType !== "all") {
-      transactions = transactions.filter((tx) => tx.type === this._filterType);
-    }
+    const searching = this._searchQuery && this._searchQuery.trim();
 
-    if (this._filterDateStart) {
-      const startDate = new Date(this._filterDateStart);
-      transactions = transactions.filter(
-        (tx) => new Date(tx.timestamp) >= startDate
-      );
+    // Search and date range results come pre-filtered from the server;
+    // search results are already ranked
+    let transactions;
+    if (searching && this._searchResults) {
+      transactions = [...this._searchResults];
+    } else {
+      const source = this._rangeTransactions ?? this._selectedAccount.transactions;
+      transactions = [...source].reverse();
     }
 
-    if (this._filterDateEnd) {
-      const endDate = new Date(this._filterDateEnd);
-      endDate.setHours(23, 59, 59, 999);
-      transactions = transactions.filter(
-        (tx) => new Date(tx.timestamp) <= endDate
-      );
+    if (this._filterType && this._filterType !== "all") {
+      transactions = transactions.filter((tx) => tx.type === this._filterType);
     }
 
-    // Search filter
-    if (this._searchQuery && this._searchQuery.trim()) {
+    // Filter client-side until the server results for the query arrive
+    if (searching && !this._searchResults) {
       const query = this._searchQuery.toLowerCase().trim();
       transactions = transactions.filter((tx) => {
         const note = (tx.note || "").toLowerCase();
@@ -1296,6 +1563,8 @@ class HaFinancePanel extends LitElement {
     const form = e.target;
     const amount = parseFloat(form.amount.value);
     const note = form.note.value;
+    // An empty category lets the server classify by its rules
+    const category = form.category.value.trim() || null;
 
     try {
       if (this._editingTransaction) {
@@ -1305,6 +1574,7 @@ class HaFinancePanel extends LitElement {
           transaction_id: this._editingTransaction.id,
           amount,
           note,
+          category,
         });
       } else {
         await this.hass.callWS({
@@ -1312,6 +1582,7 @@ class HaFinancePanel extends LitElement {
           account_id: this._selectedAccountId,
           amount,
           note,
+          category,
         });
       }
       this._closeTransactionForm();
@@ -1415,6 +1686,9 @@ class HaFinancePanel extends LitElement {
 
   _onSearchInput(e) {
     this._searchQuery = e.target.value;
+    this._searchResults = null;
+    clearTimeout(this._searchTimer);
+    this._searchTimer = setTimeout(() => this._loadSearchResults(), 250);
   }
 
   render() {
@@ -1583,14 +1857,14 @@ class HaFinancePanel extends LitElement {
           <input
             type="date"
             placeholder="${this._getTranslation("start_date")}"
-            @change=${(e) => (this._filterDateStart = e.target.value)}
+            @change=${(e) => this._onFilterDateChange("_filterDateStart", e.target.value)}
             .value=${this._filterDateStart}
           />
           <span class="date-separator">-</span>
           <input
             type="date"
             placeholder="${this._getTranslation("end_date")}"
-            @change=${(e) => (this._filterDateEnd = e.target.value)}
+            @change=${(e) => this._onFilterDateChange("_filterDateEnd", e.target.value)}
             .value=${this._filterDateEnd}
           />
         </div>
@@ -1599,25 +1873,32 @@ class HaFinancePanel extends LitElement {
       ${transactions.length === 0
         ? html`<div class="empty-state">${this._getTranslation("no_transactions")}</div>`
         : html`
+            <div class="virtual-scroll" @scroll=${this._onVirtualScroll}>
             <table>
               <thead>
                 <tr>
                   <th>${this._getTranslation("date")}</th>
                   <th>${this._getTranslation("amount")}</th>
+                  <th>${this._getTranslation("balance_after")}</th>
                   <th>${this._getTranslation("note")}</th>
+                  <th>${this._getTranslation("category")}</th>
                   <th>${this._getTranslation("type")}</th>
                   <th></th>
                 </tr>
               </thead>
               <tbody>
-                ${transactions.map(
+                ${this._renderVirtualRows(
+                  transactions,
+                  7,
                   (tx) => html`
                     <tr>
                       <td>${this._formatDate(tx.timestamp)}</td>
                       <td class=${tx.amount >= 0 ? "amount-positive" : "amount-negative"}>
                         ${tx.amount >= 0 ? "+" : ""}${this._formatCurrency(tx.amount)}
                       </td>
+                      <td>${tx.running_balance !== undefined ? this._formatCurrency(tx.running_balance) : "-"}</td>
                       <td>${tx.note || "-"}</td>
+                      <td>${tx.category || "-"}</td>
                       <td>${this._getTranslation(tx.type)}</td>
                       <td class="actions">
                         <button
@@ -1638,8 +1919,22 @@ class HaFinancePanel extends LitElement {
                 )}
               </tbody>
             </table>
+            </div>
           `}
 
+      ${this._searchQuery.trim() &&
+      this._searchResults &&
+      this._searchResults.length < this._searchTotal
+        ? html`
+            <button
+              class="btn btn-secondary"
+              @click=${() => this._loadSearchResults(true)}
+            >
+              ${this._getTranslation("load_more")}
+            </button>
+          `
+        : ""}
+
       <button
         class="btn btn-primary add-button"
         @click=${() => this._openTransactionForm()}
@@ -1650,6 +1945,74 @@ class HaFinancePanel extends LitElement {
   }
 
   _renderAllRecords() {
+    const allRecords = this._memoize(
+      "all_records",
+      [
+        this._selectedAccount,
+        this._allRecordsFilterDateStart,
+        this._allRecordsFilterDateEnd,
+        this._searchQuery,
+        this.hass?.language,
+      ],
+      () => this._buildAllRecords()
+    );
+
+    return html`
+      <div class="filter-bar">
+        <div class="date-range">
+          <input
+            type="date"
+            placeholder="${this._getTranslation("start_date")}"
+            @change=${(e) => (this._allRecordsFilterDateStart = e.target.value)}
+            .value=${this._allRecordsFilterDateStart}
+          />
+          <span class="date-separator">-</span>
+          <input
+            type="date"
+            placeholder="${this._getTranslation("end_date")}"
+            @change=${(e) => (this._allRecordsFilterDateEnd = e.target.value)}
+            .value=${this._allRecordsFilterDateEnd}
+          />
+        </div>
+      </div>
+      ${allRecords.length === 0
+        ? html`<div class="empty-state">${this._getTranslation("no_transactions")}</div>`
+        : html`
+            <div class="virtual-scroll" @scroll=${this._onVirtualScroll}>
+            <table>
+              <thead>
+                <tr>
+                  <th>${this._getTranslation("date")}</th>
+                  <th>${this._getTranslation("amount")}</th>
+                  <th>${this._getTranslation("note")}</th>
+                  <th>${this._getTranslation("type")}</th>
+                </tr>
+              </thead>
+              <tbody>
+                ${this._renderVirtualRows(
+                  allRecords,
+                  4,
+                  (record) => html`
+                    <tr class="${record.recordType === 'plan_summary' ? 'plan-row' : ''}">
+                      <td>${this._formatDate(record.timestamp)}</td>
+                      <td class=${record.amount >= 0 ? "amount-positive" : "amount-negative"}>
+                        ${record.amount >= 0 ? "+" : ""}${this._formatCurrency(record.amount)}
+                      </td>
+                      <td>${record.note || record.title || "-"}</td>
+                      <td>
+                        <span class="type-badge ${record.recordType}">${record.displayType}</span>
+                      </td>
+                    </tr>
+                  `
+                )}
+              </tbody>
+            </table>
+            </div>
+          `}
+    `;
+  }
+
+  _buildAllRecords() {
     // Combine transactions and recurring plan records
     const transactions = this._selectedAccount?.transactions || [];
     const plans = Object.entries(this._selectedAccount?.recurring_plans || {});
@@ -1659,9 +2022,11 @@ class HaFinancePanel extends LitElement {
       ...tx,
       recordType: 'transaction',
       displayType: this._getTranslation(tx.type),
+      sortKey: recordSortKey(tx),
     }));
 
     // Add plan info to display
+    const now = Date.now() / 1000;
     plans.forEach(([planId, plan]) => {
       // Add a summary row for each active plan
       if (plan.active) {
@@ -1674,28 +2039,26 @@ class HaFinancePanel extends LitElement {
           day: plan.day,
           next_date: plan.next_date,
           timestamp: plan.next_date || new Date().toISOString(),
+          sortKey: plan.next_ts ?? now,
           displayType: `${this._getTranslation("recurring")} - ${this._getTranslation(plan.frequency)}`,
         });
       }
     });
 
     // Sort by timestamp descending
-    allRecords.sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp));
+    allRecords.sort((a, b) => b.sortKey - a.sortKey);
 
     // Apply date filter for all records
     if (this._allRecordsFilterDateStart) {
-      const startDate = new Date(this._allRecordsFilterDateStart);
-      allRecords = allRecords.filter(
-        (record) => new Date(record.timestamp) >= startDate
-      );
+      const start = new Date(`${this._allRecordsFilterDateStart}T00:00:00`).getTime() / 1000;
+      allRecords = allRecords.filter((record) => record.sortKey >= start);
     }
 
     if (this._allRecordsFilterDateEnd) {
-      const endDate = new Date(this._allRecordsFilterDateEnd);
+      const endDate = new Date(`${this._allRecordsFilterDateEnd}T00:00:00`);
       endDate.setHours(23, 59, 59, 999);
-      allRecords = allRecords.filter(
-        (record) => new Date(record.timestamp) <= endDate
-      );
+      const end = endDate.getTime() / 1000;
+      allRecords = allRecords.filter((record) => record.sortKey <= end);
     }
 
     // Apply search filter
@@ -1709,55 +2072,7 @@ class HaFinancePanel extends LitElement {
       });
     }
 
-    return html`
-      <div class="filter-bar">
-        <div class="date-range">
-          <input
-            type="date"
-            placeholder="${this._getTranslation("start_date")}"
-            @change=${(e) => (this._allRecordsFilterDateStart = e.target.value)}
-            .value=${this._allRecordsFilterDateStart}
-          />
-          <span class="date-separator">-</span>
-          <input
-            type="date"
-            placeholder="${this._getTranslation("end_date")}"
-            @change=${(e) => (this._allRecordsFilterDateEnd = e.target.value)}
-            .value=${this._allRecordsFilterDateEnd}
-          />
-        </div>
-      </div>
-      ${allRecords.length === 0
-        ? html`<div class="empty-state">${this._getTranslation("no_transactions")}</div>`
-        : html`
-            <table>
-              <thead>
-                <tr>
-                  <th>${this._getTranslation("date")}</th>
-                  <th>${this._getTranslation("amount")}</th>
-                  <th>${this._getTranslation("note")}</th>
-                  <th>${this._getTranslation("type")}</th>
-                </tr>
-              </thead>
-              <tbody>
-                ${allRecords.map(
-                  (record) => html`
-                    <tr class="${record.recordType === 'plan_summary' ? 'plan-row' : ''}">
-                      <td>${this._formatDate(record.timestamp)}</td>
-                      <td class=${record.amount >= 0 ? "amount-positive" : "amount-negative"}>
-                        ${record.amount >= 0 ? "+" : ""}${this._formatCurrency(record.amount)}
-                      </td>
-                      <td>${record.note || record.title || "-"}</td>
-                      <td>
-                        <span class="type-badge ${record.recordType}">${record.displayType}</span>
-                      </td>
-                    </tr>
-                  `
-                )}
-              </tbody>
-            </table>
-          `}
-    `;
+    return allRecords;
   }
 
   _renderPlans() {
@@ -1780,6 +2095,10 @@ class HaFinancePanel extends LitElement {
                   ${this._getTranslation("day")}: ${plan.day} |
                   ${this._getTranslation("next_date")}: ${plan.next_date || "-"}
                 </div>
+                <div class="plan-details">
+                  ${this._getTranslation("posted")}: ${plan.count ?? 0} |
+                  ${this._getTranslation("plan_total")}: ${this._formatCurrency(plan.total ?? 0)}
+                </div>
                 <div class="actions" style="margin-top: 12px;">
                   <button
                     class="btn btn-secondary btn-small"
@@ -1970,13 +2289,34 @@ class HaFinancePanel extends LitElement {
     }
   }
 
+  _onChartGranularityChange(granularity) {
+    this._chartGranularity = granularity;
+    this._loadChartData();
+  }
+
   _renderCharts() {
+    const granularitySelect = html`
+      <div class="filter-bar">
+        <div class="filter-type-row">
+          <select
+            @change=${(e) => this._onChartGranularityChange(e.target.value)}
+            .value=${this._chartGranularity}
+          >
+            <option value="day">${this._getTranslation("daily")}</option>
+            <option value="week">${this._getTranslation("weekly")}</option>
+            <option value="month">${this._getTranslation("monthly")}</option>
+            <option value="year">${this._getTranslation("yearly")}</option>
+          </select>
+        </div>
+      </div>
+    `;
+
     if (this._chartError) {
-      return html`<div class="error">${this._chartError}</div>`;
+      return html`${granularitySelect}<div class="error">${this._chartError}</div>`;
     }
 
     if (this._chartData.length === 0) {
-      return html`<div class="empty-state">${this._getTranslation("no_data")}</div>`;
+      return html`${granularitySelect}<div class="empty-state">${this._getTranslation("no_data")}</div>`;
     }
 
     const maxValue = Math.max(
@@ -1985,6 +2325,7 @@ class HaFinancePanel extends LitElement {
     const scale = maxValue > 0 ? 180 / maxValue : 1;
 
     return html`
+      ${granularitySelect}
       <div class="chart-container">
         <div style="display: flex; justify-content: space-around; align-items: flex-end; height: 220px;">
           ${this._chartData.map(
@@ -2002,7 +2343,7 @@ class HaFinancePanel extends LitElement {
                     title="${this._getTranslation("expenses")}: ${this._formatCurrency(data.expenses)}"
                   ></div>
                 </div>
-                <div class="chart-label">${data.month}</div>
+                <div class="chart-label">${data.period}</div>
               </div>
             `
           )}
@@ -2047,6 +2388,15 @@ class HaFinancePanel extends LitElement {
                 .value=${tx?.note || ""}
               />
             </div>
+            <div class="form-group">
+              <label>${this._getTranslation("category")}</label>
+              <input
+                type="text"
+                name="category"
+                placeholder="${this._getTranslation("category_auto")}"
+                .value=${tx?.category || ""}
+              />
+            </div>
             <div class="form-actions">
               <button type="button" class="btn btn-secondary" @click=${this._closeTransactionForm}>
                 ${this._getTranslation("cancel")}
@@ -2232,11 +2582,18 @@ class HaFinancePanel extends LitElement {
   }
 
   async _deleteAccount() {
+    const accountId = this._selectedAccountId;
     try {
       await this.hass.callWS({
         type: "ha_finance/delete_account",
-        account_id: this._selectedAccountId,
+        account_id: accountId,
       });
+      for (const key of [...this._accountCache.keys()]) {
+        if (key.startsWith(`${accountId}|`)) this._accountCache.delete(key);
+      }
+      for (const key of [...this._chartCache.keys()]) {
+        if (key.startsWith(`${accountId}|`)) this._chartCache.delete(key);
+      }
       this._closeDeleteAccountForm();
       this._selectedAccountId = "";
       this._selectedAccount = null;
@@ -0,0 +1,528 @@
+"""Shared hub coordinating all accounts of the Ha Finance Record integration."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from functools import partial
+import logging
+from typing import TYPE_CHECKING, Any, Callable
+
+from homeassistant.const import EVENT_CORE_CONFIG_UPDATE, EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_change, async_track_time_interval
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_ACCOUNT_ID,
+    CONF_CURRENCY,
+    DEFAULT_CURRENCY,
+    DOMAIN,
+    EVENT_BUDGET_THRESHOLD,
+    HUB_KEY,
+    RESPONSE_CACHE_SIZE,
+)
+from .pipeline import (
+    STAGE_INDEX,
+    STAGE_NOTIFY,
+    Mutation,
+    MutationError,
+    MutationPipeline,
+)
+from .responses import ResponseCache
+from .store import FinanceStore
+
+if TYPE_CHECKING:
+    from .coordinator import FinanceCoordinator
+    from .models import Transaction
+
+_LOGGER = logging.getLogger(__name__)
+
+REFRESH_INTERVAL = timedelta(minutes=5)
+
+
+def _month_key(transaction: Transaction) -> str:
+    """Return the local YYYY-MM bucket of a transaction."""
+    return transaction.day.isoformat()[:7]
+
+
+class FinanceHub:
+    """Hub owning the shared timers and cross-account totals.
+
+    A single hub exists per Home Assistant instance. Every account has one
+    coordinator registered with the hub, which routes its changes; accounts
+    created in the panel get a coordinator without a config entry, which
+    lives until the account is deleted or Home Assistant stops. The
+    coordinators do not schedule their own refresh interval and midnight
+    tick, and the hub keeps net worth, the current local month's
+    income/expense and the month's net spending per category up to date
+    incrementally. When the configured time zone changes, it moves every
+    transaction to its new local date. The category totals back the budgets; a budget event is
+    fired when a change moves spending across one of its thresholds.
+
+    The hub owns the mutation pipeline and registers the stages keeping
+    the totals up to date and delivering events and data to the account
+    coordinators. It also holds the encoded WebSocket read responses shared
+    by all panel connections.
+
+    Changed hours of each account are collected and imported into the
+    recorder's long-term statistics on the refresh interval; the first
+    refresh backfills the retained history of every account.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the hub."""
+        self.hass = hass
+        self.store = FinanceStore(hass)
+        # Handler of each account, by account ID
+        self._coordinators: dict[str, FinanceCoordinator] = {}
+        # Coordinators without an entry replaced by that of a config entry
+        self._displaced: dict[str, FinanceCoordinator] = {}
+        self._listeners: list[Callable[[], None]] = []
+        self._unsub_refresh: Callable[[], None] | None = None
+        self._unsub_midnight: Callable[[], None] | None = None
+        self._unsub_config: Callable[[], None] | None = None
+        self._time_zone: str | None = None
+        self.aggregate_entry_id: str | None = None
+
+        self.net_worth: float = 0.0
+        self.monthly_income: float = 0.0
+        self.monthly_expense: float = 0.0
+        self.category_spent: dict[str, float] = {}
+        self._month: str = ""
+
+        self.pipeline = MutationPipeline(self.store)
+        self.pipeline.add_stage(STAGE_INDEX, self._async_index_mutation)
+        self.pipeline.add_stage(STAGE_NOTIFY, self._async_notify_mutation)
+        self.responses = ResponseCache(RESPONSE_CACHE_SIZE)
+        # Earliest changed epoch per account; None imports all history
+        self._statistics_pending: dict[str, int | None] = {}
+        self._statistics_backfilled = False
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_handle_stop)
+
+    @property
+    def month(self) -> str:
+        """Return the month (YYYY-MM) the monthly totals refer to."""
+        return self._month
+
+    # Coordinator registration
+    @callback
+    def async_register(self, coordinator: FinanceCoordinator) -> None:
+        """Register an account coordinator with the hub.
+
+        The coordinator of a config entry replaces the one created for the
+        account without an entry, which is reinstated when the entry
+        unloads while Home Assistant is running. The totals cover every stored account
+        and are kept up to date by the pipeline, so they are only built
+        on the first registration, or when the month rolled while no
+        coordinator was registered.
+        """
+        previous = self._coordinators.get(coordinator.account_id)
+        self._coordinators[coordinator.account_id] = coordinator
+        if previous is not None and previous is not coordinator:
+            previous.events.async_flush()
+            if previous.entry is None and coordinator.entry is not None:
+                self._displaced[coordinator.account_id] = previous
+        if self._unsub_refresh is None:
+            self._unsub_refresh = async_track_time_interval(
+                self.hass, self._async_handle_refresh, REFRESH_INTERVAL
+            )
+            self._unsub_midnight = async_track_time_change(
+                self.hass, self._async_handle_midnight, hour=0, minute=0, second=0
+            )
+            self._time_zone = self.hass.config.time_zone
+            self._unsub_config = self.hass.bus.async_listen(
+                EVENT_CORE_CONFIG_UPDATE, self._async_handle_config_update
+            )
+        if self._month != dt_util.now().strftime("%Y-%m"):
+            self.async_rebuild_totals()
+
+    @callback
+    def async_unregister(self, coordinator: FinanceCoordinator) -> None:
+        """Unregister an account coordinator from the hub."""
+        account_id = coordinator.account_id
+        if self._coordinators.get(account_id) is coordinator:
+            del self._coordinators[account_id]
+            displaced = self._displaced.pop(account_id, None)
+            if (
+                displaced is not None
+                and self.hass.is_running
+                and self.store.data.get_account(account_id) is not None
+            ):
+                # The account outlives its config entry until it is deleted
+                self._coordinators[account_id] = displaced
+                displaced.async_set_updated_data(self.store.data)
+        if not self._coordinators:
+            self.async_shutdown()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel the shared timers."""
+        if self._unsub_refresh:
+            self._unsub_refresh()
+            self._unsub_refresh = None
+        if self._unsub_midnight:
+            self._unsub_midnight()
+            self._unsub_midnight = None
+        if self._unsub_config:
+            self._unsub_config()
+            self._unsub_config = None
+
+    def get_coordinator(self, account_id: str) -> FinanceCoordinator | None:
+        """Get the coordinator registered for an account."""
+        return self._coordinators.get(account_id)
+
+    async def async_setup_account(self, account_id: str) -> FinanceCoordinator:
+        """Get the coordinator of an account, creating one without an entry."""
+        coordinator = self._coordinators.get(account_id)
+        if coordinator is None:
+            # Imported here as the coordinator module imports the hub
+            from .coordinator import FinanceCoordinator
+
+            coordinator = FinanceCoordinator(self.hass, None, account_id)
+            await coordinator.async_setup()
+        return coordinator
+
+    async def async_setup_accounts(self) -> None:
+        """Set up the coordinators of the stored accounts without an entry."""
+        entry_accounts = {
+            entry.data.get(CONF_ACCOUNT_ID)
+            for entry in self.hass.config_entries.async_entries(DOMAIN)
+        }
+        data = await self.store.async_load()
+        for account_id in list(data.accounts):
+            if account_id not in entry_accounts:
+                await self.async_setup_account(account_id)
+
+    # Change notification
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]) -> Callable[[], None]:
+        """Listen for changes of the cross-account totals."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_notify_totals(self) -> None:
+        """Notify totals listeners."""
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    @callback
+    def async_notify_account(self, account_id: str) -> None:
+        """Push the current data to the coordinator of a single account."""
+        coordinator = self._coordinators.get(account_id)
+        if coordinator is not None:
+            coordinator.async_set_updated_data(self.store.data)
+
+    @callback
+    def async_notify_all(self) -> None:
+        """Push the current data to every registered coordinator."""
+        for account_id in list(self._coordinators):
+            self.async_notify_account(account_id)
+
+    # Pipeline stages
+    @callback
+    def _async_index_mutation(self, mutation: Mutation) -> None:
+        """Apply a change to the totals and the account's alert state."""
+        if mutation.rebuild_totals:
+            self.async_rebuild_totals()
+        elif mutation.added or mutation.removed:
+            self._async_change(mutation)
+        if mutation.balance_change:
+            self.async_record_balance_change(mutation.balance_change)
+
+        coordinator = self._coordinators.get(mutation.account_id)
+        if coordinator is not None and mutation.account is not None:
+            mutation.low_balance = coordinator.update_low_balance_alert(
+                mutation.account
+            )
+
+    @callback
+    def _async_notify_mutation(self, mutation: Mutation) -> None:
+        """Fire the events of a change and push the data to its account."""
+        if mutation.account_id is None:
+            self.async_notify_totals()
+            return
+        if mutation.account is None:
+            # A recreated account starts over at the same versions
+            self.responses.invalidate(mutation.account_id)
+            self._statistics_pending.pop(mutation.account_id, None)
+        elif mutation.rebuild_totals:
+            self._statistics_pending[mutation.account_id] = None
+        elif mutation.added or mutation.removed:
+            self._async_mark_statistics(
+                mutation.account_id,
+                min(tx.ts for tx in (*mutation.added, *mutation.removed)),
+            )
+
+        coordinator = self._coordinators.get(mutation.account_id)
+        if coordinator is None:
+            # The config entry of the account is not loaded
+            for event_type, data in mutation.events:
+                self.hass.bus.async_fire(event_type, data)
+            return
+
+        for event_type, data in mutation.events:
+            coordinator.events.async_fire(event_type, data)
+        if mutation.account is not None:
+            coordinator.async_fire_low_balance(mutation.account, mutation.low_balance)
+        coordinator.async_set_updated_data(self.store.data)
+        if mutation.account is None and coordinator.entry is None:
+            # An account deleted in the panel has no entry to unload
+            self.async_unregister(coordinator)
+            coordinator.events.async_flush()
+
+    # Cross-account totals
+    @callback
+    def async_rebuild_totals(self) -> None:
+        """Recompute the totals with a full scan of all accounts."""
+        self._month = dt_util.now().strftime("%Y-%m")
+        net_worth = 0.0
+        income = 0.0
+        expense = 0.0
+        category_spent: dict[str, float] = {}
+        for account in self.store.data.accounts.values():
+            net_worth += account.balance
+            for tx in account.transactions:
+                if _month_key(tx) != self._month:
+                    continue
+                if tx.amount >= 0:
+                    income += tx.amount
+                else:
+                    expense += -tx.amount
+                if tx.category is not None:
+                    category_spent[tx.category] = (
+                        category_spent.get(tx.category, 0.0) - tx.amount
+                    )
+        self.net_worth = net_worth
+        self.monthly_income = income
+        self.monthly_expense = expense
+        self.category_spent = category_spent
+        self.async_notify_totals()
+
+    @callback
+    def async_record_balance_change(self, diff: float) -> None:
+        """Account for a balance change that is not backed by a transaction."""
+        self.net_worth += diff
+        self.async_notify_totals()
+
+    @callback
+    def _async_change(self, mutation: Mutation) -> None:
+        """Apply the transactions of a change, then check budget thresholds.
+
+        Thresholds are compared before and after the whole change, so an
+        edit that stays above a threshold does not fire again. Budget
+        events are queued on the mutation and fired by the notify stage.
+        """
+        removed, added = mutation.removed, mutation.added
+        categories = {
+            tx.category for tx in (*removed, *added) if tx.category is not None
+        }
+        before = {
+            category: self.category_spent.get(category, 0.0)
+            for category in categories
+        }
+        for tx in removed:
+            self._apply(tx, -1)
+        for tx in added:
+            self._apply(tx, 1)
+        for category, spent in before.items():
+            self._check_budget(mutation, category, spent)
+        self.async_notify_totals()
+
+    def _apply(self, transaction: Transaction, sign: int) -> None:
+        """Apply a signed transaction amount to the totals."""
+        amount = transaction.amount
+        self.net_worth += sign * amount
+        if _month_key(transaction) == self._month:
+            if amount >= 0:
+                self.monthly_income += sign * amount
+            else:
+                self.monthly_expense -= sign * amount
+            if transaction.category is not None:
+                self.category_spent[transaction.category] = (
+                    self.category_spent.get(transaction.category, 0.0) - sign * amount
+                )
+
+    # Budgets
+    def budget_status(self, category: str) -> dict[str, Any] | None:
+        """Return the budget of a category with this month's spending."""
+        budget = self.store.data.budgets.get(category)
+        if budget is None:
+            return None
+        spent = self.category_spent.get(category, 0.0)
+        return {
+            "category": category,
+            "amount": budget.amount,
+            "thresholds": list(budget.thresholds),
+            "spent": spent,
+            "remaining": budget.amount - spent,
+            "month": self._month,
+        }
+
+    def _check_budget(self, mutation: Mutation, category: str, before: float) -> None:
+        """Queue an event for every budget threshold crossed upwards."""
+        budget = self.store.data.budgets.get(category)
+        if budget is None or budget.amount <= 0:
+            return
+        after = self.category_spent.get(category, 0.0)
+        for threshold in sorted(budget.thresholds):
+            limit = threshold * budget.amount
+            if before < limit <= after:
+                mutation.fire(
+                    EVENT_BUDGET_THRESHOLD,
+                    {
+                        "category": category,
+                        "threshold": threshold,
+                        "budget": budget.amount,
+                        "spent": after,
+                        "month": self._month,
+                    },
+                )
+                _LOGGER.info(
+                    "Budget for %s reached %d%%: %s of %s",
+                    category,
+                    round(threshold * 100),
+                    after,
+                    budget.amount,
+                )
+
+    # Timers
+    @callback
+    def _async_handle_stop(self, event: Event) -> None:
+        """Fire the pending events and cancel the timers when stopping."""
+        for coordinator in self._coordinators.values():
+            coordinator.events.async_flush()
+        self._coordinators.clear()
+        self._displaced.clear()
+        self.async_shutdown()
+
+    @callback
+    def _async_handle_refresh(self, now: datetime) -> None:
+        """Refresh all coordinators and import statistics from the shared interval."""
+        self.async_notify_all()
+        self._async_import_statistics()
+
+    # Long-term statistics
+    @callback
+    def _async_mark_statistics(self, account_id: str, since: int) -> None:
+        """Mark the statistics of an account as changed from an epoch on."""
+        if account_id not in self._statistics_pending:
+            self._statistics_pending[account_id] = since
+            return
+        pending = self._statistics_pending[account_id]
+        if pending is not None:
+            self._statistics_pending[account_id] = min(pending, since)
+
+    @callback
+    def _async_import_statistics(self) -> None:
+        """Import the changed hours of all accounts into the recorder."""
+        if "recorder" not in self.hass.config.components:
+            return
+        # Imported here so the recorder is only loaded when it is set up
+        from .stats import HOUR, async_import_statistics
+
+        if not self._statistics_backfilled:
+            self._statistics_backfilled = True
+            self._statistics_pending = dict.fromkeys(self.store.data.accounts)
+        pending, self._statistics_pending = self._statistics_pending, {}
+        for account_id, since in pending.items():
+            account = self.store.data.get_account(account_id)
+            if account is None:
+                continue
+            coordinator = self._coordinators.get(account_id)
+            currency = (
+                coordinator.options.get(CONF_CURRENCY, DEFAULT_CURRENCY)
+                if coordinator is not None
+                else DEFAULT_CURRENCY
+            )
+            try:
+                async_import_statistics(
+                    self.hass,
+                    account,
+                    currency,
+                    None if since is None else since - since % HOUR,
+                )
+            except Exception as exc:
+                # Retried on the next refresh; other accounts still import
+                _LOGGER.error(
+                    "Failed to import statistics of account %s: %s", account_id, exc
+                )
+                self._statistics_pending[account_id] = since
+
+    @callback
+    def _async_handle_midnight(self, now: datetime) -> None:
+        """Handle the shared midnight tick."""
+        self.hass.async_create_task(self._async_run_midnight())
+
+    @callback
+    def _async_handle_config_update(self, event: Event) -> None:
+        """Relocalize the ledgers when the configured time zone changed."""
+        if self.hass.config.time_zone == self._time_zone:
+            return
+        self._time_zone = self.hass.config.time_zone
+        self.hass.async_create_task(self._async_relocalize())
+
+    async def _async_relocalize(self) -> None:
+        """Move every transaction to its local date in the new time zone."""
+        await self.store.async_load()
+        async with self.pipeline.deferred_save():
+            for account_id in list(self.store.data.accounts):
+                try:
+                    await self.pipeline.async_execute(account_id, Mutation.relocalize)
+                except MutationError:
+                    continue
+        _LOGGER.debug("Relocalized finance data to %s", self._time_zone)
+
+    async def _async_run_midnight(self) -> None:
+        """Execute due recurring plans of all accounts and roll the periods.
+
+        Rolling spending windows of every account expire their oldest day
+        through the pipeline, which pushes the new totals to the sensors.
+        Rolling the month rebuilds the totals, which starts the budgets of
+        the new month from zero.
+        """
+        await self.store.async_load()
+        today = dt_util.now().date()
+
+        changed: list[str] = []
+        async with self.pipeline.deferred_save():
+            for account_id in list(self.store.data.accounts):
+                try:
+                    await self.pipeline.async_execute(
+                        account_id, partial(Mutation.expire_spending, today=today)
+                    )
+                except MutationError:
+                    continue
+
+            for account_id, coordinator in list(self._coordinators.items()):
+                # The events of all plans of an account are fired as one batch
+                with coordinator.events.batch():
+                    try:
+                        executed = await self.pipeline.async_execute(
+                            account_id,
+                            partial(coordinator.execute_due_plans, today=today),
+                        )
+                    except MutationError:
+                        continue
+                if executed:
+                    changed.append(account_id)
+
+            if dt_util.now().strftime("%Y-%m") != self._month:
+                self.async_rebuild_totals()
+
+        if changed:
+            _LOGGER.debug("Executed recurring plans for accounts: %s", changed)
+
+
+@callback
+def async_get_hub(hass: HomeAssistant) -> FinanceHub:
+    """Get the hub for this Home Assistant instance, creating it if needed."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    hub: FinanceHub | None = domain_data.get(HUB_KEY)
+    if hub is None:
+        hub = domain_data[HUB_KEY] = FinanceHub(hass)
+    return hub
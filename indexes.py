@@ -0,0 +1,381 @@
+"""Derived in-memory indexes over account transactions for Ha Finance Record.
+
+These indexes are never persisted; accounts rebuild them on load and keep
+them in sync from their mutation methods.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections import deque
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta
+import heapq
+import re
+from typing import TYPE_CHECKING
+
+from homeassistant.util import dt as dt_util
+
+if TYPE_CHECKING:
+    from .models import Transaction
+
+
+def parse_timestamp(timestamp: str) -> datetime:
+    """Parse an ISO timestamp, reading naive ones in the configured time zone.
+
+    Raises ValueError if the timestamp is not valid.
+    """
+    parsed = (
+        dt_util.parse_datetime(timestamp) if isinstance(timestamp, str) else None
+    )
+    if parsed is None:
+        raise ValueError(f"Invalid timestamp: {timestamp!r}")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return parsed
+
+
+def timestamp_key(timestamp: str) -> int:
+    """Return the epoch seconds of an ISO timestamp."""
+    return int(parse_timestamp(timestamp).timestamp())
+
+
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+_TOKEN_RE = re.compile(f"([{_CJK}]+)|([^\\W_{_CJK}]+)")
+
+
+def tokenize(text: str, query: bool = False) -> list[str]:
+    """Split text into search terms.
+
+    Latin text is split into case-folded words. CJK text has no word
+    boundaries, so runs of CJK characters become overlapping bigrams; when
+    indexing, single characters are added as well so one-character queries
+    still match.
+    """
+    terms: list[str] = []
+    for cjk, word in _TOKEN_RE.findall(text.casefold()):
+        if word:
+            terms.append(word)
+            continue
+        if len(cjk) == 1 or not query:
+            terms.extend(cjk)
+        terms.extend(cjk[i : i + 2] for i in range(len(cjk) - 1))
+    return terms
+
+
+def local_date(timestamp: str) -> date:
+    """Return the local calendar date of an ISO timestamp."""
+    return dt_util.as_local(parse_timestamp(timestamp)).date()
+
+
+def local_day_bounds(day: date) -> tuple[int, int]:
+    """Return the first and last epoch second of a local calendar day."""
+    start = int(dt_util.start_of_local_day(day).timestamp())
+    end = int(dt_util.start_of_local_day(day + timedelta(days=1)).timestamp()) - 1
+    return start, end
+
+
+class TimestampIndex:
+    """Transactions sorted by timestamp, answering range queries with bisect.
+
+    Keys are epoch seconds; transactions with equal keys keep insertion
+    order. Appending a transaction newer than all others is O(1); out of
+    order (backdated or imported) transactions are inserted in place.
+    """
+
+    def __init__(self, transactions: Iterable[Transaction] = ()) -> None:
+        """Build the index."""
+        pairs = sorted(
+            ((tx.ts, tx) for tx in transactions),
+            key=lambda pair: pair[0],
+        )
+        self._keys: list[int] = [key for key, _ in pairs]
+        self._transactions: list[Transaction] = [tx for _, tx in pairs]
+
+    def __len__(self) -> int:
+        """Return the number of indexed transactions."""
+        return len(self._keys)
+
+    @property
+    def first_key(self) -> int | None:
+        """Return the oldest indexed epoch, if any."""
+        return self._keys[0] if self._keys else None
+
+    @property
+    def last_key(self) -> int | None:
+        """Return the newest indexed epoch, if any."""
+        return self._keys[-1] if self._keys else None
+
+    def add(self, transaction: Transaction) -> None:
+        """Index a transaction."""
+        key = transaction.ts
+        if not self._keys or key >= self._keys[-1]:
+            self._keys.append(key)
+            self._transactions.append(transaction)
+            return
+        position = bisect_right(self._keys, key)
+        self._keys.insert(position, key)
+        self._transactions.insert(position, transaction)
+
+    def _position(self, transaction: Transaction) -> int | None:
+        """Find the position of a transaction by its key and ID."""
+        key = transaction.ts
+        lo = bisect_left(self._keys, key)
+        hi = bisect_right(self._keys, key, lo)
+        for position in range(lo, hi):
+            if self._transactions[position].id == transaction.id:
+                return position
+        return None
+
+    def remove(self, transaction: Transaction) -> None:
+        """Remove a transaction from the index."""
+        position = self._position(transaction)
+        if position is not None:
+            del self._keys[position]
+            del self._transactions[position]
+
+    def replace(self, old: Transaction, new: Transaction) -> None:
+        """Replace an edited transaction."""
+        if old.timestamp != new.timestamp:
+            self.remove(old)
+            self.add(new)
+            return
+        position = self._position(old)
+        if position is not None:
+            self._transactions[position] = new
+
+    def between(self, start: int | None = None, end: int | None = None) -> list[Transaction]:
+        """Return transactions with start <= epoch <= end, oldest first."""
+        lo = 0 if start is None else bisect_left(self._keys, start)
+        hi = len(self._keys) if end is None else bisect_right(self._keys, end)
+        return self._transactions[lo:hi]
+
+    def count(self, start: int | None = None, end: int | None = None) -> int:
+        """Return the number of transactions with start <= epoch <= end."""
+        lo = 0 if start is None else bisect_left(self._keys, start)
+        hi = len(self._keys) if end is None else bisect_right(self._keys, end)
+        return max(hi - lo, 0)
+
+
+class PlanIndex:
+    """Transactions grouped by the recurring plan that posted them.
+
+    Keeps a running total per plan so cumulative amounts and counts are
+    O(1); transactions without a plan_id are not indexed.
+    """
+
+    def __init__(self, transactions: Iterable[Transaction] = ()) -> None:
+        """Build the index."""
+        self._transactions: dict[str, dict[str, Transaction]] = {}
+        self._totals: dict[str, float] = {}
+        for transaction in transactions:
+            self.add(transaction)
+
+    def add(self, transaction: Transaction) -> None:
+        """Index a transaction."""
+        plan_id = transaction.plan_id
+        if plan_id is None:
+            return
+        self._transactions.setdefault(plan_id, {})[transaction.id] = transaction
+        self._totals[plan_id] = self._totals.get(plan_id, 0.0) + transaction.amount
+
+    def remove(self, transaction: Transaction) -> None:
+        """Remove a transaction from the index."""
+        plan_id = transaction.plan_id
+        transactions = self._transactions.get(plan_id) if plan_id is not None else None
+        if transactions is None or transactions.pop(transaction.id, None) is None:
+            return
+        if transactions:
+            self._totals[plan_id] -= transaction.amount
+        else:
+            del self._transactions[plan_id]
+            del self._totals[plan_id]
+
+    def replace(self, old: Transaction, new: Transaction) -> None:
+        """Replace an edited transaction."""
+        self.remove(old)
+        self.add(new)
+
+    def total(self, plan_id: str) -> float:
+        """Return the summed amount of a plan's transactions."""
+        return self._totals.get(plan_id, 0.0)
+
+    def count(self, plan_id: str) -> int:
+        """Return the number of a plan's transactions."""
+        return len(self._transactions.get(plan_id, ()))
+
+    def last(self, plan_id: str) -> Transaction | None:
+        """Return the most recent transaction of a plan."""
+        transactions = self._transactions.get(plan_id)
+        if not transactions:
+            return None
+        return max(transactions.values(), key=lambda tx: tx.ts)
+
+
+class NoteIndex:
+    """Inverted index from note terms to transactions for full-text search.
+
+    Besides the note, the absolute amount is indexed as a term so searching
+    for a number finds transactions of that amount. Latin query terms match
+    by prefix through a sorted vocabulary; CJK terms match exactly.
+    """
+
+    def __init__(self, transactions: Iterable[Transaction] = ()) -> None:
+        """Build the index."""
+        self._postings: dict[str, set[str]] = {}
+        self._terms: dict[str, tuple[str, ...]] = {}
+        self._transactions: dict[str, Transaction] = {}
+        self._keys: dict[str, int] = {}
+        self._vocabulary: list[str] | None = None
+        for transaction in transactions:
+            self.add(transaction)
+
+    @staticmethod
+    def _document_terms(transaction: Transaction) -> tuple[str, ...]:
+        """Return the terms indexed for a transaction."""
+        return (*tokenize(transaction.note), f"{abs(transaction.amount):g}")
+
+    def add(self, transaction: Transaction) -> None:
+        """Index a transaction."""
+        terms = self._document_terms(transaction)
+        self._terms[transaction.id] = terms
+        self._transactions[transaction.id] = transaction
+        self._keys[transaction.id] = transaction.ts
+        for term in set(terms):
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = set()
+                self._vocabulary = None
+            postings.add(transaction.id)
+
+    def remove(self, transaction: Transaction) -> None:
+        """Remove a transaction from the index."""
+        terms = self._terms.pop(transaction.id, None)
+        if terms is None:
+            return
+        del self._transactions[transaction.id]
+        del self._keys[transaction.id]
+        for term in set(terms):
+            postings = self._postings[term]
+            postings.discard(transaction.id)
+            if not postings:
+                del self._postings[term]
+                self._vocabulary = None
+
+    def replace(self, old: Transaction, new: Transaction) -> None:
+        """Replace an edited transaction."""
+        if old.note == new.note and old.amount == new.amount:
+            self._transactions[new.id] = new
+            self._keys[new.id] = new.ts
+            return
+        self.remove(old)
+        self.add(new)
+
+    def _matching(self, term: str) -> set[str]:
+        """Return the IDs of transactions containing a query term."""
+        if _TOKEN_RE.fullmatch(term)[1]:
+            return self._postings.get(term, set())
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        vocabulary = self._vocabulary
+        position = bisect_left(vocabulary, term)
+        matches: set[str] = set()
+        while position < len(vocabulary) and vocabulary[position].startswith(term):
+            matches |= self._postings[vocabulary[position]]
+            position += 1
+        return matches
+
+    def search(
+        self,
+        query: str,
+        start: int | None = None,
+        end: int | None = None,
+        limit: int | None = None,
+    ) -> list[tuple[int, int, Transaction]]:
+        """Return (score, epoch, transaction) for matches of every query term.
+
+        The score counts occurrences of the query terms in the note, with a
+        bonus when the note contains the whole query verbatim. start and end
+        optionally bound the epoch seconds (inclusive); with limit only the
+        newest limit matches are scored.
+        """
+        terms = list(dict.fromkeys(tokenize(query, query=True)))
+        if not terms:
+            return []
+        candidate_sets = sorted((self._matching(term) for term in terms), key=len)
+        candidates = set(candidate_sets[0])
+        for matches in candidate_sets[1:]:
+            candidates &= matches
+            if not candidates:
+                return []
+
+        all_keys = self._keys
+        if start is not None or end is not None:
+            candidates = {
+                transaction_id
+                for transaction_id in candidates
+                if (start is None or all_keys[transaction_id] >= start)
+                and (end is None or all_keys[transaction_id] <= end)
+            }
+        if limit is not None and len(candidates) > limit:
+            candidates = heapq.nlargest(limit, candidates, key=all_keys.__getitem__)
+
+        phrase = query.casefold().strip()
+        all_terms = self._terms
+        all_transactions = self._transactions
+        results = []
+        for transaction_id in candidates:
+            transaction = all_transactions[transaction_id]
+            document = all_terms[transaction_id]
+            score = sum(document.count(term) for term in terms)
+            if phrase in transaction.note.casefold():
+                score += 100
+            results.append((score, all_keys[transaction_id], transaction))
+        return results
+
+
+class RollingSpending:
+    """Expense totals over trailing windows of local days.
+
+    One bucket per day of the longest window is kept in a fixed-length
+    deque, newest last, together with a running total per window. Adding
+    an amount and reading a total are O(1); advancing to a new day
+    subtracts the buckets that fall out of each window and drops the
+    oldest one.
+    """
+
+    def __init__(self, windows: Iterable[int], today: date) -> None:
+        """Initialize empty buckets ending today."""
+        self._windows = tuple(sorted(set(windows)))
+        self._span = self._windows[-1]
+        self._today = today
+        self._buckets: deque[float] = deque([0.0] * self._span, maxlen=self._span)
+        self._totals = dict.fromkeys(self._windows, 0.0)
+
+    def add(self, day: date, amount: float) -> None:
+        """Add an amount spent on a day; days outside the span are ignored."""
+        age = (self._today - day).days
+        if not 0 <= age < self._span:
+            return
+        self._buckets[-1 - age] += amount
+        for window in self._windows:
+            if age < window:
+                self._totals[window] += amount
+
+    def advance(self, today: date) -> None:
+        """Move the window forward to end on today, expiring old buckets."""
+        days = (today - self._today).days
+        if days <= 0:
+            return
+        self._today = today
+        if days >= self._span:
+            self._buckets.extend([0.0] * self._span)
+            self._totals = dict.fromkeys(self._windows, 0.0)
+            return
+        for _ in range(days):
+            for window in self._windows:
+                self._totals[window] -= self._buckets[-window]
+            self._buckets.append(0.0)
+
+    def total(self, window: int) -> float:
+        """Return the total spent in the trailing window ending today."""
+        return self._totals[window]
@@ -1,21 +1,57 @@
 """Data models for Ha Finance Record integration."""
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from bisect import bisect_left, bisect_right
+from collections import deque
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta, timezone
+import logging
+import math
+import time
 from typing import Any
 import uuid
 
 from homeassistant.util import dt as dt_util
 
 from .const import (
+    CHANGE_LOG_SIZE,
+    CHECKPOINT_INTERVAL,
     FREQUENCY_MONTHLY,
+    GRANULARITY_DAY,
+    SPENDING_WINDOWS,
     TRANSACTION_MANUAL,
 )
+from .classifier import RuleEngine
+from .indexes import (
+    NoteIndex,
+    PlanIndex,
+    RollingSpending,
+    TimestampIndex,
+    local_date,
+    local_day_bounds,
+    timestamp_key,
+)
+from .persistent import PersistentMap, PersistentVector
+from .rollups import Rollups
 
+_LOGGER = logging.getLogger(__name__)
 
-@dataclass
+
+@dataclass(frozen=True)
 class Transaction:
-    """Represents a financial transaction."""
+    """Represents a financial transaction.
+
+    Transactions are immutable; edits replace the instance in the account
+    so that snapshots taken earlier keep seeing the old values.
+
+    ts (epoch seconds) and day (local calendar date in the configured time
+    zone) are derived from the UTC timestamp once, when the instance is
+    created, so sorting and bucketing never parse dates. They are not
+    stored; after a time zone change accounts recreate their transactions
+    (see Account.relocalize). Naive timestamps are read in the configured
+    time zone; an invalid timestamp raises ValueError.
+    """
 
     id: str
     amount: float
@@ -23,6 +59,15 @@ class Transaction:
     timestamp: str
     type: str  # manual, recurring, adjustment
     plan_id: str | None = None
+    category: str | None = None
+    tags: tuple[str, ...] = ()
+    ts: int = field(init=False, compare=False, repr=False)
+    day: date = field(init=False, compare=False, repr=False)
+
+    def __post_init__(self) -> None:
+        """Derive the epoch seconds and local date of the timestamp."""
+        object.__setattr__(self, "ts", timestamp_key(self.timestamp))
+        object.__setattr__(self, "day", local_date(self.timestamp))
 
     @classmethod
     def create(
@@ -31,6 +76,8 @@ class Transaction:
         note: str,
         transaction_type: str = TRANSACTION_MANUAL,
         plan_id: str | None = None,
+        category: str | None = None,
+        tags: Iterable[str] = (),
     ) -> Transaction:
         """Create a new transaction with auto-generated ID and timestamp."""
         return cls(
@@ -40,6 +87,8 @@ class Transaction:
             timestamp=dt_util.utcnow().isoformat(),
             type=transaction_type,
             plan_id=plan_id,
+            category=category,
+            tags=tuple(tags),
         )
 
     def to_dict(self) -> dict[str, Any]:
@@ -51,8 +100,28 @@ class Transaction:
             "timestamp": self.timestamp,
             "type": self.type,
             "plan_id": self.plan_id,
+            "category": self.category,
+            "tags": list(self.tags),
         }
 
+    def to_api_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for API responses.
+
+        Adds ts, the epoch seconds of the timestamp, as a numeric sort key
+        so clients do not need to parse dates.
+        """
+        return {**self.to_dict(), "ts": self.ts}
+
+    def to_storage_dict(self) -> dict[str, Any]:
+        """Convert to the compacted dictionary written to storage."""
+        data = self.to_dict()
+        for key in ("plan_id", "category"):
+            if data[key] is None:
+                del data[key]
+        if not data["tags"]:
+            del data["tags"]
+        return data
+
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> Transaction:
         """Create from dictionary."""
@@ -63,12 +132,17 @@ class Transaction:
             timestamp=data["timestamp"],
             type=data["type"],
             plan_id=data.get("plan_id"),
+            category=data.get("category"),
+            tags=tuple(data.get("tags", ())),
         )
 
 
-@dataclass
+@dataclass(frozen=True)
 class RecurringPlan:
-    """Represents a recurring financial plan."""
+    """Represents a recurring financial plan.
+
+    Plans are immutable; use Account.update_recurring_plan to change them.
+    """
 
     id: str
     title: str
@@ -109,35 +183,543 @@ class RecurringPlan:
         )
 
 
-@dataclass
-class Account:
-    """Represents a financial account."""
+@dataclass(frozen=True)
+class ClassificationRule:
+    """Rule assigning a category and tags to matching transactions.
+
+    A rule matches when the note contains any of its keywords (case
+    insensitive) and the amount lies within the optional bounds. A rule
+    without keywords matches on the amount alone.
+    """
 
     id: str
-    name: str
-    balance: float = 0.0
-    transactions: list[Transaction] = field(default_factory=list)
-    recurring_plans: dict[str, RecurringPlan] = field(default_factory=dict)
+    category: str | None = None
+    tags: tuple[str, ...] = ()
+    keywords: tuple[str, ...] = ()
+    min_amount: float | None = None
+    max_amount: float | None = None
+    priority: int = 100
+
+    def matches_amount(self, amount: float) -> bool:
+        """Return True if the amount lies within the rule's bounds."""
+        if self.min_amount is not None and amount < self.min_amount:
+            return False
+        if self.max_amount is not None and amount > self.max_amount:
+            return False
+        return True
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for storage."""
+        return {
+            "category": self.category,
+            "tags": list(self.tags),
+            "keywords": list(self.keywords),
+            "min_amount": self.min_amount,
+            "max_amount": self.max_amount,
+            "priority": self.priority,
+        }
+
+    @classmethod
+    def from_dict(cls, rule_id: str, data: dict[str, Any]) -> ClassificationRule:
+        """Create from dictionary."""
+        return cls(
+            id=rule_id,
+            category=data.get("category"),
+            tags=tuple(data.get("tags", ())),
+            keywords=tuple(data.get("keywords", ())),
+            min_amount=data.get("min_amount"),
+            max_amount=data.get("max_amount"),
+            priority=data.get("priority", 100),
+        )
+
+
+@dataclass(frozen=True)
+class Budget:
+    """Monthly spending limit for a category.
+
+    Thresholds are fractions of the amount; crossing one fires an event.
+    """
+
+    category: str
+    amount: float
+    thresholds: tuple[float, ...] = (0.8, 1.0)
 
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary for storage."""
+        return {
+            "amount": self.amount,
+            "thresholds": list(self.thresholds),
+        }
+
+    @classmethod
+    def from_dict(cls, category: str, data: dict[str, Any]) -> Budget:
+        """Create from dictionary."""
+        return cls(
+            category=category,
+            amount=data["amount"],
+            thresholds=tuple(data.get("thresholds", (0.8, 1.0))),
+        )
+
+
+@dataclass(frozen=True)
+class LowBalanceAlert:
+    """Low balance alert state of an account.
+
+    The alert becomes active when the balance drops below the enter
+    threshold and clears only once it recovers to the exit threshold, so
+    a balance hovering around one value does not toggle it. fired_at is
+    the time the last low balance event was fired, used for the cooldown;
+    notified tells whether the current activation fired one.
+    """
+
+    active: bool = False
+    fired_at: str | None = None
+    notified: bool = False
+
+    def transition(
+        self,
+        balance: float,
+        enter_threshold: float,
+        exit_threshold: float,
+        now: datetime,
+        cooldown: timedelta,
+    ) -> tuple[LowBalanceAlert, str | None]:
+        """Return the next state and "entered", "cleared" or None.
+
+        Entering within the cooldown of the last fired alert updates the
+        state without reporting it, and then clearing is not reported
+        either.
+        """
+        if not self.active and balance < enter_threshold:
+            last = dt_util.parse_datetime(self.fired_at) if self.fired_at else None
+            if last is not None and now - last < cooldown:
+                return replace(self, active=True, notified=False), None
+            return (
+                LowBalanceAlert(active=True, fired_at=now.isoformat(), notified=True),
+                "entered",
+            )
+        if self.active and balance >= exit_threshold:
+            return (
+                replace(self, active=False, notified=False),
+                "cleared" if self.notified else None,
+            )
+        return self, None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for storage."""
+        return {
+            "active": self.active,
+            "fired_at": self.fired_at,
+            "notified": self.notified,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> LowBalanceAlert:
+        """Create from dictionary."""
+        active = data.get("active", False)
+        return cls(
+            active=active,
+            fired_at=data.get("fired_at"),
+            notified=data.get("notified", active),
+        )
+
+
+def _compute_running_balances(
+    balance: float, transactions: Iterable[Transaction]
+) -> list[float]:
+    """Replay the running balances backwards from the current balance."""
+    amounts = [tx.amount for tx in transactions]
+    running = balance - sum(amounts)
+    balances = []
+    for amount in amounts:
+        running += amount
+        balances.append(running)
+    return balances
+
+
+def _recompute_suffix(
+    transactions: PersistentVector[Transaction],
+    balances: PersistentVector[float],
+    index: int,
+    base: float,
+) -> PersistentVector[float]:
+    """Recompute running balances from index on, starting at base."""
+    count = len(transactions)
+    if count - index <= 32:
+        for position in range(index, count):
+            base += transactions[position].amount
+            balances = balances.set(position, base)
+        return balances
+    suffix = []
+    for tx in transactions[index:]:
+        base += tx.amount
+        suffix.append(base)
+    return PersistentVector([*balances[:index], *suffix])
+
+
+Checkpoints = tuple[tuple[int, float], ...]
+
+
+def _month_end_before(key: int) -> int:
+    """Return the last epoch second before the local month containing key."""
+    local = dt_util.as_local(datetime.fromtimestamp(key, timezone.utc))
+    month_start = local.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return int(month_start.timestamp()) - 1
+
+
+def _is_month_end(key: int) -> bool:
+    """Return True if key is the last second of a local month."""
+    return _month_end_before(key + 1) == key
+
+
+def _build_checkpoints(
+    opening_balance: float, transactions: Iterable[Transaction]
+) -> Checkpoints:
+    """Replay transactions in timestamp order and place balance checkpoints.
+
+    A checkpoint (epoch, balance) holds the balance after every transaction
+    with a timestamp at or before epoch. One is placed at the end of every
+    local month that precedes a transaction, and one after every
+    CHECKPOINT_INTERVAL transactions without a checkpoint.
+    """
+    pairs = sorted(
+        ((tx.ts, tx.amount) for tx in transactions),
+        key=lambda pair: pair[0],
+    )
+    checkpoints: list[tuple[int, float]] = []
+    balance = opening_balance
+    previous: int | None = None
+    since = 0
+    for key, amount in pairs:
+        if previous is not None and key > previous:
+            checkpoint = _next_checkpoint(previous, key, balance, since)
+            if checkpoint is not None:
+                checkpoints.append(checkpoint)
+                since = 0
+        balance += amount
+        since += 1
+        previous = key
+    return tuple(checkpoints)
+
+
+def _next_checkpoint(
+    previous: int, key: int, balance: float, since: int
+) -> tuple[int, float] | None:
+    """Return the checkpoint to place before a transaction newer than previous.
+
+    balance is the balance after all transactions up to previous and since
+    the number of those transactions after the last checkpoint.
+    """
+    month_end = _month_end_before(key)
+    if month_end >= previous:
+        return month_end, balance
+    if since >= CHECKPOINT_INTERVAL:
+        return previous, balance
+    return None
+
+
+def _shift_checkpoints(checkpoints: Checkpoints, key: int, delta: float) -> Checkpoints:
+    """Apply a balance change at epoch key to all checkpoints at or after it."""
+    if not delta:
+        return checkpoints
+    position = bisect_left(checkpoints, (key, -math.inf))
+    if position == len(checkpoints):
+        return checkpoints
+    return checkpoints[:position] + tuple(
+        (checkpoint_key, balance + delta)
+        for checkpoint_key, balance in checkpoints[position:]
+    )
+
+
+@dataclass(frozen=True)
+class AccountSnapshot:
+    """Immutable point-in-time state of an account.
+
+    The collections are persistent, so holding on to a snapshot is O(1)
+    and it is safe to hand to an executor thread. version is increased by
+    every change and persisted, so it never repeats for an account. A new
+    account starts at its creation time in milliseconds, so an account
+    deleted and created again under the same ID does not repeat the
+    versions of the old one.
+    """
+
+    id: str
+    name: str
+    balance: float
+    transactions: PersistentVector[Transaction]
+    running_balances: PersistentVector[float]
+    recurring_plans: PersistentMap[str, RecurringPlan]
+    checkpoints: Checkpoints = ()
+    low_balance_alert: LowBalanceAlert = LowBalanceAlert()
+    rollups: Rollups = field(default_factory=Rollups)
+    version: int = 0
+
+    def transaction_dicts(self) -> list[dict[str, Any]]:
+        """Return the transactions with their running balance for API responses."""
+        return [
+            {**tx.to_api_dict(), "running_balance": running_balance}
+            for tx, running_balance in zip(self.transactions, self.running_balances)
+        ]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to the compacted dictionary written to storage."""
         return {
             "name": self.name,
             "balance": self.balance,
-            "transactions": [tx.to_dict() for tx in self.transactions],
+            "transactions": [
+                {**tx.to_storage_dict(), "running_balance": running_balance}
+                for tx, running_balance in zip(self.transactions, self.running_balances)
+            ],
             "recurring_plans": {
                 plan_id: plan.to_dict()
                 for plan_id, plan in self.recurring_plans.items()
             },
+            "checkpoints": [list(checkpoint) for checkpoint in self.checkpoints],
+            "low_balance_alert": self.low_balance_alert.to_dict(),
+            "rollups": self.rollups.to_dict(),
+            "version": self.version,
+        }
+
+
+@dataclass(frozen=True)
+class AccountChange:
+    """Transactions touched by the change that produced a version.
+
+    resync is set when the change also moved the running balances of
+    transactions it does not list, so only a full fetch is accurate.
+    """
+
+    version: int
+    upserted: tuple[str, ...] = ()
+    removed: tuple[str, ...] = ()
+    resync: bool = False
+
+
+@dataclass(frozen=True)
+class AccountDelta:
+    """Changes of an account since an earlier version."""
+
+    upserted: list[Transaction]
+    removed: list[str]
+
+
+class Account:
+    """Represents a financial account.
+
+    An account is a mutable handle around an immutable AccountSnapshot.
+    Every mutation builds the complete new state (sharing structure with
+    the old one) and swaps it in with a single assignment, so a reader
+    never observes a half-applied update such as a transaction appended
+    before the balance was adjusted.
+
+    Next to the transactions the account keeps a parallel column with the
+    balance after each transaction. It is extended on add and recomputed
+    from the edited position on update and delete.
+
+    Balance checkpoints at month ends and every CHECKPOINT_INTERVAL
+    transactions make point-in-time balance queries a binary search plus
+    a short replay. They are persisted, so month-end balances remain
+    available after the transactions of that month were trimmed.
+
+    Income and expense rollups per local day, week, month and year are
+    persisted as well and updated with every change. Trimming does not
+    touch them, so charts reach back beyond the retained transactions.
+
+    The handle also maintains derived indexes that are not part of the
+    snapshot: transaction positions by ID, a timestamp-sorted index for
+    date range queries, the transactions posted by each recurring plan, a
+    full-text index over the notes and expense totals over the trailing
+    SPENDING_WINDOWS days. The spending totals keep trimmed transactions.
+
+    The last CHANGE_LOG_SIZE changes are kept in memory, so a client
+    holding an older version can be sent just the transactions changed
+    since (see changes_since).
+    """
+
+    def __init__(
+        self,
+        id: str,
+        name: str,
+        balance: float = 0.0,
+        transactions: Iterable[Transaction] = (),
+        recurring_plans: Mapping[str, RecurringPlan] | None = None,
+        running_balances: Iterable[float] | None = None,
+        checkpoints: Iterable[tuple[int, float]] | None = None,
+        low_balance_alert: LowBalanceAlert | None = None,
+        rollups: Rollups | None = None,
+        version: int | None = None,
+    ) -> None:
+        """Initialize the account."""
+        if version is None:
+            version = time.time_ns() // 1_000_000
+        transactions = list(transactions)
+        balances = list(running_balances) if running_balances is not None else None
+        if (
+            balances is None
+            or len(balances) != len(transactions)
+            or (balances and balances[-1] != balance)
+        ):
+            balances = _compute_running_balances(balance, transactions)
+        if checkpoints is None:
+            opening_balance = (
+                balances[0] - transactions[0].amount if transactions else balance
+            )
+            checkpoints = _build_checkpoints(opening_balance, transactions)
+
+        self._owner: FinanceData | None = None
+        self._state = AccountSnapshot(
+            id=id,
+            name=name,
+            balance=balance,
+            transactions=PersistentVector(transactions),
+            running_balances=PersistentVector(balances),
+            recurring_plans=PersistentMap(recurring_plans or {}),
+            checkpoints=tuple(
+                (int(key), float(value)) for key, value in sorted(checkpoints)
+            ),
+            low_balance_alert=low_balance_alert or LowBalanceAlert(),
+            rollups=rollups if rollups is not None else Rollups.build(transactions),
+            version=version,
+        )
+        self._changes: deque[AccountChange] = deque(maxlen=CHANGE_LOG_SIZE)
+        self._rebuild_indexes()
+
+    def _rebuild_indexes(self) -> None:
+        """Rebuild the derived indexes from the current state."""
+        transactions = self.transactions
+        self._seq_base = 0
+        self._seq: dict[str, int] = {
+            tx.id: position for position, tx in enumerate(transactions)
         }
+        self._ts_index = TimestampIndex(transactions)
+        self._plan_index = PlanIndex(transactions)
+        self._note_index = NoteIndex(transactions)
+        self._spending = RollingSpending(SPENDING_WINDOWS, dt_util.now().date())
+        for tx in transactions:
+            self._track_spending(tx, 1)
+
+    def _track_spending(self, transaction: Transaction, sign: int) -> None:
+        """Add or remove an expense in the rolling spending totals."""
+        if transaction.amount >= 0:
+            return
+        self._spending.advance(dt_util.now().date())
+        self._spending.add(transaction.day, -sign * transaction.amount)
+
+    def expire_spending(self, today: date) -> None:
+        """Expire rolling spending buckets older than the windows ending today."""
+        self._spending.advance(today)
+
+    def spending(self, days: int) -> float:
+        """Return the expenses of a trailing window, one of SPENDING_WINDOWS."""
+        self._spending.advance(dt_util.now().date())
+        return self._spending.total(days)
+
+    def _commit(
+        self,
+        *,
+        upserted: Iterable[str] = (),
+        removed: Iterable[str] = (),
+        resync: bool = False,
+        **changes: Any,
+    ) -> None:
+        """Swap in a new state and publish it to the owning FinanceData.
+
+        upserted and removed name the transactions changed by this version;
+        resync marks changes that also moved other running balances.
+        """
+        version = self._state.version + 1
+        self._state = replace(self._state, version=version, **changes)
+        self._changes.append(
+            AccountChange(version, tuple(upserted), tuple(removed), resync)
+        )
+        if self._owner is not None:
+            self._owner._states = self._owner._states.set(self.id, self._state)
+
+    @property
+    def id(self) -> str:
+        """Return the account ID."""
+        return self._state.id
+
+    @property
+    def name(self) -> str:
+        """Return the account name."""
+        return self._state.name
+
+    @name.setter
+    def name(self, value: str) -> None:
+        """Rename the account."""
+        self._commit(name=value)
+
+    @property
+    def version(self) -> int:
+        """Get the version of the account state."""
+        return self._state.version
+
+    @property
+    def balance(self) -> float:
+        """Return the current balance."""
+        return self._state.balance
+
+    @property
+    def transactions(self) -> PersistentVector[Transaction]:
+        """Return the transactions, oldest first."""
+        return self._state.transactions
+
+    @property
+    def running_balances(self) -> PersistentVector[float]:
+        """Return the balance after each transaction, parallel to transactions."""
+        return self._state.running_balances
+
+    @property
+    def opening_balance(self) -> float:
+        """Return the balance before the oldest retained transaction."""
+        if not self.transactions:
+            return self.balance
+        return self.running_balances[0] - self.transactions[0].amount
+
+    @property
+    def recurring_plans(self) -> PersistentMap[str, RecurringPlan]:
+        """Return the recurring plans by ID."""
+        return self._state.recurring_plans
+
+    @property
+    def low_balance_alert(self) -> LowBalanceAlert:
+        """Return the low balance alert state."""
+        return self._state.low_balance_alert
+
+    @low_balance_alert.setter
+    def low_balance_alert(self, value: LowBalanceAlert) -> None:
+        """Set the low balance alert state."""
+        self._commit(low_balance_alert=value)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for storage."""
+        return self._state.to_dict()
+
+    def snapshot(self) -> AccountSnapshot:
+        """Return the current immutable state (O(1))."""
+        return self._state
 
     @classmethod
     def from_dict(cls, account_id: str, data: dict[str, Any]) -> Account:
         """Create from dictionary."""
-        transactions = [
-            Transaction.from_dict(tx_data)
-            for tx_data in data.get("transactions", [])
-        ]
+        tx_list = data.get("transactions", [])
+        transactions: list[Transaction] = []
+        running_balances: list[float | None] = []
+        for tx_data in tx_list:
+            try:
+                transactions.append(Transaction.from_dict(tx_data))
+            except ValueError as err:
+                _LOGGER.warning(
+                    "Dropping transaction %s of account %s: %s",
+                    tx_data.get("id"),
+                    account_id,
+                    err,
+                )
+                # The stored running balances no longer line up
+                running_balances.append(None)
+                continue
+            running_balances.append(tx_data.get("running_balance"))
         recurring_plans = {
             plan_id: RecurringPlan.from_dict(plan_id, plan_data)
             for plan_id, plan_data in data.get("recurring_plans", {}).items()
@@ -148,6 +730,17 @@ class Account:
             balance=data.get("balance", 0.0),
             transactions=transactions,
             recurring_plans=recurring_plans,
+            running_balances=(
+                None if None in running_balances else running_balances
+            ),
+            checkpoints=data.get("checkpoints"),
+            low_balance_alert=LowBalanceAlert.from_dict(
+                data.get("low_balance_alert", {})
+            ),
+            rollups=(
+                Rollups.from_dict(data["rollups"]) if "rollups" in data else None
+            ),
+            version=data.get("version", 0),
         )
 
     @property
@@ -157,47 +750,447 @@ class Account:
             return None
         return self.transactions[-1]
 
+    def get_transaction(self, transaction_id: str) -> Transaction | None:
+        """Get a transaction by ID."""
+        index = self._index_of(transaction_id)
+        if index is None:
+            return None
+        return self.transactions[index]
+
+    def _index_of(self, transaction_id: str) -> int | None:
+        """Get the position of a transaction in the ledger."""
+        seq = self._seq.get(transaction_id)
+        if seq is None:
+            return None
+        return seq - self._seq_base
+
+    def changes_since(self, version: int) -> AccountDelta | None:
+        """Return the transactions changed after a version.
+
+        Returns None if the changes are no longer (or were never) logged,
+        or one of them requires a full fetch.
+        """
+        if version > self.version:
+            return None
+        if version == self.version:
+            return AccountDelta([], [])
+        changes = [change for change in self._changes if change.version > version]
+        if (
+            not changes
+            or changes[0].version != version + 1
+            or any(change.resync for change in changes)
+        ):
+            return None
+        touched: dict[str, bool] = {}
+        for change in changes:
+            for transaction_id in change.upserted:
+                touched[transaction_id] = True
+            for transaction_id in change.removed:
+                touched[transaction_id] = False
+        upserted: list[Transaction] = []
+        removed: list[str] = []
+        for transaction_id, present in touched.items():
+            transaction = self.get_transaction(transaction_id) if present else None
+            if transaction is None:
+                removed.append(transaction_id)
+            else:
+                upserted.append(transaction)
+        return AccountDelta(upserted, removed)
+
+    def transactions_between(
+        self, start: int | None = None, end: int | None = None
+    ) -> list[Transaction]:
+        """Return transactions within an epoch-second range, oldest first.
+
+        Either bound may be None for an open range; both are inclusive.
+        """
+        return self._ts_index.between(start, end)
+
+    def transaction_dicts_between(
+        self, start: int | None = None, end: int | None = None
+    ) -> list[dict[str, Any]]:
+        """Return a date range of transactions with running balances, oldest first."""
+        return [
+            {**tx.to_api_dict(), "running_balance": self.running_balance_of(tx.id)}
+            for tx in self._ts_index.between(start, end)
+        ]
+
+    def running_balance_of(self, transaction_id: str) -> float | None:
+        """Return the balance after a transaction."""
+        index = self._index_of(transaction_id)
+        if index is None:
+            return None
+        return self.running_balances[index]
+
+    def search_transactions(
+        self,
+        query: str,
+        start: int | None = None,
+        end: int | None = None,
+        limit: int | None = None,
+    ) -> list[tuple[int, int, Transaction]]:
+        """Return (score, epoch, transaction) for notes matching a full-text query.
+
+        Results are unordered; start and end optionally bound the epoch
+        seconds of the matches (inclusive). With limit only the newest
+        limit matches are returned.
+        """
+        return self._note_index.search(query, start, end, limit)
+
+    def balance_at(self, key: int) -> float | None:
+        """Return the balance at an epoch second, or None if it is unknown.
+
+        Starts from the nearest checkpoint at or before key and replays the
+        transactions after it. If there is no such checkpoint, or it lies
+        before trimmed history that key is past, the transactions after key
+        are reversed from the current balance instead.
+
+        Trimmed transactions are only known per local day, from the
+        rollups. Before the oldest retained transaction of a trimmed ledger
+        the balance is therefore exact at the end of a local day and None
+        at any other time.
+        """
+        oldest = self._ts_index.first_key
+        rollups = self._state.rollups
+        count, income, expenses = rollups.total()
+        if count > len(self.transactions) and (oldest is None or key < oldest):
+            day = dt_util.as_local(datetime.fromtimestamp(key, timezone.utc)).date()
+            if local_day_bounds(day)[1] != key:
+                return None
+            # The current balance less the net of all days after day
+            income_before, expenses_before = rollups.totals_before(
+                GRANULARITY_DAY, (day + timedelta(days=1)).isoformat()
+            )
+            return self.balance - (
+                (income - income_before) - (expenses - expenses_before)
+            )
+
+        checkpoints = self._state.checkpoints
+        position = bisect_right(checkpoints, (key, math.inf))
+        if position and (
+            oldest is None or key < oldest or checkpoints[position - 1][0] >= oldest
+        ):
+            checkpoint_key, balance = checkpoints[position - 1]
+            return balance + sum(
+                tx.amount for tx in self._ts_index.between(checkpoint_key + 1, key)
+            )
+        return self.balance - sum(
+            tx.amount for tx in self._ts_index.between(key + 1, None)
+        )
+
+    def rollup(self, granularity: str, count: int) -> list[dict[str, Any]]:
+        """Return income and expenses of the newest count periods with data.
+
+        granularity is one of GRANULARITIES; periods are oldest first.
+        """
+        return self._state.rollups.buckets(granularity, count)
+
+    def totals_before(self, day: date) -> tuple[float, float]:
+        """Return the income and expenses of all local days before day.
+
+        Read from the rollups, so trimmed transactions are included.
+        """
+        return self._state.rollups.totals_before(GRANULARITY_DAY, day.isoformat())
+
+    def plan_stats(self, plan_id: str) -> dict[str, Any]:
+        """Return the cumulative total, count and last posting time of a plan.
+
+        Only transactions still retained in the ledger are counted.
+        """
+        last = self._plan_index.last(plan_id)
+        return {
+            "total": self._plan_index.total(plan_id),
+            "count": self._plan_index.count(plan_id),
+            "last_posted": last.timestamp if last else None,
+        }
+
     def add_transaction(
         self, transaction: Transaction, max_transactions: int = 1000
-    ) -> None:
+    ) -> Transaction:
         """Add a transaction and update balance.
 
+        A transaction without a category is classified by the rules of the
+        owning FinanceData first.
+
         Args:
             transaction: The transaction to add.
             max_transactions: Maximum number of transactions to keep (default 1000).
+
+        Returns:
+            The transaction as stored.
         """
-        self.balance += transaction.amount
-        self.transactions.append(transaction)
+        if transaction.category is None and self._owner is not None:
+            transaction = self._owner.rule_engine.classify(transaction)
+
+        key = transaction.ts
+        previous = self._ts_index.last_key
+        checkpoints = _shift_checkpoints(
+            self._state.checkpoints, key, transaction.amount
+        )
+        if previous is not None and key > previous:
+            # Appending the newest transaction: maybe checkpoint the balance before it
+            since = self._ts_index.count(
+                checkpoints[-1][0] + 1 if checkpoints else None, None
+            )
+            checkpoint = _next_checkpoint(previous, key, self.balance, since)
+            if checkpoint is not None and (
+                not checkpoints or checkpoint[0] > checkpoints[-1][0]
+            ):
+                checkpoints = (*checkpoints, checkpoint)
+
+        balance = self.balance + transaction.amount
+        transactions = self.transactions.append(transaction)
+        running_balances = self.running_balances.append(balance)
 
         # Trim old transactions if exceeding limit
-        if len(self.transactions) > max_transactions:
-            self.transactions = self.transactions[-max_transactions:]
+        dropped: list[Transaction] = []
+        if len(transactions) > max_transactions:
+            excess = len(transactions) - max_transactions
+            dropped = transactions[:excess]
+            transactions = transactions.drop_front(excess)
+            running_balances = running_balances.drop_front(excess)
+
+        self._seq[transaction.id] = self._seq_base + len(transactions) + len(dropped) - 1
+        self._ts_index.add(transaction)
+        self._plan_index.add(transaction)
+        self._note_index.add(transaction)
+        self._track_spending(transaction, 1)
+        for old in dropped:
+            del self._seq[old.id]
+            self._ts_index.remove(old)
+            self._plan_index.remove(old)
+            self._note_index.remove(old)
+        self._seq_base += len(dropped)
+
+        if dropped:
+            # Only month-end checkpoints are kept for the trimmed history
+            oldest = self._ts_index.first_key
+            checkpoints = tuple(
+                checkpoint
+                for checkpoint in checkpoints
+                if oldest is None or checkpoint[0] >= oldest or _is_month_end(checkpoint[0])
+            )
+
+        self._commit(
+            upserted=(transaction.id,),
+            removed=[old.id for old in dropped],
+            transactions=transactions,
+            running_balances=running_balances,
+            balance=balance,
+            checkpoints=checkpoints,
+            rollups=self._state.rollups.apply(added=(transaction,)),
+        )
+        return transaction
+
+    def update_transaction(
+        self, transaction_id: str, **changes: Any
+    ) -> tuple[Transaction, Transaction] | None:
+        """Replace a transaction with an edited copy and update balance.
+
+        Returns the old and new transaction, or None if it was not found.
+        """
+        index = self._index_of(transaction_id)
+        if index is None:
+            return None
+
+        old = self.transactions[index]
+        new = replace(old, **changes)
+        transactions = self.transactions.set(index, new)
+        running_balances = self.running_balances
+        if new.amount != old.amount:
+            base = self.running_balances[index - 1] if index else self.opening_balance
+            running_balances = _recompute_suffix(
+                transactions, running_balances, index, base
+            )
+        checkpoints = _shift_checkpoints(
+            self._state.checkpoints, old.ts, -old.amount
+        )
+        checkpoints = _shift_checkpoints(
+            checkpoints, new.ts, new.amount
+        )
+        self._commit(
+            upserted=(new.id,),
+            resync=new.amount != old.amount and index < len(transactions) - 1,
+            transactions=transactions,
+            running_balances=running_balances,
+            balance=self.balance + new.amount - old.amount,
+            checkpoints=checkpoints,
+            rollups=(
+                self._state.rollups.apply(removed=(old,), added=(new,))
+                if new.amount != old.amount or new.timestamp != old.timestamp
+                else self._state.rollups
+            ),
+        )
+        self._ts_index.replace(old, new)
+        self._plan_index.replace(old, new)
+        self._note_index.replace(old, new)
+        if new.amount != old.amount or new.timestamp != old.timestamp:
+            self._track_spending(old, -1)
+            self._track_spending(new, 1)
+        return old, new
+
+    def remove_transaction(self, transaction_id: str) -> Transaction | None:
+        """Remove a transaction and reverse its balance change."""
+        index = self._index_of(transaction_id)
+        if index is None:
+            return None
+
+        old = self.transactions[index]
+        base = self.running_balances[index - 1] if index else self.opening_balance
+        transactions = self.transactions.delete(index)
+        running_balances = _recompute_suffix(
+            transactions, self.running_balances.delete(index), index, base
+        )
+        self._commit(
+            removed=(old.id,),
+            resync=index < len(transactions),
+            transactions=transactions,
+            running_balances=running_balances,
+            balance=self.balance - old.amount,
+            checkpoints=_shift_checkpoints(
+                self._state.checkpoints, old.ts, -old.amount
+            ),
+            rollups=self._state.rollups.apply(removed=(old,)),
+        )
+        self._seq = {tx.id: position for position, tx in enumerate(transactions)}
+        self._seq_base = 0
+        self._ts_index.remove(old)
+        self._plan_index.remove(old)
+        self._note_index.remove(old)
+        self._track_spending(old, -1)
+        return old
+
+    def reclassify(self, engine: RuleEngine, overwrite: bool = False) -> int:
+        """Classify the whole ledger in one pass and return the number changed."""
+        changed: list[tuple[Transaction, Transaction]] = []
+        transactions: list[Transaction] = []
+        for old in self.transactions:
+            new = engine.classify(old, overwrite)
+            transactions.append(new)
+            if new is not old:
+                changed.append((old, new))
+        if not changed:
+            return 0
+
+        # Amounts are unchanged, so running balances and checkpoints stay valid
+        self._commit(
+            upserted=[new.id for _, new in changed],
+            transactions=PersistentVector(transactions),
+        )
+        self._ts_index = TimestampIndex(transactions)
+        for old, new in changed:
+            self._plan_index.replace(old, new)
+            self._note_index.replace(old, new)
+        return len(changed)
+
+    def relocalize(self) -> None:
+        """Recompute the local dates of all transactions for a new time zone.
+
+        The retained transactions are moved to their new rollup buckets;
+        rollups of trimmed history keep the buckets of the old time zone.
+        """
+        old = list(self.transactions)
+        new = [replace(tx) for tx in old]
+        self._commit(
+            transactions=PersistentVector(new),
+            rollups=self._state.rollups.apply(removed=old, added=new),
+        )
+        self._rebuild_indexes()
 
     def add_recurring_plan(self, plan: RecurringPlan) -> None:
-        """Add a recurring plan."""
-        self.recurring_plans[plan.id] = plan
+        """Add or replace a recurring plan."""
+        self._commit(recurring_plans=self.recurring_plans.set(plan.id, plan))
+
+    def update_recurring_plan(
+        self, plan_id: str, **changes: Any
+    ) -> RecurringPlan | None:
+        """Replace a recurring plan with an edited copy."""
+        plan = self.recurring_plans.get(plan_id)
+        if plan is None:
+            return None
+        plan = replace(plan, **changes)
+        self.add_recurring_plan(plan)
+        return plan
 
     def remove_recurring_plan(self, plan_id: str) -> None:
         """Remove a recurring plan."""
-        if plan_id in self.recurring_plans:
-            del self.recurring_plans[plan_id]
+        self._commit(recurring_plans=self.recurring_plans.delete(plan_id))
 
 
-@dataclass
-class FinanceData:
-    """Root data structure for all finance data."""
+@dataclass(frozen=True)
+class FinanceSnapshot:
+    """Immutable point-in-time view of all finance data."""
 
-    accounts: dict[str, Account] = field(default_factory=dict)
+    accounts: PersistentMap[str, AccountSnapshot]
+    rules: PersistentMap[str, ClassificationRule] = field(
+        default_factory=PersistentMap
+    )
+    budgets: PersistentMap[str, Budget] = field(default_factory=PersistentMap)
 
     def to_dict(self) -> dict[str, Any]:
-        """Convert to dictionary for storage."""
+        """Convert to a single dictionary holding all data."""
         return {
+            **self.index_dict(),
             "accounts": {
                 account_id: account.to_dict()
                 for account_id, account in self.accounts.items()
-            }
+            },
+        }
+
+    def index_dict(self) -> dict[str, Any]:
+        """Convert everything but the accounts themselves for the index file."""
+        return {
+            "accounts": sorted(self.accounts),
+            "rules": {rule_id: rule.to_dict() for rule_id, rule in self.rules.items()},
+            "budgets": {
+                category: budget.to_dict()
+                for category, budget in self.budgets.items()
+            },
         }
 
+
+@dataclass
+class FinanceData:
+    """Root data structure for all finance data.
+
+    Besides the account handles, the current state of every account is
+    kept in a persistent map that the handles update on each mutation, so
+    a snapshot of all data is a single reference.
+    """
+
+    accounts: dict[str, Account] = field(default_factory=dict)
+    rules: PersistentMap[str, ClassificationRule] = field(
+        default_factory=PersistentMap
+    )
+    budgets: PersistentMap[str, Budget] = field(default_factory=PersistentMap)
+    _states: PersistentMap[str, AccountSnapshot] = field(
+        default_factory=PersistentMap, init=False, repr=False
+    )
+    _rule_engine: RuleEngine | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        """Bind the initial accounts."""
+        for account in self.accounts.values():
+            self._bind(account)
+
+    def _bind(self, account: Account) -> None:
+        """Make an account publish its state to this data."""
+        account._owner = self
+        self._states = self._states.set(account.id, account.snapshot())
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for storage."""
+        return self.snapshot().to_dict()
+
+    def snapshot(self) -> FinanceSnapshot:
+        """Return an immutable view of all accounts (O(1)).
+
+        The expensive to_dict() of the result can run in the executor.
+        """
+        return FinanceSnapshot(
+            accounts=self._states, rules=self.rules, budgets=self.budgets
+        )
+
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> FinanceData:
         """Create from dictionary."""
@@ -205,7 +1198,19 @@ class FinanceData:
             account_id: Account.from_dict(account_id, account_data)
             for account_id, account_data in data.get("accounts", {}).items()
         }
-        return cls(accounts=accounts)
+        rules = {
+            rule_id: ClassificationRule.from_dict(rule_id, rule_data)
+            for rule_id, rule_data in data.get("rules", {}).items()
+        }
+        budgets = {
+            category: Budget.from_dict(category, budget_data)
+            for category, budget_data in data.get("budgets", {}).items()
+        }
+        return cls(
+            accounts=accounts,
+            rules=PersistentMap(rules),
+            budgets=PersistentMap(budgets),
+        )
 
     def get_account(self, account_id: str) -> Account | None:
         """Get an account by ID."""
@@ -214,8 +1219,37 @@ class FinanceData:
     def add_account(self, account: Account) -> None:
         """Add an account."""
         self.accounts[account.id] = account
+        self._bind(account)
 
     def remove_account(self, account_id: str) -> None:
         """Remove an account."""
         if account_id in self.accounts:
-            del self.accounts[account_id]
+            self.accounts.pop(account_id)._owner = None
+            self._states = self._states.delete(account_id)
+
+    @property
+    def rule_engine(self) -> RuleEngine:
+        """Return the classification rules compiled into a matcher."""
+        if self._rule_engine is None:
+            self._rule_engine = RuleEngine(self.rules.values())
+        return self._rule_engine
+
+    def set_rule(self, rule: ClassificationRule) -> None:
+        """Add or replace a classification rule."""
+        self.rules = self.rules.set(rule.id, rule)
+        self._rule_engine = None
+
+    def remove_rule(self, rule_id: str) -> None:
+        """Remove a classification rule."""
+        if rule_id in self.rules:
+            self.rules = self.rules.delete(rule_id)
+            self._rule_engine = None
+
+    def set_budget(self, budget: Budget) -> None:
+        """Add or replace the budget of a category."""
+        self.budgets = self.budgets.set(budget.category, budget)
+
+    def remove_budget(self, category: str) -> None:
+        """Remove the budget of a category."""
+        if category in self.budgets:
+            self.budgets = self.budgets.delete(category)
@@ -1,25 +1,43 @@
 """Panel and WebSocket API for Ha Finance Record."""
 from __future__ import annotations
 
+from collections.abc import Callable, Hashable, Iterable
+from datetime import date
+from functools import partial
+import heapq
+import json
 import logging
+from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
+from aiohttp import hdrs, web
 import voluptuous as vol
 
 from homeassistant.components import frontend, websocket_api
-from homeassistant.components.http import StaticPathConfig
+from homeassistant.components.http import HomeAssistantView
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv, entity_registry as er
 
 from .const import (
     DOMAIN,
+    FORMAT_COLUMNS,
+    FORMAT_ROWS,
     FREQUENCY_DAILY,
     FREQUENCY_MONTHLY,
     FREQUENCY_OPTIONS,
     FREQUENCY_WEEKLY,
     FREQUENCY_YEARLY,
-    TRANSACTION_MANUAL,
+    GRANULARITIES,
+    GRANULARITY_MONTH,
+    SEARCH_CANDIDATE_LIMIT,
+    WIRE_FORMATS,
 )
-from .models import RecurringPlan, Transaction
+from .coordinator import record_transaction
+from .hub import async_get_hub
+from .indexes import local_day_bounds, timestamp_key
+from .models import Budget, ClassificationRule, RecurringPlan
+from .pipeline import Mutation, MutationError
+from .wire import encode_columns
 
 if TYPE_CHECKING:
     from .coordinator import FinanceCoordinator
@@ -31,7 +49,14 @@ PANEL_URL = "/ha_finance_panel"
 PANEL_ICON = "mdi:finance"
 PANEL_TITLE = "Finance Record"
 PANEL_TITLE_ZH = "財務紀錄"
-PANEL_VERSION = "3.1.0"  # Account management tab + date filters
+# Built by frontend/build.mjs; the manifest maps the entry to its hashed name
+PANEL_BUNDLE = "ha-finance-panel.js"
+PANEL_DIST_PATH = "custom_components/ha_finance/frontend/dist"
+# Bundle file names change with their content, so they never go stale
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Key for tracking the bundle view registration in hass.data[DOMAIN]
+_PANEL_VIEW_KEY = "_panel_view"
 
 
 def _get_panel_title(hass: HomeAssistant) -> str:
@@ -42,20 +67,55 @@ def _get_panel_title(hass: HomeAssistant) -> str:
     return PANEL_TITLE
 
 
-async def async_setup_panel(hass: HomeAssistant) -> None:
-    """Set up the Ha Finance panel."""
-    # Register static path for frontend files
-    await hass.http.async_register_static_paths(
-        [
-            StaticPathConfig(
-                PANEL_URL,
-                hass.config.path(
-                    "custom_components/ha_finance/frontend"
-                ),
-                cache_headers=False,
-            )
-        ]
-    )
+class FinancePanelView(HomeAssistantView):
+    """Serve the built panel bundle with immutable caching.
+
+    Only the files listed by the build are served. aiohttp picks the
+    precompressed .br or .gz variant when the browser accepts it.
+    """
+
+    url = PANEL_URL + "/{filename}"
+    name = "ha_finance:panel"
+    requires_auth = False
+
+    def __init__(self, dist: Path, files: Iterable[str]) -> None:
+        """Initialize the view."""
+        self._dist = dist
+        self._files = frozenset(files)
+
+    async def get(self, request: web.Request, filename: str) -> web.FileResponse:
+        """Serve a bundle file."""
+        if filename not in self._files:
+            raise web.HTTPNotFound
+        return web.FileResponse(
+            self._dist / filename,
+            headers={hdrs.CACHE_CONTROL: IMMUTABLE_CACHE_CONTROL},
+        )
+
+
+def _load_panel_manifest(dist: Path) -> dict[str, str]:
+    """Read the build manifest mapping bundle entries to hashed file names."""
+    return json.loads((dist / "manifest.json").read_text(encoding="utf-8"))
+
+
+async def _async_register_frontend(hass: HomeAssistant) -> None:
+    """Serve the panel bundle and add the panel to the sidebar."""
+    dist = Path(hass.config.path(PANEL_DIST_PATH))
+    try:
+        manifest = await hass.async_add_executor_job(_load_panel_manifest, dist)
+    except (OSError, ValueError) as err:
+        _LOGGER.error(
+            "Ha Finance panel bundle not found in %s, install a release or run "
+            "`npm ci && npm run build` in the frontend directory: %s",
+            dist,
+            err,
+        )
+        return
+
+    # Register the view serving the bundle files (views cannot be removed)
+    if not hass.data[DOMAIN].get(_PANEL_VIEW_KEY):
+        hass.http.register_view(FinancePanelView(dist, manifest.values()))
+        hass.data[DOMAIN][_PANEL_VIEW_KEY] = True
 
     # Register the panel using frontend.async_register_built_in_panel
     frontend.async_register_built_in_panel(
@@ -67,12 +127,17 @@ async def async_setup_panel(hass: HomeAssistant) -> None:
         config={
             "_panel_custom": {
                 "name": "ha-finance-panel",
-                "module_url": f"{PANEL_URL}/ha-finance-panel.js?v={PANEL_VERSION}",
+                "module_url": f"{PANEL_URL}/{manifest[PANEL_BUNDLE]}",
             }
         },
         require_admin=False,
     )
 
+
+async def async_setup_panel(hass: HomeAssistant) -> None:
+    """Set up the Ha Finance panel."""
+    await _async_register_frontend(hass)
+
     # Register WebSocket commands
     websocket_api.async_register_command(hass, ws_get_accounts)
     websocket_api.async_register_command(hass, ws_get_account)
@@ -86,6 +151,16 @@ async def async_setup_panel(hass: HomeAssistant) -> None:
     websocket_api.async_register_command(hass, ws_add_account)
     websocket_api.async_register_command(hass, ws_update_account)
     websocket_api.async_register_command(hass, ws_delete_account)
+    websocket_api.async_register_command(hass, ws_get_stats)
+    websocket_api.async_register_command(hass, ws_get_balance_at)
+    websocket_api.async_register_command(hass, ws_search)
+    websocket_api.async_register_command(hass, ws_get_rules)
+    websocket_api.async_register_command(hass, ws_set_rule)
+    websocket_api.async_register_command(hass, ws_delete_rule)
+    websocket_api.async_register_command(hass, ws_reclassify)
+    websocket_api.async_register_command(hass, ws_get_budgets)
+    websocket_api.async_register_command(hass, ws_set_budget)
+    websocket_api.async_register_command(hass, ws_delete_budget)
 
     _LOGGER.info("Ha Finance panel registered")
 
@@ -101,17 +176,59 @@ def _get_store(hass: HomeAssistant) -> FinanceStore:
     return FinanceStore(hass)
 
 
-async def _get_coordinator_for_account(
+def _get_coordinator_for_account(
     hass: HomeAssistant, account_id: str
 ) -> FinanceCoordinator | None:
     """Get coordinator for a specific account."""
-    if DOMAIN not in hass.data:
-        return None
-    for coordinator in hass.data[DOMAIN].values():
-        if hasattr(coordinator, "account") and coordinator.account:
-            if coordinator.account.id == account_id:
-                return coordinator
-    return None
+    return async_get_hub(hass).get_coordinator(account_id)
+
+
+def _validate_account_name(mutation: Mutation, name: str) -> None:
+    """Reject a name used by another account, ignoring case."""
+    for existing in mutation.data.accounts.values():
+        if existing.id != mutation.account_id and existing.name.lower() == name.lower():
+            raise MutationError(
+                "duplicate_name", "Account with this name already exists"
+            )
+
+
+def _date_range_bounds(
+    start_date: date | None, end_date: date | None
+) -> tuple[int | None, int | None]:
+    """Convert an inclusive local date range to epoch-second bounds."""
+    start = end = None
+    if start_date is not None:
+        start = local_day_bounds(start_date)[0]
+    if end_date is not None:
+        end = local_day_bounds(end_date)[1]
+    return start, end
+
+
+def _encode_transactions(
+    rows: list[dict[str, Any]], wire_format: str
+) -> list[dict[str, Any]] | dict[str, Any]:
+    """Encode a list of API transaction dicts in the requested wire format."""
+    if wire_format == FORMAT_COLUMNS:
+        return encode_columns(rows)
+    return rows
+
+
+def _send_cached_result(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg_id: int,
+    account_id: str,
+    version: int,
+    key: Hashable,
+    build: Callable[[], dict[str, Any]],
+) -> None:
+    """Send a read result from the encoded responses shared by all connections."""
+    payload = async_get_hub(hass).responses.get_or_build(
+        account_id, version, key, build
+    )
+    connection.send_message(
+        websocket_api.messages.construct_result_message(msg_id, payload)
+    )
 
 
 # WebSocket Handlers
@@ -136,6 +253,7 @@ async def ws_get_accounts(
             "id": account.id,
             "name": account.name,
             "balance": account.balance,
+            "version": account.version,
         }
         for account in store.data.accounts.values()
     ]
@@ -147,6 +265,10 @@ async def ws_get_accounts(
     {
         vol.Required("type"): "ha_finance/account",
         vol.Required("account_id"): str,
+        vol.Optional("start_date"): cv.date,
+        vol.Optional("end_date"): cv.date,
+        vol.Optional("since_version"): vol.Coerce(int),
+        vol.Optional("format", default=FORMAT_ROWS): vol.In(WIRE_FORMATS),
     }
 )
 @websocket_api.async_response
@@ -155,7 +277,21 @@ async def ws_get_account(
     connection: websocket_api.ActiveConnection,
     msg: dict[str, Any],
 ) -> None:
-    """Get account details including transactions and plans."""
+    """Get account details including transactions and plans.
+
+    With start_date and/or end_date only transactions within that inclusive
+    local date range are returned, sorted by timestamp.
+
+    With since_version, the version of an earlier response, the result is
+    only {"version", "not_modified": True} if the account did not change.
+    Otherwise, if the changes since are still known, the account carries
+    just the changed transactions, with "delta" set and the IDs of the
+    transactions to drop in "removed". Clients must query the same date
+    range as for the earlier response.
+
+    With format "columns" the transactions are sent in the columnar
+    format of wire.encode_columns instead of as a list of dicts.
+    """
     store = _get_store(hass)
     await store.async_load()
 
@@ -164,19 +300,69 @@ async def ws_get_account(
         connection.send_error(msg["id"], "not_found", "Account not found")
         return
 
-    result = {
-        "account": {
-            "id": account.id,
-            "name": account.name,
-            "balance": account.balance,
-            "transactions": [tx.to_dict() for tx in account.transactions],
-            "recurring_plans": {
-                plan_id: plan.to_dict()
-                for plan_id, plan in account.recurring_plans.items()
+    # Read from an immutable snapshot so the payload is consistent
+    snapshot = account.snapshot()
+    since_version = msg.get("since_version")
+    if since_version == snapshot.version:
+        connection.send_result(
+            msg["id"], {"version": snapshot.version, "not_modified": True}
+        )
+        return
+
+    def build_result(transactions: list[dict[str, Any]]) -> dict[str, Any]:
+        return {
+            "version": snapshot.version,
+            "format": msg["format"],
+            "account": {
+                "id": snapshot.id,
+                "name": snapshot.name,
+                "balance": snapshot.balance,
+                "transactions": _encode_transactions(transactions, msg["format"]),
+                "recurring_plans": {
+                    plan_id: {
+                        **plan.to_dict(),
+                        **account.plan_stats(plan_id),
+                        "next_ts": timestamp_key(plan.next_date) if plan.next_date else None,
+                    }
+                    for plan_id, plan in snapshot.recurring_plans.items()
+                },
             },
         }
-    }
 
+    bounds = _date_range_bounds(msg.get("start_date"), msg.get("end_date"))
+    delta = account.changes_since(since_version) if since_version is not None else None
+    if delta is None:
+        # Both bounds are None exactly when no date range was requested
+        _send_cached_result(
+            hass,
+            connection,
+            msg["id"],
+            snapshot.id,
+            snapshot.version,
+            ("account", bounds, msg["format"]),
+            lambda: build_result(
+                account.transaction_dicts_between(*bounds)
+                if bounds != (None, None)
+                else snapshot.transaction_dicts()
+            ),
+        )
+        return
+
+    start, end = bounds
+    transactions = []
+    removed = list(delta.removed)
+    for tx in delta.upserted:
+        key = tx.ts
+        if (start is None or key >= start) and (end is None or key <= end):
+            transactions.append(
+                {**tx.to_api_dict(), "running_balance": account.running_balance_of(tx.id)}
+            )
+        else:
+            removed.append(tx.id)
+
+    result = build_result(transactions)
+    result["delta"] = True
+    result["removed"] = removed
     connection.send_result(msg["id"], result)
 
 
@@ -186,6 +372,8 @@ async def ws_get_account(
         vol.Required("account_id"): str,
         vol.Required("amount"): vol.Coerce(float),
         vol.Optional("note", default=""): str,
+        vol.Optional("category"): vol.Any(None, str),
+        vol.Optional("tags", default=list): [str],
     }
 )
 @websocket_api.async_response
@@ -195,38 +383,24 @@ async def ws_add_transaction(
     msg: dict[str, Any],
 ) -> None:
     """Add a new transaction."""
-    coordinator = await _get_coordinator_for_account(hass, msg["account_id"])
-    transaction: Transaction | None = None
-
-    if coordinator is None:
-        # Fall back to direct store access
-        store = _get_store(hass)
-        await store.async_load()
-        account = store.data.get_account(msg["account_id"])
-        if account is None:
-            connection.send_error(msg["id"], "not_found", "Account not found")
-            return
-
-        transaction = Transaction.create(
-            amount=msg["amount"],
-            note=msg["note"],
-            transaction_type=TRANSACTION_MANUAL,
+    try:
+        transaction = await async_get_hub(hass).pipeline.async_execute(
+            msg["account_id"],
+            partial(
+                record_transaction,
+                amount=msg["amount"],
+                note=msg["note"],
+                category=msg.get("category"),
+                tags=msg["tags"],
+            ),
         )
-        account.add_transaction(transaction)
-        await store.async_save()
-    else:
-        transaction = await coordinator.async_add_transaction(
-            amount=msg["amount"],
-            note=msg["note"],
-        )
-
-    if transaction is None:
-        connection.send_error(msg["id"], "error", "Failed to create transaction")
+    except MutationError as err:
+        connection.send_error(msg["id"], err.code, str(err))
         return
 
     connection.send_result(
         msg["id"],
-        {"success": True, "transaction": transaction.to_dict()},
+        {"success": True, "transaction": transaction.to_api_dict()},
     )
 
 
@@ -237,6 +411,8 @@ async def ws_add_transaction(
         vol.Required("transaction_id"): str,
         vol.Optional("amount"): vol.Coerce(float),
         vol.Optional("note"): str,
+        vol.Optional("category"): vol.Any(None, str),
+        vol.Optional("tags"): [str],
     }
 )
 @websocket_api.async_response
@@ -246,42 +422,21 @@ async def ws_update_transaction(
     msg: dict[str, Any],
 ) -> None:
     """Update an existing transaction."""
-    store = _get_store(hass)
-    await store.async_load()
-
-    account = store.data.get_account(msg["account_id"])
-    if account is None:
-        connection.send_error(msg["id"], "not_found", "Account not found")
-        return
-
-    # Find and update transaction
-    transaction = None
-    for tx in account.transactions:
-        if tx.id == msg["transaction_id"]:
-            transaction = tx
-            break
-
-    if transaction is None:
-        connection.send_error(msg["id"], "not_found", "Transaction not found")
+    changes = {key: msg[key] for key in ("amount", "note", "category") if key in msg}
+    if "tags" in msg:
+        changes["tags"] = tuple(msg["tags"])
+
+    try:
+        await async_get_hub(hass).pipeline.async_execute(
+            msg["account_id"],
+            lambda mutation: mutation.update_transaction(
+                msg["transaction_id"], **changes
+            ),
+        )
+    except MutationError as err:
+        connection.send_error(msg["id"], err.code, str(err))
         return
 
-    # Update balance if amount changed
-    if "amount" in msg:
-        old_amount = transaction.amount
-        new_amount = msg["amount"]
-        account.balance += (new_amount - old_amount)
-        transaction.amount = new_amount
-
-    if "note" in msg:
-        transaction.note = msg["note"]
-
-    await store.async_save()
-
-    # Refresh coordinator if available
-    coordinator = await _get_coordinator_for_account(hass, msg["account_id"])
-    if coordinator:
-        await coordinator.async_refresh()
-
     connection.send_result(msg["id"], {"success": True})
 
 
@@ -299,35 +454,15 @@ async def ws_delete_transaction(
     msg: dict[str, Any],
 ) -> None:
     """Delete a transaction."""
-    store = _get_store(hass)
-    await store.async_load()
-
-    account = store.data.get_account(msg["account_id"])
-    if account is None:
-        connection.send_error(msg["id"], "not_found", "Account not found")
-        return
-
-    # Find and remove transaction
-    transaction = None
-    for i, tx in enumerate(account.transactions):
-        if tx.id == msg["transaction_id"]:
-            transaction = tx
-            account.transactions.pop(i)
-            break
-
-    if transaction is None:
-        connection.send_error(msg["id"], "not_found", "Transaction not found")
+    try:
+        await async_get_hub(hass).pipeline.async_execute(
+            msg["account_id"],
+            lambda mutation: mutation.remove_transaction(msg["transaction_id"]),
+        )
+    except MutationError as err:
+        connection.send_error(msg["id"], err.code, str(err))
         return
 
-    # Reverse the balance change
-    account.balance -= transaction.amount
-    await store.async_save()
-
-    # Refresh coordinator if available
-    coordinator = await _get_coordinator_for_account(hass, msg["account_id"])
-    if coordinator:
-        await coordinator.async_refresh()
-
     connection.send_result(msg["id"], {"success": True})
 
 
@@ -352,7 +487,7 @@ async def ws_add_plan(
     """Add a new recurring plan."""
     import uuid
 
-    coordinator = await _get_coordinator_for_account(hass, msg["account_id"])
+    coordinator = _get_coordinator_for_account(hass, msg["account_id"])
 
     if coordinator:
         # Generate plan_id
@@ -368,7 +503,7 @@ async def ws_add_plan(
         )
         connection.send_result(msg["id"], {"success": True, "plan_id": plan_id})
     else:
-        connection.send_error(msg["id"], "not_found", "Account coordinator not found")
+        connection.send_error(msg["id"], "not_found", "Account not found")
 
 
 @websocket_api.websocket_command(
@@ -391,10 +526,10 @@ async def ws_update_plan(
     msg: dict[str, Any],
 ) -> None:
     """Update a recurring plan."""
-    coordinator = await _get_coordinator_for_account(hass, msg["account_id"])
+    coordinator = _get_coordinator_for_account(hass, msg["account_id"])
 
     if coordinator is None:
-        connection.send_error(msg["id"], "not_found", "Account coordinator not found")
+        connection.send_error(msg["id"], "not_found", "Account not found")
         return
 
     # Extract update fields
@@ -403,7 +538,11 @@ async def ws_update_plan(
         if field in msg:
             update_fields[field] = msg[field]
 
-    await coordinator.async_update_recurring_plan(msg["plan_id"], **update_fields)
+    try:
+        await coordinator.async_update_recurring_plan(msg["plan_id"], **update_fields)
+    except MutationError as err:
+        connection.send_error(msg["id"], err.code, str(err))
+        return
     connection.send_result(msg["id"], {"success": True})
 
 
@@ -421,13 +560,17 @@ async def ws_delete_plan(
     msg: dict[str, Any],
 ) -> None:
     """Delete a recurring plan."""
-    coordinator = await _get_coordinator_for_account(hass, msg["account_id"])
+    coordinator = _get_coordinator_for_account(hass, msg["account_id"])
 
     if coordinator is None:
-        connection.send_error(msg["id"], "not_found", "Account coordinator not found")
+        connection.send_error(msg["id"], "not_found", "Account not found")
         return
 
-    await coordinator.async_remove_recurring_plan(msg["plan_id"])
+    try:
+        await coordinator.async_remove_recurring_plan(msg["plan_id"])
+    except MutationError as err:
+        connection.send_error(msg["id"], err.code, str(err))
+        return
     connection.send_result(msg["id"], {"success": True})
 
 
@@ -436,6 +579,9 @@ async def ws_delete_plan(
         vol.Required("type"): "ha_finance/chart_data",
         vol.Required("account_id"): str,
         vol.Optional("months", default=6): vol.Coerce(int),
+        vol.Optional("granularity", default=GRANULARITY_MONTH): vol.In(GRANULARITIES),
+        vol.Optional("count"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional("since_version"): vol.Coerce(int),
     }
 )
 @websocket_api.async_response
@@ -444,10 +590,18 @@ async def ws_get_chart_data(
     connection: websocket_api.ActiveConnection,
     msg: dict[str, Any],
 ) -> None:
-    """Get chart data for income vs expenses by month."""
-    from datetime import datetime
-    from collections import defaultdict
-
+    """Get chart data for income vs expenses per day, week, month or year.
+
+    Returns the newest count periods with transactions (months for the
+    month granularity), oldest first, read from the account's rollups, so
+    trimmed transactions are still included. Periods are keyed by local
+    date: YYYY-MM-DD for days, the date of the Monday for weeks, YYYY-MM
+    and YYYY. Monthly data also carries the key as "month".
+
+    Answers {"version", "not_modified": True} if since_version is the
+    current version of the account. since_version must come from a response
+    for the same granularity and count, which the response echoes.
+    """
     store = _get_store(hass)
     await store.async_load()
 
@@ -456,37 +610,35 @@ async def ws_get_chart_data(
         connection.send_error(msg["id"], "not_found", "Account not found")
         return
 
-    # Group transactions by month
-    months_data: dict[str, dict[str, float]] = defaultdict(
-        lambda: {"income": 0.0, "expenses": 0.0}
-    )
-
-    for tx in account.transactions:
-        try:
-            tx_date = datetime.fromisoformat(tx.timestamp)
-            month_key = tx_date.strftime("%Y-%m")
-
-            if tx.amount >= 0:
-                months_data[month_key]["income"] += tx.amount
-            else:
-                months_data[month_key]["expenses"] += abs(tx.amount)
-        except (ValueError, TypeError):
-            continue
-
-    # Sort by month and limit to requested number
-    sorted_months = sorted(months_data.keys(), reverse=True)[: msg["months"]]
-    sorted_months.reverse()  # Oldest first for chart
+    version = account.version
+    if msg.get("since_version") == version:
+        connection.send_result(msg["id"], {"version": version, "not_modified": True})
+        return
 
-    chart_data = [
-        {
-            "month": month,
-            "income": round(months_data[month]["income"], 2),
-            "expenses": round(months_data[month]["expenses"], 2),
+    granularity = msg["granularity"]
+    count = msg.get("count", msg["months"])
+
+    def build_result() -> dict[str, Any]:
+        chart_data = account.rollup(granularity, count)
+        if granularity == GRANULARITY_MONTH:
+            for data in chart_data:
+                data["month"] = data["period"]
+        return {
+            "version": version,
+            "granularity": granularity,
+            "count": count,
+            "data": chart_data,
         }
-        for month in sorted_months
-    ]
 
-    connection.send_result(msg["id"], {"data": chart_data})
+    _send_cached_result(
+        hass,
+        connection,
+        msg["id"],
+        account.id,
+        version,
+        ("chart_data", granularity, count),
+        build_result,
+    )
 
 
 # Account Management WebSocket Handlers
@@ -517,24 +669,27 @@ async def ws_add_account(
     account_id = re.sub(r"[^a-zA-Z0-9_]", "_", name.lower())
     account_id = f"{account_id}_{uuid.uuid4().hex[:6]}"
 
-    store = _get_store(hass)
-    await store.async_load()
-
-    # Check for duplicate name
-    for existing in store.data.accounts.values():
-        if existing.name.lower() == name.lower():
-            connection.send_error(msg["id"], "duplicate_name", "Account with this name already exists")
-            return
-
     from .models import Account
 
-    account = Account(
-        id=account_id,
-        name=name,
-        balance=msg["initial_balance"],
-    )
-    store.data.add_account(account)
-    await store.async_save()
+    def add_account(mutation: Mutation) -> Account:
+        _validate_account_name(mutation, name)
+        account = Account(
+            id=account_id,
+            name=name,
+            balance=msg["initial_balance"],
+        )
+        mutation.add_account(account)
+        return account
+
+    hub = async_get_hub(hass)
+    try:
+        account = await hub.pipeline.async_execute(
+            account_id, add_account, must_exist=False
+        )
+    except MutationError as err:
+        connection.send_error(msg["id"], err.code, str(err))
+        return
+    await hub.async_setup_account(account_id)
 
     connection.send_result(
         msg["id"],
@@ -568,6 +723,76 @@ async def ws_update_account(
         connection.send_error(msg["id"], "invalid_name", "Account name cannot be empty")
         return
 
+    def rename(mutation: Mutation) -> None:
+        _validate_account_name(mutation, name)
+        mutation.account.name = name
+
+    try:
+        await async_get_hub(hass).pipeline.async_execute(msg["account_id"], rename)
+    except MutationError as err:
+        connection.send_error(msg["id"], err.code, str(err))
+        return
+
+    connection.send_result(msg["id"], {"success": True})
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "ha_finance/delete_account",
+        vol.Required("account_id"): str,
+    }
+)
+@websocket_api.async_response
+async def ws_delete_account(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Delete an account."""
+    try:
+        await async_get_hub(hass).pipeline.async_execute(
+            msg["account_id"], Mutation.remove_account
+        )
+    except MutationError as err:
+        connection.send_error(msg["id"], err.code, str(err))
+        return
+
+    connection.send_result(msg["id"], {"success": True})
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "ha_finance/stats",
+    }
+)
+@websocket_api.async_response
+async def ws_get_stats(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Get internal performance statistics."""
+    store = _get_store(hass)
+    connection.send_result(
+        msg["id"],
+        {"store": store.stats, "responses": async_get_hub(hass).responses.stats},
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "ha_finance/balance_at",
+        vol.Required("account_id"): str,
+        vol.Required("date"): cv.date,
+    }
+)
+@websocket_api.async_response
+async def ws_get_balance_at(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Get the balance of an account at the end of a local date."""
     store = _get_store(hass)
     await store.async_load()
 
@@ -576,45 +801,322 @@ async def ws_update_account(
         connection.send_error(msg["id"], "not_found", "Account not found")
         return
 
-    # Check for duplicate name (excluding current account)
-    for existing in store.data.accounts.values():
-        if existing.id != msg["account_id"] and existing.name.lower() == name.lower():
-            connection.send_error(msg["id"], "duplicate_name", "Account with this name already exists")
+    connection.send_result(
+        msg["id"],
+        {
+            "account_id": account.id,
+            "date": msg["date"].isoformat(),
+            "balance": account.balance_at(local_day_bounds(msg["date"])[1]),
+        },
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "ha_finance/search",
+        vol.Required("query"): str,
+        vol.Optional("account_id"): str,
+        vol.Optional("start_date"): cv.date,
+        vol.Optional("end_date"): cv.date,
+        vol.Optional("offset", default=0): vol.All(vol.Coerce(int), vol.Range(min=0)),
+        vol.Optional("limit", default=50): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=500)
+        ),
+        vol.Optional("format", default=FORMAT_ROWS): vol.In(WIRE_FORMATS),
+    }
+)
+@websocket_api.async_response
+async def ws_search(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Search transaction notes of one or all accounts.
+
+    Matches are ranked by relevance, then newest first, and returned one
+    page at a time together with the total number of matches. Only the
+    newest SEARCH_CANDIDATE_LIMIT matches of each account are ranked.
+    format works as for ha_finance/account.
+    """
+    store = _get_store(hass)
+    await store.async_load()
+
+    if "account_id" in msg:
+        account = store.data.get_account(msg["account_id"])
+        if account is None:
+            connection.send_error(msg["id"], "not_found", "Account not found")
             return
+        accounts = [account]
+    else:
+        accounts = list(store.data.accounts.values())
+
+    start, end = _date_range_bounds(msg.get("start_date"), msg.get("end_date"))
+    matches = [
+        (score, key, tx, account)
+        for account in accounts
+        for score, key, tx in account.search_transactions(
+            msg["query"], start, end, SEARCH_CANDIDATE_LIMIT
+        )
+    ]
+    offset, limit = msg["offset"], msg["limit"]
+    page = heapq.nlargest(
+        offset + limit, matches, key=lambda match: (match[0], match[1])
+    )[offset:]
+
+    connection.send_result(
+        msg["id"],
+        {
+            "total": len(matches),
+            "offset": offset,
+            "format": msg["format"],
+            "results": _encode_transactions(
+                [
+                    {
+                        **tx.to_api_dict(),
+                        "account_id": account.id,
+                        "running_balance": account.running_balance_of(tx.id),
+                        "score": score,
+                    }
+                    for score, _, tx, account in page
+                ],
+                msg["format"],
+            ),
+        },
+    )
 
-    account.name = name
-    await store.async_save()
 
-    # Refresh coordinator if available
-    coordinator = await _get_coordinator_for_account(hass, msg["account_id"])
-    if coordinator:
-        await coordinator.async_refresh()
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "ha_finance/rules",
+    }
+)
+@websocket_api.async_response
+async def ws_get_rules(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Get all classification rules."""
+    store = _get_store(hass)
+    await store.async_load()
+
+    connection.send_result(
+        msg["id"],
+        {
+            "rules": {
+                rule_id: rule.to_dict() for rule_id, rule in store.data.rules.items()
+            }
+        },
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "ha_finance/set_rule",
+        vol.Optional("rule_id"): str,
+        vol.Optional("category"): vol.Any(None, str),
+        vol.Optional("tags", default=list): [str],
+        vol.Optional("keywords", default=list): [vol.All(str, vol.Length(min=1))],
+        vol.Optional("min_amount"): vol.Any(None, vol.Coerce(float)),
+        vol.Optional("max_amount"): vol.Any(None, vol.Coerce(float)),
+        vol.Optional("priority", default=100): vol.Coerce(int),
+    }
+)
+@websocket_api.async_response
+async def ws_set_rule(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Add or replace a classification rule.
+
+    Existing transactions are not touched; use ha_finance/reclassify.
+    """
+    import uuid
+
+    if not msg["keywords"] and msg.get("min_amount") is None and msg.get("max_amount") is None:
+        connection.send_error(
+            msg["id"], "invalid_rule", "A rule needs keywords or an amount range"
+        )
+        return
+    if not msg.get("category") and not msg["tags"]:
+        connection.send_error(
+            msg["id"], "invalid_rule", "A rule needs a category or tags"
+        )
+        return
+
+    rule = ClassificationRule(
+        id=msg.get("rule_id") or f"rule_{uuid.uuid4().hex[:8]}",
+        category=msg.get("category"),
+        tags=tuple(msg["tags"]),
+        keywords=tuple(msg["keywords"]),
+        min_amount=msg.get("min_amount"),
+        max_amount=msg.get("max_amount"),
+        priority=msg["priority"],
+    )
+    await async_get_hub(hass).pipeline.async_execute(
+        None, lambda mutation: mutation.data.set_rule(rule)
+    )
+
+    connection.send_result(msg["id"], {"success": True, "rule_id": rule.id})
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "ha_finance/delete_rule",
+        vol.Required("rule_id"): str,
+    }
+)
+@websocket_api.async_response
+async def ws_delete_rule(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Delete a classification rule."""
+
+    def remove_rule(mutation: Mutation) -> None:
+        if msg["rule_id"] not in mutation.data.rules:
+            raise MutationError("not_found", "Rule not found")
+        mutation.data.remove_rule(msg["rule_id"])
+
+    try:
+        await async_get_hub(hass).pipeline.async_execute(None, remove_rule)
+    except MutationError as err:
+        connection.send_error(msg["id"], err.code, str(err))
+        return
 
     connection.send_result(msg["id"], {"success": True})
 
 
 @websocket_api.websocket_command(
     {
-        vol.Required("type"): "ha_finance/delete_account",
-        vol.Required("account_id"): str,
+        vol.Required("type"): "ha_finance/reclassify",
+        vol.Optional("account_id"): str,
+        vol.Optional("overwrite", default=False): bool,
     }
 )
 @websocket_api.async_response
-async def ws_delete_account(
+async def ws_reclassify(
     hass: HomeAssistant,
     connection: websocket_api.ActiveConnection,
     msg: dict[str, Any],
 ) -> None:
-    """Delete an account."""
+    """Apply the classification rules to the history of one or all accounts.
+
+    With overwrite, categories that were already set are replaced when a
+    rule matches.
+    """
     store = _get_store(hass)
     await store.async_load()
 
-    account = store.data.get_account(msg["account_id"])
-    if account is None:
-        connection.send_error(msg["id"], "not_found", "Account not found")
+    if "account_id" in msg:
+        if store.data.get_account(msg["account_id"]) is None:
+            connection.send_error(msg["id"], "not_found", "Account not found")
+            return
+        account_ids = [msg["account_id"]]
+    else:
+        account_ids = list(store.data.accounts)
+
+    reclassify = partial(Mutation.reclassify, overwrite=msg["overwrite"])
+    updated = 0
+    hub = async_get_hub(hass)
+    async with hub.pipeline.deferred_save():
+        for account_id in account_ids:
+            try:
+                updated += await hub.pipeline.async_execute(account_id, reclassify)
+            except MutationError:
+                continue
+
+    connection.send_result(msg["id"], {"success": True, "updated": updated})
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "ha_finance/budgets",
+    }
+)
+@websocket_api.async_response
+async def ws_get_budgets(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Get all budgets with this month's spending."""
+    store = _get_store(hass)
+    await store.async_load()
+
+    hub = async_get_hub(hass)
+    connection.send_result(
+        msg["id"],
+        {"budgets": [hub.budget_status(category) for category in store.data.budgets]},
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "ha_finance/set_budget",
+        vol.Required("category"): vol.All(str, vol.Length(min=1)),
+        vol.Required("amount"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional("thresholds", default=[0.8, 1.0]): [
+            vol.All(vol.Coerce(float), vol.Range(min=0))
+        ],
+    }
+)
+@websocket_api.async_response
+async def ws_set_budget(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Add or replace the monthly budget of a category."""
+    budget = Budget(
+        category=msg["category"],
+        amount=msg["amount"],
+        thresholds=tuple(sorted(set(msg["thresholds"]))),
+    )
+    hub = async_get_hub(hass)
+    await hub.pipeline.async_execute(
+        None, lambda mutation: mutation.data.set_budget(budget)
+    )
+
+    connection.send_result(
+        msg["id"], {"success": True, "budget": hub.budget_status(msg["category"])}
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "ha_finance/delete_budget",
+        vol.Required("category"): str,
+    }
+)
+@websocket_api.async_response
+async def ws_delete_budget(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Delete the budget of a category and its sensors."""
+    category = msg["category"]
+
+    def remove_budget(mutation: Mutation) -> None:
+        if category not in mutation.data.budgets:
+            raise MutationError("not_found", "Budget not found")
+        mutation.data.remove_budget(category)
+
+    try:
+        await async_get_hub(hass).pipeline.async_execute(None, remove_budget)
+    except MutationError as err:
+        connection.send_error(msg["id"], err.code, str(err))
         return
 
-    store.data.remove_account(msg["account_id"])
-    await store.async_save()
+    entity_registry = er.async_get(hass)
+    for suffix in ("spent", "remaining"):
+        entity_id = entity_registry.async_get_entity_id(
+            "sensor", DOMAIN, f"{DOMAIN}_budget_{category}_{suffix}"
+        )
+        if entity_id:
+            entity_registry.async_remove(entity_id)
 
     connection.send_result(msg["id"], {"success": True})
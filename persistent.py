@@ -0,0 +1,393 @@
+"""Persistent (immutable, structurally shared) collections for Ha Finance Record.
+
+Updating one of these collections returns a new collection that shares
+all untouched nodes with the old one. Keeping a reference to an old
+version is therefore a free, consistent snapshot.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from typing import Any, Generic, TypeVar, overload
+
+_T = TypeVar("_T")
+_K = TypeVar("_K")
+_V = TypeVar("_V")
+
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+_HASH_MASK = (1 << 64) - 1
+
+
+class PersistentVector(Sequence[_T]):
+    """Persistent vector backed by a 32-way bit-partitioned trie.
+
+    Appending and replacing an item copy at most one path of the trie
+    (effectively constant time); indexing is O(log32 n). Dropping items
+    from the front only moves an offset and compacts occasionally, which
+    keeps trimming a bounded ledger cheap. Deleting from the middle
+    rebuilds the vector and is O(n).
+    """
+
+    __slots__ = ("_count", "_start", "_shift", "_root", "_tail")
+
+    def __init__(self, items: Iterable[_T] = ()) -> None:
+        """Build a vector from an iterable."""
+        values = list(items)
+        count = len(values)
+        tailoff = self._tailoff_for(count)
+        nodes: list[tuple] = [
+            tuple(values[i : i + _WIDTH]) for i in range(0, tailoff, _WIDTH)
+        ]
+        shift = _BITS
+        while len(nodes) > _WIDTH:
+            nodes = [tuple(nodes[i : i + _WIDTH]) for i in range(0, len(nodes), _WIDTH)]
+            shift += _BITS
+        self._count = count
+        self._start = 0
+        self._shift = shift
+        self._root: tuple = tuple(nodes)
+        self._tail: tuple = tuple(values[tailoff:])
+
+    @classmethod
+    def _make(
+        cls, count: int, start: int, shift: int, root: tuple, tail: tuple
+    ) -> PersistentVector[_T]:
+        """Create a vector from its internal parts."""
+        vector = cls.__new__(cls)
+        vector._count = count
+        vector._start = start
+        vector._shift = shift
+        vector._root = root
+        vector._tail = tail
+        return vector
+
+    @staticmethod
+    def _tailoff_for(count: int) -> int:
+        """Return the number of items stored in the trie for a size."""
+        if count < _WIDTH:
+            return 0
+        return ((count - 1) >> _BITS) << _BITS
+
+    def _leaf_for(self, index: int) -> tuple:
+        """Return the leaf holding a physical index."""
+        if index >= self._tailoff_for(self._count):
+            return self._tail
+        node = self._root
+        for level in range(self._shift, 0, -_BITS):
+            node = node[(index >> level) & _MASK]
+        return node
+
+    def __len__(self) -> int:
+        """Return the number of items."""
+        return self._count - self._start
+
+    @overload
+    def __getitem__(self, index: int) -> _T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[_T]: ...
+
+    def __getitem__(self, index: int | slice) -> _T | list[_T]:
+        """Return an item, or a list for a slice."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("vector index out of range")
+        physical = index + self._start
+        return self._leaf_for(physical)[physical & _MASK]
+
+    def __iter__(self) -> Iterator[_T]:
+        """Iterate leaf by leaf."""
+        block = self._start - (self._start & _MASK)
+        first = self._start & _MASK
+        while block < self._count:
+            leaf = self._leaf_for(block)
+            yield from leaf[first:] if first else leaf
+            first = 0
+            block += _WIDTH
+
+    def __repr__(self) -> str:
+        """Return a representation of the vector."""
+        return f"PersistentVector({list(self)!r})"
+
+    def append(self, value: _T) -> PersistentVector[_T]:
+        """Return a new vector with a value appended."""
+        count = self._count
+        if count - self._tailoff_for(count) < _WIDTH:
+            return self._make(
+                count + 1, self._start, self._shift, self._root, self._tail + (value,)
+            )
+
+        # Tail is full: push it into the trie
+        shift = self._shift
+        if (count >> _BITS) > (1 << shift):
+            root = (self._root, self._new_path(shift, self._tail))
+            shift += _BITS
+        else:
+            root = self._push_tail(count, shift, self._root, self._tail)
+        return self._make(count + 1, self._start, shift, root, (value,))
+
+    def _push_tail(self, count: int, level: int, parent: tuple, tail: tuple) -> tuple:
+        """Return a copy of parent with the full tail inserted."""
+        sub = ((count - 1) >> level) & _MASK
+        if level == _BITS:
+            child = tail
+        elif sub < len(parent):
+            child = self._push_tail(count, level - _BITS, parent[sub], tail)
+        else:
+            child = self._new_path(level - _BITS, tail)
+        return parent[:sub] + (child,) + parent[sub + 1 :]
+
+    @staticmethod
+    def _new_path(level: int, node: tuple) -> tuple:
+        """Wrap a node in single-child parents up to a level."""
+        while level:
+            node = (node,)
+            level -= _BITS
+        return node
+
+    def set(self, index: int, value: _T) -> PersistentVector[_T]:
+        """Return a new vector with the item at index replaced."""
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("vector index out of range")
+        physical = index + self._start
+        if physical >= self._tailoff_for(self._count):
+            pos = physical & _MASK
+            tail = self._tail[:pos] + (value,) + self._tail[pos + 1 :]
+            return self._make(self._count, self._start, self._shift, self._root, tail)
+        root = self._assoc(self._shift, self._root, physical, value)
+        return self._make(self._count, self._start, self._shift, root, self._tail)
+
+    def _assoc(self, level: int, node: tuple, index: int, value: _T) -> tuple:
+        """Return a copy of the path to index with the value replaced."""
+        sub = (index >> level) & _MASK
+        if level == 0:
+            return node[:sub] + (value,) + node[sub + 1 :]
+        child = self._assoc(level - _BITS, node[sub], index, value)
+        return node[:sub] + (child,) + node[sub + 1 :]
+
+    def drop_front(self, count: int) -> PersistentVector[_T]:
+        """Return a new vector without the first count items.
+
+        The dropped items stay in the shared trie until more than half of
+        the stored items are dropped, at which point the vector is rebuilt.
+        """
+        if count <= 0:
+            return self
+        start = min(self._start + count, self._count)
+        vector = self._make(self._count, start, self._shift, self._root, self._tail)
+        if start > _WIDTH and start * 2 > self._count:
+            return PersistentVector(vector)
+        return vector
+
+    def delete(self, index: int) -> PersistentVector[_T]:
+        """Return a new vector without the item at index (O(n))."""
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("vector index out of range")
+        items = list(self)
+        del items[index]
+        return PersistentVector(items)
+
+
+class _Entry:
+    """Key/value leaf of a PersistentMap."""
+
+    __slots__ = ("hash", "key", "value")
+
+    def __init__(self, hash_: int, key: Any, value: Any) -> None:
+        """Initialize the entry."""
+        self.hash = hash_
+        self.key = key
+        self.value = value
+
+
+class _Node:
+    """Bitmap-indexed branch of a PersistentMap."""
+
+    __slots__ = ("bitmap", "children")
+
+    def __init__(self, bitmap: int, children: tuple) -> None:
+        """Initialize the node."""
+        self.bitmap = bitmap
+        self.children = children
+
+
+class _Collision:
+    """Entries whose keys share the full hash."""
+
+    __slots__ = ("hash", "entries")
+
+    def __init__(self, hash_: int, entries: tuple[_Entry, ...]) -> None:
+        """Initialize the collision node."""
+        self.hash = hash_
+        self.entries = entries
+
+
+_EMPTY_NODE = _Node(0, ())
+
+
+def _assoc(node: _Node | _Collision, shift: int, entry: _Entry) -> tuple[Any, bool]:
+    """Return a copy of node with entry set, and whether a key was added."""
+    if isinstance(node, _Collision):
+        if node.hash == entry.hash:
+            for i, existing in enumerate(node.entries):
+                if existing.key == entry.key:
+                    entries = node.entries[:i] + (entry,) + node.entries[i + 1 :]
+                    return _Collision(node.hash, entries), False
+            return _Collision(node.hash, node.entries + (entry,)), True
+        bit = 1 << ((node.hash >> shift) & _MASK)
+        return _assoc(_Node(bit, (node,)), shift, entry)
+
+    bit = 1 << ((entry.hash >> shift) & _MASK)
+    idx = (node.bitmap & (bit - 1)).bit_count()
+    children = node.children
+    if not node.bitmap & bit:
+        return _Node(node.bitmap | bit, children[:idx] + (entry,) + children[idx:]), True
+
+    child = children[idx]
+    if isinstance(child, _Entry):
+        if child.key == entry.key:
+            new_child: Any = entry
+            added = False
+        elif child.hash == entry.hash:
+            new_child = _Collision(child.hash, (child, entry))
+            added = True
+        else:
+            new_child, _ = _assoc(_EMPTY_NODE, shift + _BITS, child)
+            new_child, added = _assoc(new_child, shift + _BITS, entry)
+    else:
+        new_child, added = _assoc(child, shift + _BITS, entry)
+    return _Node(node.bitmap, children[:idx] + (new_child,) + children[idx + 1 :]), added
+
+
+def _dissoc(node: _Node | _Collision, shift: int, hash_: int, key: Any) -> tuple[Any, bool]:
+    """Return a copy of node without key (an entry, node or None), and whether it was removed."""
+    if isinstance(node, _Collision):
+        entries = tuple(e for e in node.entries if e.key != key)
+        if len(entries) == len(node.entries):
+            return node, False
+        if len(entries) == 1:
+            return entries[0], True
+        return _Collision(node.hash, entries), True
+
+    bit = 1 << ((hash_ >> shift) & _MASK)
+    if not node.bitmap & bit:
+        return node, False
+    idx = (node.bitmap & (bit - 1)).bit_count()
+    child = node.children[idx]
+    if isinstance(child, _Entry):
+        if child.key != key:
+            return node, False
+        new_child = None
+    else:
+        new_child, removed = _dissoc(child, shift + _BITS, hash_, key)
+        if not removed:
+            return node, False
+
+    if new_child is None:
+        children = node.children[:idx] + node.children[idx + 1 :]
+        if not children:
+            return None, True
+        if len(children) == 1 and isinstance(children[0], _Entry):
+            return children[0], True
+        return _Node(node.bitmap & ~bit, children), True
+    return _Node(node.bitmap, node.children[:idx] + (new_child,) + node.children[idx + 1 :]), True
+
+
+def _iter_entries(node: Any) -> Iterator[_Entry]:
+    """Iterate all entries below a node."""
+    if isinstance(node, _Entry):
+        yield node
+    elif isinstance(node, _Collision):
+        yield from node.entries
+    else:
+        for child in node.children:
+            yield from _iter_entries(child)
+
+
+class PersistentMap(Mapping[_K, _V], Generic[_K, _V]):
+    """Persistent hash map (hash array mapped trie).
+
+    set() and delete() copy one path of at most 13 small nodes; lookups
+    walk the same path. Iteration order is by hash, not insertion.
+    """
+
+    __slots__ = ("_root", "_len")
+
+    def __init__(self, items: Mapping[_K, _V] | Iterable[tuple[_K, _V]] = ()) -> None:
+        """Build a map from a mapping or key/value pairs."""
+        self._root: _Node = _EMPTY_NODE
+        self._len = 0
+        pairs = items.items() if isinstance(items, Mapping) else items
+        for key, value in pairs:
+            entry = _Entry(hash(key) & _HASH_MASK, key, value)
+            self._root, added = _assoc(self._root, 0, entry)
+            self._len += added
+
+    @classmethod
+    def _make(cls, root: Any, length: int) -> PersistentMap[_K, _V]:
+        """Create a map from its internal parts."""
+        if root is None:
+            root = _EMPTY_NODE
+        elif not isinstance(root, _Node):
+            root, _ = _assoc(_EMPTY_NODE, 0, next(_iter_entries(root)))
+        result = cls.__new__(cls)
+        result._root = root
+        result._len = length
+        return result
+
+    def __getitem__(self, key: _K) -> _V:
+        """Return the value for key."""
+        hash_ = hash(key) & _HASH_MASK
+        node: Any = self._root
+        shift = 0
+        while True:
+            if isinstance(node, _Entry):
+                if node.key == key:
+                    return node.value
+                raise KeyError(key)
+            if isinstance(node, _Collision):
+                for entry in node.entries:
+                    if entry.key == key:
+                        return entry.value
+                raise KeyError(key)
+            bit = 1 << ((hash_ >> shift) & _MASK)
+            if not node.bitmap & bit:
+                raise KeyError(key)
+            node = node.children[(node.bitmap & (bit - 1)).bit_count()]
+            shift += _BITS
+
+    def __iter__(self) -> Iterator[_K]:
+        """Iterate the keys."""
+        for entry in _iter_entries(self._root):
+            yield entry.key
+
+    def __len__(self) -> int:
+        """Return the number of keys."""
+        return self._len
+
+    def __repr__(self) -> str:
+        """Return a representation of the map."""
+        return f"PersistentMap({dict(self.items())!r})"
+
+    def set(self, key: _K, value: _V) -> PersistentMap[_K, _V]:
+        """Return a new map with key set to value."""
+        root, added = _assoc(self._root, 0, _Entry(hash(key) & _HASH_MASK, key, value))
+        return self._make(root, self._len + added)
+
+    def delete(self, key: _K) -> PersistentMap[_K, _V]:
+        """Return a new map without key; unchanged if key is missing."""
+        root, removed = _dissoc(self._root, 0, hash(key) & _HASH_MASK, key)
+        if not removed:
+            return self
+        return self._make(root, self._len - 1)
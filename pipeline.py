@@ -0,0 +1,212 @@
+"""Mutation pipeline for Ha Finance Record.
+
+Every change of the finance data runs through the same stages:
+
+1. validate: reject the change by raising MutationError
+2. apply: the change itself, under the account lock
+3. index: bring derived state (totals, alert state) in line with it
+4. persist: save the data
+5. notify: fire events and push the data to entities
+
+Only the apply step differs between callers. The other stages are
+registered handlers, so behaviour like event batching or incremental
+totals is implemented once and applies to the coordinator, the WebSocket
+API and the entities alike.
+"""
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from datetime import date
+import inspect
+from typing import TYPE_CHECKING, Any, Final, TypeVar
+
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import DEFAULT_MAX_TRANSACTIONS
+
+if TYPE_CHECKING:
+    from .models import Account, FinanceData, Transaction
+    from .store import FinanceStore
+
+_T = TypeVar("_T")
+
+STAGE_VALIDATE: Final = "validate"
+STAGE_INDEX: Final = "index"
+STAGE_PERSIST: Final = "persist"
+STAGE_NOTIFY: Final = "notify"
+STAGES: Final = (STAGE_VALIDATE, STAGE_INDEX, STAGE_PERSIST, STAGE_NOTIFY)
+
+Stage = Callable[["Mutation"], Awaitable[None] | None]
+
+
+class MutationError(HomeAssistantError):
+    """A change was rejected; code is the WebSocket error code."""
+
+    def __init__(self, code: str, message: str) -> None:
+        """Initialize the error."""
+        super().__init__(message)
+        self.code = code
+
+
+class Mutation:
+    """A single change of the finance data passing through the pipeline.
+
+    The apply step changes data through the methods of this class, which
+    record what changed for the later stages. account_id is None for
+    changes that are not tied to an account, such as rules and budgets.
+    """
+
+    def __init__(self, data: FinanceData, account_id: str | None) -> None:
+        """Initialize the mutation."""
+        self.data = data
+        self.account_id = account_id
+        self.account: Account | None = (
+            data.get_account(account_id) if account_id is not None else None
+        )
+        self.added: list[Transaction] = []
+        self.removed: list[Transaction] = []
+        # Balance changes not backed by a transaction (new accounts)
+        self.balance_change = 0.0
+        # Set when the change invalidates the totals as a whole
+        self.rebuild_totals = False
+        self.events: list[tuple[str, dict[str, Any]]] = []
+        self.low_balance: str | None = None
+
+    def fire(self, event_type: str, data: dict[str, Any]) -> None:
+        """Queue an event to be fired once the change is saved."""
+        self.events.append((event_type, data))
+
+    def add_account(self, account: Account) -> None:
+        """Add a new account."""
+        self.data.add_account(account)
+        self.account = account
+        self.balance_change += account.balance
+
+    def remove_account(self) -> None:
+        """Remove the account."""
+        if self.account is None:
+            return
+        self.data.remove_account(self.account.id)
+        self.account = None
+        self.rebuild_totals = True
+
+    def add_transaction(self, transaction: Transaction) -> Transaction:
+        """Add a transaction to the account and return the stored one."""
+        transaction = self.account.add_transaction(
+            transaction, max_transactions=DEFAULT_MAX_TRANSACTIONS
+        )
+        self.added.append(transaction)
+        return transaction
+
+    def update_transaction(self, transaction_id: str, **changes: Any) -> Transaction:
+        """Edit a transaction of the account and return the new version."""
+        result = self.account.update_transaction(transaction_id, **changes)
+        if result is None:
+            raise MutationError("not_found", "Transaction not found")
+        old, new = result
+        self.removed.append(old)
+        self.added.append(new)
+        return new
+
+    def reclassify(self, overwrite: bool = False) -> int:
+        """Apply the classification rules to the account's history.
+
+        Returns the number of transactions whose category changed.
+        """
+        updated = self.account.reclassify(self.data.rule_engine, overwrite)
+        if updated:
+            # The per-category budget totals are stale
+            self.rebuild_totals = True
+        return updated
+
+    def expire_spending(self, today: date) -> None:
+        """Roll the rolling spending windows of the account to a new day."""
+        self.account.expire_spending(today)
+
+    def relocalize(self) -> None:
+        """Recompute the local dates of the account after a time zone change."""
+        self.account.relocalize()
+        self.rebuild_totals = True
+
+    def remove_transaction(self, transaction_id: str) -> Transaction:
+        """Remove a transaction from the account and return it."""
+        transaction = self.account.remove_transaction(transaction_id)
+        if transaction is None:
+            raise MutationError("not_found", "Transaction not found")
+        self.removed.append(transaction)
+        return transaction
+
+
+class MutationPipeline:
+    """Runs changes of the finance data through the shared stages."""
+
+    def __init__(self, store: FinanceStore) -> None:
+        """Initialize the pipeline with saving as the persist stage."""
+        self.store = store
+        self._stages: dict[str, list[Stage]] = {stage: [] for stage in STAGES}
+        self._defer_depth = 0
+        self._save_pending = False
+        self.add_stage(STAGE_PERSIST, self._async_save)
+
+    def add_stage(self, stage: str, handler: Stage) -> Callable[[], None]:
+        """Register a handler for a stage; returns a function removing it."""
+        handlers = self._stages[stage]
+        handlers.append(handler)
+        return lambda: handlers.remove(handler)
+
+    async def _async_run_stage(self, stage: str, mutation: Mutation) -> None:
+        """Run the handlers of a stage in registration order."""
+        for handler in self._stages[stage]:
+            result = handler(mutation)
+            if inspect.isawaitable(result):
+                await result
+
+    async def async_execute(
+        self,
+        account_id: str | None,
+        apply: Callable[[Mutation], _T],
+        *,
+        must_exist: bool = True,
+    ) -> _T:
+        """Run a change and return the result of its apply step.
+
+        Validation, apply and indexing run under the account lock. Unless
+        must_exist is False, a missing account raises MutationError.
+        """
+        await self.store.async_load()
+        if account_id is None:
+            mutation = Mutation(self.store.data, None)
+            await self._async_run_stage(STAGE_VALIDATE, mutation)
+            result = apply(mutation)
+            await self._async_run_stage(STAGE_INDEX, mutation)
+        else:
+            async with self.store.account_lock(account_id):
+                mutation = Mutation(self.store.data, account_id)
+                if must_exist and mutation.account is None:
+                    raise MutationError("not_found", "Account not found")
+                await self._async_run_stage(STAGE_VALIDATE, mutation)
+                result = apply(mutation)
+                await self._async_run_stage(STAGE_INDEX, mutation)
+        await self._async_run_stage(STAGE_PERSIST, mutation)
+        await self._async_run_stage(STAGE_NOTIFY, mutation)
+        return result
+
+    @asynccontextmanager
+    async def deferred_save(self) -> AsyncIterator[None]:
+        """Save the changes made inside the block once, at its end."""
+        self._defer_depth += 1
+        try:
+            yield
+        finally:
+            self._defer_depth -= 1
+            if self._defer_depth == 0 and self._save_pending:
+                self._save_pending = False
+                await self.store.async_save()
+
+    async def _async_save(self, mutation: Mutation) -> None:
+        """Save the data, or mark it for saving at the end of the batch."""
+        if self._defer_depth:
+            self._save_pending = True
+            return
+        await self.store.async_save()
@@ -0,0 +1,33 @@
+"""Repairs for Ha Finance Record integration."""
+from __future__ import annotations
+
+from homeassistant import data_entry_flow
+from homeassistant.components.repairs import ConfirmRepairFlow, RepairsFlow
+from homeassistant.core import HomeAssistant
+
+from .store import FinanceStore
+
+
+class DiscardAccountRepairFlow(ConfirmRepairFlow):
+    """Discard the data of an account whose file could not be loaded."""
+
+    def __init__(self, account_id: str) -> None:
+        """Initialize the flow."""
+        self._account_id = account_id
+
+    async def async_step_confirm(
+        self, user_input: dict[str, str] | None = None
+    ) -> data_entry_flow.FlowResult:
+        """Delete the account's file once confirmed."""
+        if user_input is not None:
+            await FinanceStore(self.hass).async_discard_account(self._account_id)
+        return await super().async_step_confirm(user_input)
+
+
+async def async_create_fix_flow(
+    hass: HomeAssistant,
+    issue_id: str,
+    data: dict[str, str | int | float | None] | None,
+) -> RepairsFlow:
+    """Create the flow fixing an issue."""
+    return DiscardAccountRepairFlow(str(data["account_id"]))
@@ -0,0 +1,65 @@
+"""Cache of encoded WebSocket responses for Ha Finance Record."""
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from homeassistant.helpers.json import json_bytes
+
+
+class ResponseCache:
+    """JSON-encoded read responses shared by all WebSocket connections.
+
+    An entry belongs to an account and is valid for the account version it
+    was built from, so any change of the account invalidates it without
+    explicit bookkeeping. The least recently used entries are evicted
+    beyond max_entries.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        """Initialize the cache."""
+        self.max_entries = max_entries
+        self._entries: OrderedDict[
+            tuple[str, Hashable], tuple[int, bytes]
+        ] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(
+        self,
+        account_id: str,
+        version: int,
+        key: Hashable,
+        build: Callable[[], Any],
+    ) -> bytes:
+        """Return the encoded response, building it if missing or outdated."""
+        cache_key = (account_id, key)
+        entry = self._entries.get(cache_key)
+        if entry is not None and entry[0] == version:
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        payload = json_bytes(build())
+        self._entries[cache_key] = (version, payload)
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return payload
+
+    def invalidate(self, account_id: str) -> None:
+        """Drop the entries of an account."""
+        for cache_key in [key for key in self._entries if key[0] == account_id]:
+            del self._entries[cache_key]
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Get hit/miss counters and the size of the cache."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "bytes": sum(len(payload) for _, payload in self._entries.values()),
+        }
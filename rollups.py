@@ -0,0 +1,139 @@
+"""Income and expense rollups of an account for Ha Finance Record.
+
+Unlike the indexes, the rollups are part of the persisted account state:
+they keep covering transactions after those were trimmed from the ledger.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Any
+
+from .const import (
+    GRANULARITY_DAY,
+    GRANULARITY_MONTH,
+    GRANULARITY_WEEK,
+    GRANULARITY_YEAR,
+)
+from .persistent import PersistentMap
+
+if TYPE_CHECKING:
+    from .models import Transaction
+
+# Transaction count, income and expenses of a bucket
+Bucket = tuple[int, float, float]
+
+
+def bucket_keys(day: date) -> dict[str, str]:
+    """Return the bucket of a local day at every level.
+
+    Days are keyed YYYY-MM-DD, weeks by the date of their Monday, months
+    YYYY-MM and years YYYY, so keys of a level sort chronologically.
+    """
+    return {
+        GRANULARITY_DAY: day.isoformat(),
+        GRANULARITY_WEEK: (day - timedelta(days=day.weekday())).isoformat(),
+        GRANULARITY_MONTH: day.isoformat()[:7],
+        GRANULARITY_YEAR: day.isoformat()[:4],
+    }
+
+
+@dataclass(frozen=True)
+class Rollups:
+    """Income and expense totals per local day, week, month and year.
+
+    Each level maps bucket keys to a Bucket. A transaction is added to or
+    removed from its bucket at every level at once, so each level holds
+    the day level folded up and answering a chart never needs a scan of
+    the transactions. Buckets without transactions are dropped. Instances
+    are immutable and share structure with the version they derive from.
+    """
+
+    levels: dict[str, PersistentMap[str, Bucket]] = field(
+        default_factory=lambda: {
+            level: PersistentMap() for level in bucket_keys(date.min)
+        }
+    )
+
+    @classmethod
+    def build(cls, transactions: Iterable[Transaction]) -> Rollups:
+        """Compute the rollups of a list of transactions."""
+        return cls().apply(added=transactions)
+
+    def apply(
+        self,
+        removed: Iterable[Transaction] = (),
+        added: Iterable[Transaction] = (),
+    ) -> Rollups:
+        """Return the rollups with transactions removed and added."""
+        levels = dict(self.levels)
+        for sign, transactions in ((-1, removed), (1, added)):
+            for tx in transactions:
+                day = tx.day
+                income = sign * tx.amount if tx.amount >= 0 else 0.0
+                expenses = -sign * tx.amount if tx.amount < 0 else 0.0
+                for level, key in bucket_keys(day).items():
+                    count, old_income, old_expenses = levels[level].get(
+                        key, (0, 0.0, 0.0)
+                    )
+                    if count + sign <= 0:
+                        levels[level] = levels[level].delete(key)
+                    else:
+                        levels[level] = levels[level].set(
+                            key,
+                            (count + sign, old_income + income, old_expenses + expenses),
+                        )
+        return Rollups(levels)
+
+    def buckets(self, level: str, count: int) -> list[dict[str, Any]]:
+        """Return the newest count buckets of a level that have data, oldest first."""
+        keys = sorted(self.levels[level])[-count:] if count > 0 else []
+        return [
+            {
+                "period": key,
+                "income": round(self.levels[level][key][1], 2),
+                "expenses": round(self.levels[level][key][2], 2),
+            }
+            for key in keys
+        ]
+
+    def total(self) -> Bucket:
+        """Return the transaction count, income and expenses of all buckets."""
+        count, income, expenses = 0, 0.0, 0.0
+        for bucket_count, bucket_income, bucket_expenses in self.levels[
+            GRANULARITY_YEAR
+        ].values():
+            count += bucket_count
+            income += bucket_income
+            expenses += bucket_expenses
+        return count, income, expenses
+
+    def totals_before(self, level: str, key: str) -> tuple[float, float]:
+        """Return the income and expenses of all buckets of a level before key."""
+        income = expenses = 0.0
+        for bucket_key, (_, bucket_income, bucket_expenses) in self.levels[level].items():
+            if bucket_key < key:
+                income += bucket_income
+                expenses += bucket_expenses
+        return income, expenses
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for storage."""
+        return {
+            level: [[key, *bucket] for key, bucket in sorted(buckets.items())]
+            for level, buckets in self.levels.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Rollups:
+        """Create from dictionary."""
+        return cls(
+            {
+                level: PersistentMap(
+                    (key, (int(count), float(income), float(expenses)))
+                    for key, count, income, expenses in data.get(level, [])
+                )
+                for level in bucket_keys(date.min)
+            }
+        )
@@ -2,21 +2,32 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
-from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.components.sensor import SensorEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import CONF_ACCOUNT_ID, CONF_CURRENCY, DEFAULT_CURRENCY, DOMAIN
+from .const import (
+    CONF_ACCOUNT_ID,
+    CONF_CURRENCY,
+    DEFAULT_CURRENCY,
+    DOMAIN,
+    SPENDING_WINDOWS,
+)
 from .coordinator import FinanceCoordinator
+from .hub import FinanceHub
+from .indexes import parse_timestamp
 
 if TYPE_CHECKING:
     from .models import Account
 
+# Device grouping the cross-account sensors
+OVERVIEW_DEVICE_ID = "overview"
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -32,6 +43,10 @@ async def async_setup_entry(
         LastTransactionSensor(coordinator, account_id),
         LastNoteSensor(coordinator, account_id),
         LastTimeSensor(coordinator, account_id),
+        *(
+            RollingSpendingSensor(coordinator, account_id, days)
+            for days in SPENDING_WINDOWS
+        ),
     ]
 
     # Add recurring plan sensors
@@ -39,6 +54,42 @@ async def async_setup_entry(
         for plan_id in coordinator.account.recurring_plans:
             entities.append(PlanNextDateSensor(coordinator, account_id, plan_id))
             entities.append(PlanLastExecutedSensor(coordinator, account_id, plan_id))
+            entities.append(PlanTotalSensor(coordinator, account_id, plan_id))
+            entities.append(PlanCountSensor(coordinator, account_id, plan_id))
+
+    # Cross-account sensors are owned by a single config entry
+    hub = coordinator.hub
+    if hub.aggregate_entry_id is None:
+        hub.aggregate_entry_id = entry.entry_id
+        currency = entry.options.get(CONF_CURRENCY, DEFAULT_CURRENCY)
+        async_add_entities(
+            [
+                NetWorthSensor(hub, currency),
+                MonthlyIncomeSensor(hub, currency),
+                MonthlyExpenseSensor(hub, currency),
+            ]
+        )
+
+        # Budget sensors follow the budgets configured at runtime
+        budget_categories: set[str] = set()
+
+        @callback
+        def async_add_budget_entities() -> None:
+            """Add entities for new budgets."""
+            new_entities: list[SensorEntity] = []
+            for category in hub.store.data.budgets:
+                if category in budget_categories:
+                    continue
+                budget_categories.add(category)
+                new_entities.append(BudgetSpentSensor(hub, currency, category))
+                new_entities.append(BudgetRemainingSensor(hub, currency, category))
+            for category in budget_categories - set(hub.store.data.budgets):
+                budget_categories.discard(category)
+            if new_entities:
+                async_add_entities(new_entities)
+
+        async_add_budget_entities()
+        entry.async_on_unload(hub.async_add_listener(async_add_budget_entities))
 
     async_add_entities(entities)
 
@@ -60,6 +111,8 @@ async def async_setup_entry(
                 new_entities.append(
                     PlanLastExecutedSensor(coordinator, account_id, plan_id)
                 )
+                new_entities.append(PlanTotalSensor(coordinator, account_id, plan_id))
+                new_entities.append(PlanCountSensor(coordinator, account_id, plan_id))
         if new_entities:
             async_add_entities(new_entities)
             entities.extend(new_entities)
@@ -101,7 +154,6 @@ class BalanceDisplaySensor(FinanceSensorBase):
 
     _attr_icon = "mdi:cash"
     _attr_translation_key = "balance_display"
-    _attr_state_class = SensorStateClass.TOTAL
 
     def __init__(self, coordinator: FinanceCoordinator, account_id: str) -> None:
         """Initialize balance display sensor."""
@@ -190,10 +242,32 @@ class LastTimeSensor(FinanceSensorBase):
         last_tx = account.last_transaction
         if last_tx is None:
             return None
-        try:
-            return datetime.fromisoformat(last_tx.timestamp)
-        except (ValueError, TypeError):
+        return parse_timestamp(last_tx.timestamp)
+
+
+class RollingSpendingSensor(FinanceSensorBase):
+    """Sensor entity for the expenses of the trailing days."""
+
+    _attr_icon = "mdi:cash-clock"
+
+    def __init__(
+        self, coordinator: FinanceCoordinator, account_id: str, days: int
+    ) -> None:
+        """Initialize rolling spending sensor."""
+        super().__init__(coordinator, account_id)
+        self.days = days
+        self._attr_translation_key = f"spent_{days}d"
+        self._attr_unique_id = f"{account_id}_spent_{days}d"
+        currency = coordinator.entry.options.get(CONF_CURRENCY, DEFAULT_CURRENCY)
+        self._attr_native_unit_of_measurement = currency
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the expenses of the window."""
+        account = self.account
+        if account is None:
             return None
+        return round(account.spending(self.days), 2)
 
 
 class PlanNextDateSensor(FinanceSensorBase):
@@ -278,3 +352,239 @@ class PlanLastExecutedSensor(FinanceSensorBase):
             return dt_util.parse_datetime(plan.last_executed)
         except (ValueError, TypeError):
             return None
+
+
+class PlanTotalSensor(FinanceSensorBase):
+    """Sensor entity for the cumulative amount posted by a recurring plan."""
+
+    _attr_icon = "mdi:sigma"
+    _attr_translation_key = "plan_total"
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self, coordinator: FinanceCoordinator, account_id: str, plan_id: str
+    ) -> None:
+        """Initialize plan total sensor."""
+        super().__init__(coordinator, account_id)
+        self.plan_id = plan_id
+        self._attr_unique_id = f"{account_id}_{plan_id}_total"
+        currency = coordinator.entry.options.get(CONF_CURRENCY, DEFAULT_CURRENCY)
+        self._attr_native_unit_of_measurement = currency
+
+    @property
+    def name(self) -> str:
+        """Return the name."""
+        account = self.account
+        if account and self.plan_id in account.recurring_plans:
+            plan = account.recurring_plans[self.plan_id]
+            return f"{plan.title} 累計金額"
+        return f"{self.plan_id} 累計金額"
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the summed amount of the plan's transactions."""
+        account = self.account
+        if account is None:
+            return None
+        return round(account.plan_stats(self.plan_id)["total"], 2)
+
+
+class PlanCountSensor(FinanceSensorBase):
+    """Sensor entity for the number of transactions posted by a recurring plan."""
+
+    _attr_icon = "mdi:counter"
+    _attr_translation_key = "plan_count"
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self, coordinator: FinanceCoordinator, account_id: str, plan_id: str
+    ) -> None:
+        """Initialize plan count sensor."""
+        super().__init__(coordinator, account_id)
+        self.plan_id = plan_id
+        self._attr_unique_id = f"{account_id}_{plan_id}_count"
+
+    @property
+    def name(self) -> str:
+        """Return the name."""
+        account = self.account
+        if account and self.plan_id in account.recurring_plans:
+            plan = account.recurring_plans[self.plan_id]
+            return f"{plan.title} 執行次數"
+        return f"{self.plan_id} 執行次數"
+
+    @property
+    def native_value(self) -> int | None:
+        """Return the number of the plan's transactions."""
+        account = self.account
+        if account is None:
+            return None
+        return account.plan_stats(self.plan_id)["count"]
+
+    @property
+    def extra_state_attributes(self) -> dict[str, str | None]:
+        """Return when the plan last posted a transaction."""
+        account = self.account
+        if account is None:
+            return {}
+        return {"last_posted": account.plan_stats(self.plan_id)["last_posted"]}
+
+
+class FinanceHubSensorBase(SensorEntity):
+    """Base class for cross-account sensors backed by the hub totals."""
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(self, hub: FinanceHub, currency: str) -> None:
+        """Initialize the hub sensor."""
+        self.hub = hub
+        self._attr_native_unit_of_measurement = currency
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return device info."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, OVERVIEW_DEVICE_ID)},
+            name="Finance Overview",
+            manufacturer="Ha Finance",
+            model="Account Overview",
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to hub total updates."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.hub.async_add_listener(self.async_write_ha_state))
+
+
+class NetWorthSensor(FinanceHubSensorBase):
+    """Sensor entity for the summed balance of all accounts."""
+
+    _attr_icon = "mdi:scale-balance"
+    _attr_translation_key = "net_worth"
+
+    def __init__(self, hub: FinanceHub, currency: str) -> None:
+        """Initialize net worth sensor."""
+        super().__init__(hub, currency)
+        self._attr_unique_id = f"{DOMAIN}_net_worth"
+
+    @property
+    def native_value(self) -> float:
+        """Return the net worth."""
+        return round(self.hub.net_worth, 2)
+
+
+class MonthlyIncomeSensor(FinanceHubSensorBase):
+    """Sensor entity for this month's income across all accounts."""
+
+    _attr_icon = "mdi:cash-plus"
+    _attr_translation_key = "monthly_income"
+
+    def __init__(self, hub: FinanceHub, currency: str) -> None:
+        """Initialize monthly income sensor."""
+        super().__init__(hub, currency)
+        self._attr_unique_id = f"{DOMAIN}_monthly_income"
+
+    @property
+    def native_value(self) -> float:
+        """Return this month's income."""
+        return round(self.hub.monthly_income, 2)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, str]:
+        """Return the month the total refers to."""
+        return {"month": self.hub.month}
+
+
+class MonthlyExpenseSensor(FinanceHubSensorBase):
+    """Sensor entity for this month's expenses across all accounts."""
+
+    _attr_icon = "mdi:cash-minus"
+    _attr_translation_key = "monthly_expense"
+
+    def __init__(self, hub: FinanceHub, currency: str) -> None:
+        """Initialize monthly expense sensor."""
+        super().__init__(hub, currency)
+        self._attr_unique_id = f"{DOMAIN}_monthly_expense"
+
+    @property
+    def native_value(self) -> float:
+        """Return this month's expenses."""
+        return round(self.hub.monthly_expense, 2)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, str]:
+        """Return the month the total refers to."""
+        return {"month": self.hub.month}
+
+
+class BudgetSensorBase(FinanceHubSensorBase):
+    """Base class for the sensors of a category budget."""
+
+    def __init__(self, hub: FinanceHub, currency: str, category: str) -> None:
+        """Initialize the budget sensor."""
+        super().__init__(hub, currency)
+        self.category = category
+
+    @property
+    def available(self) -> bool:
+        """Return True while the budget exists."""
+        return self.category in self.hub.store.data.budgets
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the budget amount and the month it refers to."""
+        status = self.hub.budget_status(self.category)
+        if status is None:
+            return {}
+        return {"budget": status["amount"], "month": status["month"]}
+
+
+class BudgetSpentSensor(BudgetSensorBase):
+    """Sensor entity for this month's spending in a budgeted category."""
+
+    _attr_icon = "mdi:cart-outline"
+    _attr_translation_key = "budget_spent"
+
+    def __init__(self, hub: FinanceHub, currency: str, category: str) -> None:
+        """Initialize budget spent sensor."""
+        super().__init__(hub, currency, category)
+        self._attr_unique_id = f"{DOMAIN}_budget_{category}_spent"
+
+    @property
+    def name(self) -> str:
+        """Return the name."""
+        return f"{self.category} 已支出"
+
+    @property
+    def native_value(self) -> float | None:
+        """Return this month's spending."""
+        status = self.hub.budget_status(self.category)
+        if status is None:
+            return None
+        return round(status["spent"], 2)
+
+
+class BudgetRemainingSensor(BudgetSensorBase):
+    """Sensor entity for the budget left this month in a category."""
+
+    _attr_icon = "mdi:wallet-outline"
+    _attr_translation_key = "budget_remaining"
+
+    def __init__(self, hub: FinanceHub, currency: str, category: str) -> None:
+        """Initialize budget remaining sensor."""
+        super().__init__(hub, currency, category)
+        self._attr_unique_id = f"{DOMAIN}_budget_{category}_remaining"
+
+    @property
+    def name(self) -> str:
+        """Return the name."""
+        return f"{self.category} 剩餘預算"
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the budget left this month."""
+        status = self.hub.budget_status(self.category)
+        if status is None:
+            return None
+        return round(status["remaining"], 2)
@@ -0,0 +1,69 @@
+"""Services for Ha Finance Record integration."""
+from __future__ import annotations
+
+from typing import Final
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+
+from .const import CONF_ACCOUNT_ID, DOMAIN
+from .indexes import local_day_bounds
+from .store import FinanceStore
+
+SERVICE_BALANCE_AT: Final = "balance_at"
+
+ATTR_DATE: Final = "date"
+
+BALANCE_AT_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_ACCOUNT_ID): cv.string,
+        vol.Required(ATTR_DATE): cv.date,
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services once."""
+    if hass.services.has_service(DOMAIN, SERVICE_BALANCE_AT):
+        return
+
+    async def async_handle_balance_at(call: ServiceCall) -> ServiceResponse:
+        """Return the balance of an account at the end of a local date."""
+        store = FinanceStore(hass)
+        await store.async_load()
+
+        account_id = call.data[CONF_ACCOUNT_ID]
+        account = store.data.get_account(account_id)
+        if account is None:
+            raise ServiceValidationError(f"Account {account_id} not found")
+
+        day = call.data[ATTR_DATE]
+        return {
+            "account_id": account.id,
+            "date": day.isoformat(),
+            "balance": account.balance_at(local_day_bounds(day)[1]),
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BALANCE_AT,
+        async_handle_balance_at,
+        schema=BALANCE_AT_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+@callback
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove the integration services."""
+    hass.services.async_remove(DOMAIN, SERVICE_BALANCE_AT)
@@ -0,0 +1,115 @@
+"""Long-term statistics of Ha Finance Record accounts.
+
+Balance, income and expenses of every account are imported into the
+recorder as external statistics with hourly buckets computed from the
+ledger, instead of being recorded from sensor states.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN, STATISTIC_BALANCE, STATISTIC_EXPENSES, STATISTIC_INCOME
+from .indexes import local_day_bounds
+
+if TYPE_CHECKING:
+    from .models import Account
+
+HOUR = 3600
+
+# (hour start in epoch seconds, value at the end of the hour)
+HourlyValues = list[tuple[int, float]]
+
+
+def statistic_id(account_id: str, kind: str) -> str:
+    """Return the external statistic ID of an account.
+
+    Account IDs generated from panel names can start with or repeat
+    underscores, which statistic IDs do not allow.
+    """
+    return f"{DOMAIN}:{slugify(account_id, separator='_')}_{kind}"
+
+
+def hourly_statistics(account: Account, start: int | None = None) -> dict[str, HourlyValues]:
+    """Compute the hourly statistics of an account from an hour on.
+
+    Every hour with transactions from start (epoch seconds, or the first
+    retained transaction if None) gets the balance and the cumulative
+    income and expenses at its end. The totals before start come from the
+    balance checkpoints and the rollups, so they include trimmed history.
+    """
+    transactions = account.transactions_between(start, None)
+    result: dict[str, HourlyValues] = {
+        STATISTIC_BALANCE: [],
+        STATISTIC_INCOME: [],
+        STATISTIC_EXPENSES: [],
+    }
+    if not transactions:
+        return result
+    if start is None:
+        start = transactions[0].ts - transactions[0].ts % HOUR
+
+    # Totals through the local day of start, less its transactions from start on
+    day = dt_util.as_local(datetime.fromtimestamp(start, timezone.utc)).date()
+    income, expenses = account.totals_before(day + timedelta(days=1))
+    for tx in account.transactions_between(start, local_day_bounds(day)[1]):
+        if tx.amount >= 0:
+            income -= tx.amount
+        else:
+            expenses += tx.amount
+    balance = account.balance_at(start - 1)
+    if balance is None:
+        # Inside trimmed history: the balance before the retained transactions
+        balance = account.balance - sum(tx.amount for tx in transactions)
+
+    for position, tx in enumerate(transactions):
+        balance += tx.amount
+        if tx.amount >= 0:
+            income += tx.amount
+        else:
+            expenses -= tx.amount
+        hour = tx.ts - tx.ts % HOUR
+        if position + 1 < len(transactions) and transactions[position + 1].ts < hour + HOUR:
+            continue
+        result[STATISTIC_BALANCE].append((hour, round(balance, 2)))
+        result[STATISTIC_INCOME].append((hour, round(income, 2)))
+        result[STATISTIC_EXPENSES].append((hour, round(expenses, 2)))
+    return result
+
+
+@callback
+def async_import_statistics(
+    hass: HomeAssistant, account: Account, currency: str, start: int | None = None
+) -> None:
+    """Import the hourly statistics of an account from an hour on.
+
+    Rows of hours that were imported before are overwritten. The value is
+    imported both as state and as sum, so the change over any period is
+    the difference of the sums.
+    """
+    for kind, values in hourly_statistics(account, start).items():
+        if not values:
+            continue
+        metadata = StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=f"{account.name} {kind}",
+            source=DOMAIN,
+            statistic_id=statistic_id(account.id, kind),
+            unit_of_measurement=currency,
+        )
+        async_add_external_statistics(
+            hass,
+            metadata,
+            [
+                StatisticData(
+                    start=dt_util.utc_from_timestamp(hour), state=value, sum=value
+                )
+                for hour, value in values
+            ],
+        )
@@ -3,12 +3,14 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import TYPE_CHECKING
+import time
+from typing import TYPE_CHECKING, Any
 
+from homeassistant.helpers import issue_registry as ir
 from homeassistant.helpers.storage import Store
 
-from .const import STORAGE_KEY, STORAGE_VERSION
-from .models import FinanceData
+from .const import DOMAIN, STORAGE_ACCOUNT_KEY, STORAGE_KEY, STORAGE_VERSION
+from .models import AccountSnapshot, FinanceData, FinanceSnapshot
 
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
@@ -16,16 +18,66 @@ if TYPE_CHECKING:
 _LOGGER = logging.getLogger(__name__)
 
 
+class _FinanceIndexStore(Store):
+    """Store of the index file."""
+
+    async def _async_migrate_func(
+        self, old_major_version: int, old_minor_version: int, old_data: Any
+    ) -> Any:
+        """Pass version 1 data through; FinanceStore splits it up on load."""
+        return old_data
+
+
+def _index_dict(
+    snapshot: FinanceSnapshot, unavailable: frozenset[str]
+) -> dict[str, Any]:
+    """Convert the index, listing the accounts that failed to load too."""
+    index = snapshot.index_dict()
+    if unavailable:
+        index["accounts"] = sorted({*index["accounts"], *unavailable})
+    return index
+
+
+def _serialize(
+    snapshot: FinanceSnapshot,
+    unavailable: frozenset[str],
+    accounts: list[AccountSnapshot],
+) -> tuple[dict[str, Any], dict[str, dict[str, Any]]]:
+    """Convert the index and the given accounts to JSON-ready data."""
+    return _index_dict(snapshot, unavailable), {
+        account.id: account.to_dict() for account in accounts
+    }
+
+
 class FinanceStore:
     """Class to manage finance data storage.
 
     This is a singleton per HomeAssistant instance to prevent data races
     when multiple accounts are configured.
+
+    Every account is stored in its own file, keyed by STORAGE_ACCOUNT_KEY
+    and the account ID, next to an index file (STORAGE_KEY) listing the
+    accounts and holding the rules and budgets. The files are loaded in
+    parallel, and a save only writes the accounts whose version changed
+    since they were last written, so a change to one account does not
+    rewrite the others and a damaged file only loses that account. Such an
+    account stays listed in the index and its file is left alone until it
+    loads again or the user discards it through the repair issue raised
+    for it. Data in the single-file format of version 1 is split up on
+    load.
+
+    Mutations of an account are serialized by a lock per account, taken by
+    the mutation pipeline; operations on different accounts never wait on each other. Saving takes
+    an immutable snapshot on the event loop (copying references only) and
+    converts it to JSON-ready data in the executor, so no lock is held while
+    the file is written and the loop is not blocked by serialization of
+    large ledgers.
     """
 
     _instances: dict[str, "FinanceStore"] = {}
     _instance_lock = asyncio.Lock()
-    _data_lock: asyncio.Lock
+    _load_lock: asyncio.Lock
+    _save_lock: asyncio.Lock
 
     def __new__(cls, hass: HomeAssistant) -> "FinanceStore":
         """Ensure only one instance per hass instance."""
@@ -36,7 +88,8 @@ class FinanceStore:
         if key not in cls._instances:
             instance = super().__new__(cls)
             instance._initialized = False
-            instance._data_lock = asyncio.Lock()
+            instance._load_lock = asyncio.Lock()
+            instance._save_lock = asyncio.Lock()
             cls._instances[key] = instance
         return cls._instances[key]
 
@@ -45,8 +98,26 @@ class FinanceStore:
         if getattr(self, "_initialized", False):
             return
         self._hass = hass
-        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._store: Store = _FinanceIndexStore(
+            hass, STORAGE_VERSION, STORAGE_KEY, atomic_writes=True
+        )
+        self._account_stores: dict[str, Store] = {}
+        # Version of each account as last written, and the last index written
+        self._saved_versions: dict[str, int] = {}
+        self._saved_index: dict[str, Any] | None = None
+        # Accounts whose file could not be loaded
+        self._unavailable: set[str] = set()
         self._data: FinanceData | None = None
+        self._account_locks: dict[str, asyncio.Lock] = {}
+        self._save_generation = 0
+        self._stats: dict[str, Any] = {
+            "saves": 0,
+            "skipped_saves": 0,
+            "account_writes": 0,
+            "last_loop_block_ms": 0.0,
+            "max_loop_block_ms": 0.0,
+            "last_serialize_ms": 0.0,
+        }
         self._initialized = True
 
     @property
@@ -56,30 +127,215 @@ class FinanceStore:
             self._data = FinanceData()
         return self._data
 
+    @property
+    def unavailable(self) -> frozenset[str]:
+        """Get the IDs of the accounts whose file could not be loaded."""
+        return frozenset(self._unavailable)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Get save statistics, including time spent blocking the event loop."""
+        return dict(self._stats)
+
+    def _account_store(self, account_id: str) -> Store:
+        """Get the store of an account's file."""
+        store = self._account_stores.get(account_id)
+        if store is None:
+            store = self._account_stores[account_id] = Store(
+                self._hass,
+                STORAGE_VERSION,
+                f"{STORAGE_ACCOUNT_KEY}.{account_id}",
+                atomic_writes=True,
+            )
+        return store
+
+    def account_lock(self, account_id: str) -> asyncio.Lock:
+        """Get the lock serializing mutations of an account."""
+        lock = self._account_locks.get(account_id)
+        if lock is None:
+            lock = self._account_locks[account_id] = asyncio.Lock()
+        return lock
+
     async def async_load(self) -> FinanceData:
         """Load data from storage."""
-        async with self._data_lock:
+        async with self._load_lock:
             if self._data is not None:
                 return self._data
-            stored_data = await self._store.async_load()
-            if stored_data is None:
+            index = await self._store.async_load()
+            if index is None:
                 self._data = FinanceData()
+            elif isinstance(index.get("accounts"), dict):
+                # Version 1: all accounts in the index file
+                self._data = FinanceData.from_dict(index)
+                _LOGGER.info(
+                    "Moving %s finance accounts to per-account storage",
+                    len(self._data.accounts),
+                )
+                await self.async_save()
             else:
-                self._data = FinanceData.from_dict(stored_data)
+                self._data = FinanceData.from_dict(
+                    {**index, "accounts": await self._async_load_accounts(index["accounts"])}
+                )
+                self._saved_versions = {
+                    account_id: account.version
+                    for account_id, account in self._data.accounts.items()
+                }
+                self._saved_index = _index_dict(
+                    self._data.snapshot(), self.unavailable
+                )
             _LOGGER.debug("Loaded finance data: %s accounts", len(self._data.accounts))
             return self._data
 
+    async def _async_load_accounts(
+        self, account_ids: list[str]
+    ) -> dict[str, dict[str, Any]]:
+        """Load the files of the accounts in parallel, skipping unreadable ones."""
+        results = await asyncio.gather(
+            *(self._account_store(account_id).async_load() for account_id in account_ids),
+            return_exceptions=True,
+        )
+        accounts: dict[str, dict[str, Any]] = {}
+        for account_id, result in zip(account_ids, results):
+            if isinstance(result, Exception):
+                _LOGGER.error(
+                    "Skipping finance account %s, its data could not be loaded: %s",
+                    account_id,
+                    result,
+                )
+                self._unavailable.add(account_id)
+                ir.async_create_issue(
+                    self._hass,
+                    DOMAIN,
+                    f"account_unreadable_{account_id}",
+                    data={"account_id": account_id},
+                    is_fixable=True,
+                    severity=ir.IssueSeverity.ERROR,
+                    translation_key="account_unreadable",
+                    translation_placeholders={
+                        "account_id": account_id,
+                        "file": f".storage/{STORAGE_ACCOUNT_KEY}.{account_id}",
+                        "error": str(result),
+                    },
+                )
+            elif result is None:
+                _LOGGER.warning(
+                    "Skipping finance account %s, its data file is missing",
+                    account_id,
+                )
+            else:
+                accounts[account_id] = result
+        return accounts
+
+    async def async_discard_account(self, account_id: str) -> None:
+        """Delete the file of an account that could not be loaded."""
+        if account_id not in self._unavailable:
+            return
+        async with self._save_lock:
+            self._unavailable.discard(account_id)
+            await self._account_store(account_id).async_remove()
+            del self._account_stores[account_id]
+        ir.async_delete_issue(self._hass, DOMAIN, f"account_unreadable_{account_id}")
+        _LOGGER.info("Discarded the data of finance account %s", account_id)
+        await self.async_save()
+
     async def async_save(self) -> None:
-        """Save data to storage."""
-        async with self._data_lock:
-            if self._data is not None:
-                await self._store.async_save(self._data.to_dict())
-                _LOGGER.debug("Saved finance data")
+        """Save data to storage.
+
+        The snapshot is taken before waiting for the write lock. If a newer
+        snapshot is queued while waiting, this one is skipped since the newer
+        write already contains its changes.
+
+        Changed accounts are written first and in parallel, then the index
+        if it changed, and the files of removed accounts are deleted last,
+        so the index never lists an account without a file.
+
+        The loop_block_ms statistics sum the sections running on the event
+        loop: taking the snapshot, finding the changed accounts and the
+        bookkeeping after the writes, including comparing the index.
+        """
+        if self._data is None:
+            return
+        started = time.perf_counter()
+        snapshot = self._data.snapshot()
+        blocked = time.perf_counter() - started
+
+        self._save_generation += 1
+        generation = self._save_generation
+        async with self._save_lock:
+            if generation != self._save_generation:
+                self._stats["skipped_saves"] += 1
+                self._record_loop_block(blocked)
+                return
+            started = time.perf_counter()
+            changed = [
+                account
+                for account_id, account in snapshot.accounts.items()
+                if self._saved_versions.get(account_id) != account.version
+                and account_id not in self._unavailable
+            ]
+            removed = [
+                account_id
+                for account_id in self._saved_versions
+                if account_id not in snapshot.accounts
+            ]
+            blocked += time.perf_counter() - started
+            started = time.perf_counter()
+            index, accounts = await self._hass.async_add_executor_job(
+                _serialize, snapshot, self.unavailable, changed
+            )
+            self._stats["last_serialize_ms"] = (time.perf_counter() - started) * 1000
+
+            await asyncio.gather(
+                *(
+                    self._account_store(account_id).async_save(data)
+                    for account_id, data in accounts.items()
+                )
+            )
+            started = time.perf_counter()
+            for account in changed:
+                self._saved_versions[account.id] = account.version
+            index_changed = index != self._saved_index
+            blocked += time.perf_counter() - started
+            if index_changed:
+                await self._store.async_save(index)
+                self._saved_index = index
+            for account_id in removed:
+                await self._account_store(account_id).async_remove()
+                del self._account_stores[account_id]
+                del self._saved_versions[account_id]
+
+            self._stats["saves"] += 1
+            self._stats["account_writes"] += len(changed)
+            loop_block_ms = self._record_loop_block(blocked)
+            _LOGGER.debug(
+                "Saved finance data, %s accounts written (loop blocked %.2f ms)",
+                len(changed),
+                loop_block_ms,
+            )
+
+    def _record_loop_block(self, seconds: float) -> float:
+        """Record the event loop time of a save; returns it in milliseconds."""
+        loop_block_ms = seconds * 1000
+        self._stats["last_loop_block_ms"] = loop_block_ms
+        self._stats["max_loop_block_ms"] = max(
+            self._stats["max_loop_block_ms"], loop_block_ms
+        )
+        return loop_block_ms
 
     async def async_remove(self) -> None:
         """Remove all stored data."""
-        async with self._data_lock:
+        async with self._save_lock:
+            for account_id in [*self._saved_versions, *self._unavailable]:
+                await self._account_store(account_id).async_remove()
             await self._store.async_remove()
+            for account_id in self._unavailable:
+                ir.async_delete_issue(
+                    self._hass, DOMAIN, f"account_unreadable_{account_id}"
+                )
+            self._account_stores.clear()
+            self._saved_versions.clear()
+            self._unavailable.clear()
+            self._saved_index = None
             self._data = FinanceData()
             _LOGGER.debug("Removed all finance data")
 
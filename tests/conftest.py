@@ -0,0 +1,32 @@
+"""Fixtures for Ha Finance Record tests."""
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+import sys
+
+# Imported before the integration to resolve Home Assistant's import order
+import homeassistant.core  # noqa: F401
+import pytest
+
+ROOT = Path(__file__).parent.parent
+
+# The repository root is the integration package
+if "ha_finance" not in sys.modules:
+    _spec = importlib.util.spec_from_file_location(
+        "ha_finance",
+        ROOT / "__init__.py",
+        submodule_search_locations=[str(ROOT)],
+    )
+    _module = importlib.util.module_from_spec(_spec)
+    sys.modules["ha_finance"] = _module
+    _spec.loader.exec_module(_module)
+
+from ha_finance.store import FinanceStore  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def clear_store(hass):
+    """Drop the store of a test's Home Assistant instance afterwards."""
+    yield
+    FinanceStore.clear_instance(hass)
@@ -0,0 +1,60 @@
+"""Tests for point-in-time balances of Ha Finance Record."""
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import date, datetime, timedelta, timezone
+import random
+
+from ha_finance.indexes import local_day_bounds
+from ha_finance.models import Account, Transaction
+
+
+def test_balance_at_trimmed_history() -> None:
+    """Day-end balances are exact across trimmed history, other times unknown."""
+    rng = random.Random(1)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    history = sorted(
+        (
+            start + timedelta(minutes=rng.randint(0, 60 * 24 * 730)),
+            round(rng.uniform(-50, 50), 2),
+        )
+        for _ in range(1000)
+    )
+    account = Account("a", "A", 100.0, version=0)
+    for moment, amount in history:
+        account.add_transaction(
+            replace(Transaction.create(amount, "note"), timestamp=moment.isoformat()),
+            max_transactions=200,
+        )
+    assert len(account.transactions) == 200
+
+    def expected(key: int) -> float:
+        return 100.0 + sum(
+            amount for moment, amount in history if moment.timestamp() <= key
+        )
+
+    day = date(2024, 1, 1)
+    while day < date(2026, 1, 5):
+        key = local_day_bounds(day)[1]
+        assert abs(account.balance_at(key) - expected(key)) < 1e-6, day
+        day += timedelta(days=1)
+
+    # Between two day ends in trimmed history
+    assert account.balance_at(local_day_bounds(date(2024, 3, 15))[1] - 3600) is None
+    # Within the retained transactions any time is exact
+    key = int(history[-1][0].timestamp()) - 10
+    assert abs(account.balance_at(key) - expected(key)) < 1e-6
+
+
+def test_balance_at_untrimmed() -> None:
+    """Without trimming the balance is exact at any time."""
+    account = Account("a", "A", 10.0, version=0)
+    for hour, amount in ((1, 5.0), (2, -3.0), (30, 7.0)):
+        moment = datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(hours=hour)
+        account.add_transaction(
+            replace(Transaction.create(amount, "note"), timestamp=moment.isoformat())
+        )
+    base = int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp())
+    assert account.balance_at(base) == 10.0
+    assert account.balance_at(base + 3600 * 2 + 1) == 12.0
+    assert account.balance_at(base + 3600 * 40) == 19.0
@@ -0,0 +1,35 @@
+"""Tests for the classification rules of Ha Finance Record."""
+from __future__ import annotations
+
+from ha_finance.classifier import KeywordMatcher, RuleEngine
+from ha_finance.models import ClassificationRule, Transaction
+
+
+def test_keyword_matcher() -> None:
+    """Every occurrence of every keyword is found, overlapping ones included."""
+    matcher = KeywordMatcher(["he", "she", "hers", "咖啡"])
+    assert sorted(matcher.find("ushers 咖啡")) == [0, 1, 2, 3]
+    assert list(matcher.find("nothing")) == []
+
+
+def test_rule_engine() -> None:
+    """Rules apply by priority, within their amount bounds, merging tags."""
+    engine = RuleEngine(
+        [
+            ClassificationRule("cafe", "food", ("drink",), ("coffee",), priority=10),
+            ClassificationRule("big", "large", ("big",), (), max_amount=-100),
+            ClassificationRule("fallback", "other", ("misc",), ("coffee",), priority=20),
+        ]
+    )
+    assert [rule.id for rule in engine.match("Coffee", -5)] == ["cafe", "fallback"]
+    assert [rule.id for rule in engine.match("rent", -500)] == ["big"]
+
+    transaction = engine.classify(Transaction.create(-5, "COFFEE"))
+    assert transaction.category == "food"
+    assert transaction.tags == ("drink", "misc")
+
+    categorized = Transaction.create(-5, "coffee", category="gift")
+    assert engine.classify(categorized).category == "gift"
+    assert engine.classify(categorized, overwrite=True).category == "food"
+    unmatched = Transaction.create(5, "salary")
+    assert engine.classify(unmatched) is unmatched
@@ -0,0 +1,61 @@
+"""Tests for the account coordinator of Ha Finance Record."""
+from __future__ import annotations
+
+from functools import partial
+from unittest.mock import MagicMock
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import async_capture_events
+
+from ha_finance.const import EVENT_BATCH, EVENT_LOW_BALANCE
+from ha_finance.hub import async_get_hub
+from ha_finance.models import Account, Transaction
+from ha_finance.pipeline import Mutation
+
+
+async def test_low_balance_event_batched(hass: HomeAssistant) -> None:
+    """Low balance events go through the account's event batcher."""
+    hub = async_get_hub(hass)
+    await hub.pipeline.async_execute(
+        "cash",
+        partial(Mutation.add_account, account=Account("cash", "Cash", 2000.0)),
+        must_exist=False,
+    )
+    coordinator = await hub.async_setup_account("cash")
+    batches = async_capture_events(hass, EVENT_BATCH)
+    low_balance = async_capture_events(hass, EVENT_LOW_BALANCE)
+
+    await hub.pipeline.async_execute(
+        "cash",
+        partial(
+            Mutation.add_transaction, transaction=Transaction.create(-1500, "rent")
+        ),
+    )
+    coordinator.events.async_flush()
+    await hass.async_block_till_done()
+
+    # Per-item events are off by default
+    assert low_balance == []
+    assert [event["event"] for event in batches[0].data["events"]] == ["low_balance"]
+    hub.async_unregister(coordinator)
+
+
+async def test_entry_unload_reinstates_coordinator(hass: HomeAssistant) -> None:
+    """An account keeps a coordinator after its config entry unloads."""
+    hub = async_get_hub(hass)
+    await hub.pipeline.async_execute(
+        "cash",
+        partial(Mutation.add_account, account=Account("cash", "Cash")),
+        must_exist=False,
+    )
+    coordinator = await hub.async_setup_account("cash")
+    entry_coordinator = MagicMock(account_id="cash", entry=MagicMock())
+    hub.async_register(entry_coordinator)
+    assert hub.get_coordinator("cash") is entry_coordinator
+
+    hub.async_unregister(entry_coordinator)
+    assert hub.get_coordinator("cash") is coordinator
+
+    # Deleting the account drops the coordinator without an entry
+    await hub.pipeline.async_execute("cash", Mutation.remove_account)
+    assert hub.get_coordinator("cash") is None
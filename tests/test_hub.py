@@ -0,0 +1,144 @@
+"""Tests for the cross-account totals of Ha Finance Record."""
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import timedelta
+from functools import partial
+import random
+from unittest.mock import MagicMock, patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_capture_events
+
+from ha_finance.const import EVENT_BUDGET_THRESHOLD
+from ha_finance.hub import FinanceHub, async_get_hub
+from ha_finance.models import Account, Budget, Transaction
+from ha_finance.pipeline import STAGE_INDEX, Mutation
+
+
+def _totals(hub: FinanceHub) -> tuple:
+    """Return the totals of a hub, rounded for comparison."""
+    return (
+        round(hub.net_worth, 6),
+        round(hub.monthly_income, 6),
+        round(hub.monthly_expense, 6),
+        {
+            category: round(spent, 6)
+            for category, spent in hub.category_spent.items()
+            if round(spent, 6)
+        },
+    )
+
+
+async def test_incremental_totals_match_rebuild(hass: HomeAssistant) -> None:
+    """Totals kept up to date per change equal a full recomputation."""
+    hub = async_get_hub(hass)
+    hub.async_rebuild_totals()
+    rng = random.Random(1)
+    now = dt_util.utcnow()
+    for account_id in ("cash", "bank"):
+        await hub.pipeline.async_execute(
+            account_id,
+            partial(
+                Mutation.add_account, account=Account(account_id, account_id, 50.0)
+            ),
+            must_exist=False,
+        )
+
+    ids: dict[str, list[str]] = {"cash": [], "bank": []}
+    for _ in range(200):
+        account_id = rng.choice(["cash", "bank"])
+        action = rng.random()
+        if action < 0.6 or not ids[account_id]:
+            transaction = replace(
+                Transaction.create(
+                    round(rng.uniform(-80, 40), 2),
+                    "note",
+                    category=rng.choice([None, "food", "rent"]),
+                ),
+                timestamp=(now - timedelta(days=rng.randint(0, 60))).isoformat(),
+            )
+            stored = await hub.pipeline.async_execute(
+                account_id, partial(Mutation.add_transaction, transaction=transaction)
+            )
+            ids[account_id].append(stored.id)
+        elif action < 0.8:
+            await hub.pipeline.async_execute(
+                account_id,
+                partial(
+                    Mutation.update_transaction,
+                    transaction_id=rng.choice(ids[account_id]),
+                    amount=round(rng.uniform(-80, 40), 2),
+                    category=rng.choice([None, "food", "rent"]),
+                ),
+            )
+        else:
+            transaction_id = ids[account_id].pop(rng.randrange(len(ids[account_id])))
+            await hub.pipeline.async_execute(
+                account_id,
+                partial(Mutation.remove_transaction, transaction_id=transaction_id),
+            )
+
+    incremental = _totals(hub)
+    hub.async_rebuild_totals()
+    assert incremental == _totals(hub)
+    assert incremental[0] == round(
+        sum(account.balance for account in hub.store.data.accounts.values()), 6
+    )
+
+
+async def test_register_builds_totals_once(hass: HomeAssistant) -> None:
+    """Registering coordinators does not rescan the accounts every time."""
+    hub = async_get_hub(hass)
+    await hub.store.async_load()
+    account = Account("cash", "Cash", 20.0)
+    hub.store.data.add_account(account)
+    coordinators = [MagicMock(account_id=account_id) for account_id in "abc"]
+    with patch.object(
+        hub, "async_rebuild_totals", wraps=hub.async_rebuild_totals
+    ) as rebuild:
+        for coordinator in coordinators:
+            hub.async_register(coordinator)
+    assert rebuild.call_count == 1
+    assert hub.net_worth == 20.0
+    for coordinator in coordinators:
+        hub.async_unregister(coordinator)
+
+
+async def test_budget_events_queued(hass: HomeAssistant) -> None:
+    """Crossing a budget threshold queues one event on the mutation."""
+    hub = async_get_hub(hass)
+    await hub.store.async_load()
+    hub.store.data.set_budget(Budget("food", 1000.0))
+    await hub.pipeline.async_execute(
+        "cash",
+        partial(Mutation.add_account, account=Account("cash", "Cash")),
+        must_exist=False,
+    )
+    hub.async_rebuild_totals()
+    events = async_capture_events(hass, EVENT_BUDGET_THRESHOLD)
+    queued: list[tuple[str, dict]] = []
+    hub.pipeline.add_stage(
+        STAGE_INDEX, lambda mutation: queued.extend(mutation.events)
+    )
+
+    async def add(amount: float) -> Transaction:
+        return await hub.pipeline.async_execute(
+            "cash",
+            partial(
+                Mutation.add_transaction,
+                transaction=Transaction.create(amount, "note", category="food"),
+            ),
+        )
+
+    await add(-700)
+    second = await add(-150)
+    await hub.pipeline.async_execute(
+        "cash",
+        partial(Mutation.update_transaction, transaction_id=second.id, amount=-160),
+    )
+    await add(-200)
+    await hass.async_block_till_done()
+    assert [data["threshold"] for _, data in queued] == [0.8, 1.0]
+    assert [event.data["threshold"] for event in events] == [0.8, 1.0]
@@ -0,0 +1,86 @@
+"""Tests for the derived indexes of Ha Finance Record."""
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import date, timedelta
+
+from ha_finance.indexes import NoteIndex, RollingSpending, TimestampIndex
+from ha_finance.models import Transaction
+
+
+def _transaction(amount: float, note: str, timestamp: str) -> Transaction:
+    """Create a transaction at a fixed timestamp."""
+    return replace(Transaction.create(amount, note), timestamp=timestamp)
+
+
+def test_timestamp_index() -> None:
+    """Range queries return the transactions in the inclusive range, by time."""
+    late = _transaction(1, "late", "2024-01-03T00:00:00+00:00")
+    early = _transaction(2, "early", "2024-01-01T00:00:00+00:00")
+    middle = _transaction(3, "middle", "2024-01-02T00:00:00+00:00")
+    index = TimestampIndex([late, early])
+    index.add(middle)
+    assert index.between() == [early, middle, late]
+    assert index.between(middle.ts, None) == [middle, late]
+    assert index.count(None, middle.ts) == 2
+    assert index.first_key == early.ts
+    assert index.last_key == late.ts
+
+    edited = replace(middle, note="edited")
+    index.replace(middle, edited)
+    index.remove(late)
+    assert index.between() == [early, edited]
+    assert index.last_key == edited.ts
+
+
+def test_note_index_search() -> None:
+    """Every query term must match; phrases and repeated terms score higher."""
+    coffee = _transaction(-4.5, "coffee beans", "2024-01-01T00:00:00+00:00")
+    repeated = _transaction(-3, "coffee coffee shop", "2024-01-02T00:00:00+00:00")
+    lunch = _transaction(-12, "午餐 lunch", "2024-01-03T00:00:00+00:00")
+    index = NoteIndex([coffee, repeated, lunch])
+
+    results = sorted(index.search("coffee"), key=lambda result: -result[0])
+    assert [result[2] for result in results] == [repeated, coffee]
+    assert {result[2] for result in index.search("cof")} == {repeated, coffee}
+    assert [result[2] for result in index.search("coffee beans")] == [coffee]
+    assert [result[2] for result in index.search("午餐")] == [lunch]
+    assert [result[2] for result in index.search("12")] == [lunch]
+    assert index.search("tea") == []
+
+    index.remove(coffee)
+    assert [result[2] for result in index.search("beans")] == []
+
+
+def test_rolling_spending() -> None:
+    """Totals cover the trailing windows and expire as days pass."""
+    today = date(2024, 1, 31)
+    spending = RollingSpending((7, 30), today)
+    spending.add(today, 10)
+    spending.add(today - timedelta(days=6), 5)
+    spending.add(today - timedelta(days=20), 2)
+    spending.add(today - timedelta(days=30), 100)
+    assert spending.total(7) == 15
+    assert spending.total(30) == 17
+
+    spending.advance(today + timedelta(days=1))
+    assert spending.total(7) == 10
+    assert spending.total(30) == 17
+
+    spending.advance(today + timedelta(days=60))
+    assert spending.total(30) == 0
+
+
+def test_note_index_search_bounds() -> None:
+    """Matches are filtered by time, and a limit keeps the newest ones."""
+    transactions = [
+        _transaction(-1, "coffee", f"2024-01-{day:02d}T00:00:00+00:00")
+        for day in range(1, 11)
+    ]
+    index = NoteIndex(transactions)
+    results = index.search("coffee", transactions[2].ts, transactions[5].ts)
+    assert {result[2] for result in results} == set(transactions[2:6])
+    results = index.search("coffee", limit=3)
+    assert {result[2] for result in results} == set(transactions[-3:])
+    results = index.search("coffee", None, transactions[5].ts, limit=2)
+    assert {result[2] for result in results} == set(transactions[4:6])
@@ -0,0 +1,105 @@
+"""Tests for the account model of Ha Finance Record."""
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+import time
+
+from ha_finance.models import Account, LowBalanceAlert, Transaction
+
+
+def _transaction(amount: float, note: str = "note", timestamp: str | None = None) -> Transaction:
+    """Create a transaction, optionally at a fixed timestamp."""
+    transaction = Transaction.create(amount, note)
+    if timestamp is not None:
+        transaction = replace(transaction, timestamp=timestamp)
+    return transaction
+
+
+def test_version_seeded_from_clock() -> None:
+    """A new account starts at the current time in milliseconds."""
+    account = Account("a", "A")
+    assert abs(account.version - time.time() * 1000) < 5000
+
+
+def test_changes_since() -> None:
+    """Deltas name the changed transactions until a change needs a resync."""
+    account = Account("a", "A", 100.0, version=0)
+    assert account.changes_since(0).upserted == []
+    first = account.add_transaction(_transaction(10))
+    second = account.add_transaction(_transaction(-5))
+    assert account.version == 2
+
+    delta = account.changes_since(0)
+    assert [tx.id for tx in delta.upserted] == [first.id, second.id]
+    assert delta.removed == []
+
+    # Editing the last transaction's note moves no other balance
+    account.update_transaction(second.id, note="edited")
+    assert [tx.id for tx in account.changes_since(2).upserted] == [second.id]
+
+    # Editing an earlier amount moves the later running balances
+    account.update_transaction(first.id, amount=20)
+    assert account.changes_since(3) is None
+    assert account.changes_since(4).upserted == []
+
+    account.remove_transaction(second.id)
+    delta = account.changes_since(4)
+    assert delta.upserted == []
+    assert delta.removed == [second.id]
+
+    assert account.changes_since(99) is None
+
+
+def test_changes_since_trimmed() -> None:
+    """Transactions trimmed from the ledger are reported as removed."""
+    account = Account("a", "A", version=0)
+    for _ in range(3):
+        account.add_transaction(_transaction(1), max_transactions=2)
+    delta = account.changes_since(1)
+    assert len(delta.upserted) == 2
+    assert len(delta.removed) == 1
+
+
+def test_version_persisted() -> None:
+    """The version survives storage, the change log does not."""
+    account = Account("a", "A", version=0)
+    account.add_transaction(_transaction(1))
+    account.name = "B"
+    restored = Account.from_dict("a", account.to_dict())
+    assert restored.version == account.version == 2
+    assert restored.changes_since(1) is None
+    assert restored.changes_since(2).upserted == []
+
+
+def test_invalid_transaction_dropped() -> None:
+    """A stored transaction with an unreadable timestamp is dropped on load."""
+    account = Account("a", "A", version=0)
+    account.add_transaction(_transaction(5, timestamp="2024-01-01T10:00:00+00:00"))
+    account.add_transaction(_transaction(7, timestamp="2024-01-02T10:00:00+00:00"))
+    data = account.to_dict()
+    data["transactions"][0]["timestamp"] = "not a date"
+    restored = Account.from_dict("a", data)
+    assert [tx.amount for tx in restored.transactions] == [7]
+    assert list(restored.running_balances) == [12]
+
+
+def test_low_balance_alert_cooldown() -> None:
+    """Clearing is only reported for an activation that was reported."""
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    cooldown = timedelta(hours=1)
+    alert, change = LowBalanceAlert().transition(50, 100, 200, now, cooldown)
+    assert change == "entered"
+    alert, change = alert.transition(250, 100, 200, now, cooldown)
+    assert change == "cleared"
+
+    # Entering again within the cooldown is silent, and so is clearing it
+    later = now + timedelta(minutes=10)
+    alert, change = alert.transition(50, 100, 200, later, cooldown)
+    assert alert.active
+    assert change is None
+    alert, change = alert.transition(250, 100, 200, later, cooldown)
+    assert not alert.active
+    assert change is None
+
+    assert LowBalanceAlert.from_dict(alert.to_dict()) == alert
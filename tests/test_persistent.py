@@ -0,0 +1,71 @@
+"""Tests for the persistent collections of Ha Finance Record."""
+from __future__ import annotations
+
+import random
+
+from ha_finance.persistent import PersistentMap, PersistentVector
+
+
+def test_vector_operations() -> None:
+    """The vector matches a list across appends, sets, drops and deletes."""
+    rng = random.Random(1)
+    expected: list[int] = []
+    vector: PersistentVector[int] = PersistentVector()
+    for value in range(3000):
+        old, old_items = vector, list(expected)
+        action = rng.random()
+        if action < 0.7 or not expected:
+            vector = vector.append(value)
+            expected.append(value)
+        elif action < 0.85:
+            index = rng.randrange(len(expected))
+            vector = vector.set(index, -value)
+            expected[index] = -value
+        elif action < 0.95:
+            count = rng.randint(0, min(len(expected), 40))
+            vector = vector.drop_front(count)
+            del expected[:count]
+        else:
+            index = rng.randrange(len(expected))
+            vector = vector.delete(index)
+            del expected[index]
+        # Older versions are unchanged
+        assert list(old) == old_items
+    assert list(vector) == expected
+    assert len(vector) == len(expected)
+    assert vector[-1] == expected[-1]
+    assert vector[10:20] == expected[10:20]
+
+
+def test_map_operations() -> None:
+    """The map matches a dict, including keys with colliding hashes."""
+
+    class Colliding:
+        """Key whose hash collides with every other instance."""
+
+        def __init__(self, value: int) -> None:
+            self.value = value
+
+        def __hash__(self) -> int:
+            return 7
+
+        def __eq__(self, other: object) -> bool:
+            return isinstance(other, Colliding) and other.value == self.value
+
+    rng = random.Random(2)
+    expected: dict = {}
+    mapping: PersistentMap = PersistentMap()
+    keys = [*range(500), *(Colliding(value) for value in range(5))]
+    for _ in range(3000):
+        key = rng.choice(keys)
+        if rng.random() < 0.7:
+            mapping = mapping.set(key, rng.random())
+            expected[key] = mapping[key]
+        else:
+            old = mapping
+            mapping = mapping.delete(key)
+            expected.pop(key, None)
+            assert len(old) >= len(mapping)
+    assert dict(mapping) == expected
+    assert len(mapping) == len(expected)
+    assert Colliding(99) not in mapping
@@ -0,0 +1,72 @@
+"""Tests for the mutation pipeline of Ha Finance Record."""
+from __future__ import annotations
+
+from functools import partial
+
+from homeassistant.core import HomeAssistant
+import pytest
+
+from ha_finance.models import Account, Transaction
+from ha_finance.pipeline import (
+    STAGE_INDEX,
+    STAGE_NOTIFY,
+    STAGE_VALIDATE,
+    Mutation,
+    MutationError,
+    MutationPipeline,
+)
+from ha_finance.store import FinanceStore
+
+
+async def test_stages(hass: HomeAssistant) -> None:
+    """Stages see the recorded changes in order and events are queued."""
+    pipeline = MutationPipeline(FinanceStore(hass))
+    seen: list[tuple[str, list, list]] = []
+    for stage in (STAGE_VALIDATE, STAGE_INDEX, STAGE_NOTIFY):
+        pipeline.add_stage(
+            stage,
+            partial(
+                lambda stage, mutation: seen.append(
+                    (stage, list(mutation.added), list(mutation.events))
+                ),
+                stage,
+            ),
+        )
+
+    await pipeline.async_execute(
+        "cash",
+        partial(Mutation.add_account, account=Account("cash", "Cash")),
+        must_exist=False,
+    )
+    seen.clear()
+
+    def apply(mutation: Mutation) -> Transaction:
+        transaction = mutation.add_transaction(Transaction.create(5, "note"))
+        mutation.fire("test_event", {"id": transaction.id})
+        return transaction
+
+    transaction = await pipeline.async_execute("cash", apply)
+    assert seen == [
+        (STAGE_VALIDATE, [], []),
+        (STAGE_INDEX, [transaction], [("test_event", {"id": transaction.id})]),
+        (STAGE_NOTIFY, [transaction], [("test_event", {"id": transaction.id})]),
+    ]
+    assert pipeline.store.data.accounts["cash"].balance == 5
+
+
+async def test_errors(hass: HomeAssistant) -> None:
+    """Changes of a missing account or transaction raise MutationError."""
+    pipeline = MutationPipeline(FinanceStore(hass))
+    with pytest.raises(MutationError):
+        await pipeline.async_execute("missing", Mutation.remove_account)
+    await pipeline.async_execute("missing", Mutation.remove_account, must_exist=False)
+
+    await pipeline.async_execute(
+        "cash",
+        partial(Mutation.add_account, account=Account("cash", "Cash")),
+        must_exist=False,
+    )
+    with pytest.raises(MutationError):
+        await pipeline.async_execute(
+            "cash", partial(Mutation.remove_transaction, transaction_id="missing")
+        )
@@ -0,0 +1,39 @@
+"""Tests for the income and expense rollups of Ha Finance Record."""
+from __future__ import annotations
+
+from dataclasses import replace
+
+from ha_finance.const import GRANULARITY_DAY, GRANULARITY_MONTH, GRANULARITY_WEEK
+from ha_finance.models import Transaction
+from ha_finance.rollups import Rollups
+
+
+def _transaction(amount: float, timestamp: str) -> Transaction:
+    """Create a transaction at a fixed timestamp."""
+    return replace(Transaction.create(amount, "note"), timestamp=timestamp)
+
+
+def test_rollups() -> None:
+    """Buckets fold up per level and empty buckets are dropped."""
+    salary = _transaction(100, "2024-01-01T12:00:00+00:00")
+    rent = _transaction(-40, "2024-01-02T12:00:00+00:00")
+    food = _transaction(-5, "2024-02-05T12:00:00+00:00")
+    rollups = Rollups.build([salary, rent, food])
+
+    assert rollups.buckets(GRANULARITY_MONTH, 12) == [
+        {"period": "2024-01", "income": 100, "expenses": 40},
+        {"period": "2024-02", "income": 0, "expenses": 5},
+    ]
+    # 2024-01-01 is a Monday
+    assert rollups.buckets(GRANULARITY_WEEK, 1) == [
+        {"period": "2024-02-05", "income": 0, "expenses": 5},
+    ]
+    assert rollups.totals_before(GRANULARITY_DAY, "2024-02-01") == (100, 40)
+
+    removed = rollups.apply(removed=[food])
+    assert [bucket["period"] for bucket in removed.buckets(GRANULARITY_MONTH, 12)] == [
+        "2024-01"
+    ]
+    # The original is unchanged
+    assert len(rollups.buckets(GRANULARITY_MONTH, 12)) == 2
+    assert Rollups.from_dict(rollups.to_dict()) == rollups
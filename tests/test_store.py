@@ -0,0 +1,124 @@
+"""Tests for the storage of Ha Finance Record."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import issue_registry as ir
+
+from ha_finance.const import (
+    DOMAIN,
+    STORAGE_ACCOUNT_KEY,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+)
+from ha_finance.models import Account, Transaction
+from ha_finance.store import FinanceStore
+
+
+def _account_data(name: str, amounts: list[float]) -> dict[str, Any]:
+    """Return the stored form of an account with some transactions."""
+    account = Account(name.lower(), name, version=0)
+    for amount in amounts:
+        account.add_transaction(Transaction.create(amount, "note"))
+    return account.to_dict()
+
+
+async def test_migrate_single_file(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Version 1 data is split into an index and a file per account."""
+    hass_storage[STORAGE_KEY] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": STORAGE_KEY,
+        "data": {
+            "accounts": {
+                "cash": _account_data("Cash", [10, -3]),
+                "bank": _account_data("Bank", [100]),
+            },
+            "rules": {},
+            "budgets": {"food": {"amount": 100, "thresholds": [0.8]}},
+        },
+    }
+
+    data = await FinanceStore(hass).async_load()
+    assert data.accounts["cash"].balance == 7
+    assert data.accounts["bank"].balance == 100
+
+    index = hass_storage[STORAGE_KEY]
+    assert index["version"] == STORAGE_VERSION
+    assert index["data"]["accounts"] == ["bank", "cash"]
+    assert "food" in index["data"]["budgets"]
+    cash = hass_storage[f"{STORAGE_ACCOUNT_KEY}.cash"]["data"]
+    assert cash["balance"] == 7
+    assert len(cash["transactions"]) == 2
+
+    # Loading the migrated files gives the same data
+    FinanceStore.clear_instance(hass)
+    data = await FinanceStore(hass).async_load()
+    assert sorted(data.accounts) == ["bank", "cash"]
+    assert data.accounts["cash"].balance == 7
+
+
+async def test_save_changed_accounts_only(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """A save writes the accounts whose version changed since the last one."""
+    store = FinanceStore(hass)
+    data = await store.async_load()
+    data.add_account(Account("cash", "Cash"))
+    data.add_account(Account("bank", "Bank"))
+    await store.async_save()
+    assert store.stats["account_writes"] == 2
+    assert 0 < store.stats["last_loop_block_ms"] <= store.stats["max_loop_block_ms"]
+
+    data.accounts["cash"].add_transaction(Transaction.create(5, "note"))
+    await store.async_save()
+    assert store.stats["account_writes"] == 3
+    assert hass_storage[f"{STORAGE_ACCOUNT_KEY}.cash"]["data"]["balance"] == 5
+
+    data.remove_account("bank")
+    await store.async_save()
+    assert f"{STORAGE_ACCOUNT_KEY}.bank" not in hass_storage
+    assert hass_storage[STORAGE_KEY]["data"]["accounts"] == ["cash"]
+
+
+async def test_unreadable_account_kept(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """An account that fails to load stays listed until it is discarded."""
+    hass_storage[STORAGE_KEY] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": STORAGE_KEY,
+        "data": {"accounts": ["bank", "cash"], "rules": {}, "budgets": {}},
+    }
+    for account_id, version in (("bank", 99), ("cash", STORAGE_VERSION)):
+        key = f"{STORAGE_ACCOUNT_KEY}.{account_id}"
+        hass_storage[key] = {
+            "version": version,
+            "minor_version": 1,
+            "key": key,
+            "data": _account_data(account_id.title(), [10]),
+        }
+    damaged = hass_storage[f"{STORAGE_ACCOUNT_KEY}.bank"]
+
+    store = FinanceStore(hass)
+    data = await store.async_load()
+    assert list(data.accounts) == ["cash"]
+    assert store.unavailable == {"bank"}
+    issue_registry = ir.async_get(hass)
+    assert issue_registry.async_get_issue(DOMAIN, "account_unreadable_bank")
+
+    data.accounts["cash"].add_transaction(Transaction.create(5, "note"))
+    data.add_account(Account("bank", "Bank"))
+    await store.async_save()
+    assert hass_storage[STORAGE_KEY]["data"]["accounts"] == ["bank", "cash"]
+    assert hass_storage[f"{STORAGE_ACCOUNT_KEY}.bank"] is damaged
+
+    data.remove_account("bank")
+    await store.async_discard_account("bank")
+    assert f"{STORAGE_ACCOUNT_KEY}.bank" not in hass_storage
+    assert hass_storage[STORAGE_KEY]["data"]["accounts"] == ["cash"]
+    assert not issue_registry.async_get_issue(DOMAIN, "account_unreadable_bank")
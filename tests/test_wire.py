@@ -0,0 +1,24 @@
+"""Tests for the columnar wire format of Ha Finance Record."""
+from __future__ import annotations
+
+from ha_finance.wire import encode_columns
+
+
+def test_encode_columns() -> None:
+    """Timestamps are delta encoded and dictionary fields indexed."""
+    rows = [
+        {"id": "a", "timestamp": "x", "ts": 100, "amount": 1.5, "category": "food"},
+        {"id": "b", "timestamp": "y", "ts": 160, "amount": -2, "category": None},
+        {"id": "c", "timestamp": "z", "ts": 150, "amount": 3, "category": "food"},
+    ]
+    assert encode_columns(rows) == {
+        "count": 3,
+        "columns": {
+            "id": ["a", "b", "c"],
+            "ts": [100, 60, -10],
+            "amount": [1.5, -2, 3],
+            "category": [0, 1, 0],
+        },
+        "dictionaries": {"category": ["food", None]},
+    }
+    assert encode_columns([]) == {"count": 0, "columns": {}, "dictionaries": {}}
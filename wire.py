@@ -0,0 +1,30 @@
+"""Columnar wire format for transaction lists of Ha Finance Record."""
+from __future__ import annotations
+
+from typing import Any, Final
+
+# Fields with few distinct values, sent as indexes into a value list
+DICTIONARY_FIELDS: Final = ("type", "plan_id", "category", "account_id")
+
+
+def encode_columns(rows: list[dict[str, Any]]) -> dict[str, Any]:
+    """Encode API transaction dicts as parallel arrays, one per field.
+
+    The ISO timestamp is left out: "ts" carries the epoch seconds, as the
+    difference to the previous row (the first row relative to 0). Fields
+    in DICTIONARY_FIELDS hold indexes into the value lists in
+    "dictionaries". All rows must have the same fields.
+    """
+    columns: dict[str, list[Any]] = {}
+    dictionaries: dict[str, list[Any]] = {}
+    fields = [field for field in rows[0] if field != "timestamp"] if rows else []
+    for field in fields:
+        values = [row[field] for row in rows]
+        if field == "ts":
+            values = [value - previous for value, previous in zip(values, [0, *values])]
+        elif field in DICTIONARY_FIELDS:
+            lookup: dict[Any, int] = {}
+            values = [lookup.setdefault(value, len(lookup)) for value in values]
+            dictionaries[field] = list(lookup)
+        columns[field] = values
+    return {"count": len(rows), "columns": columns, "dictionaries": dictionaries}